@@ -43,3 +43,21 @@ async def get_current_user_id(authorization: str | None = Header(None)) -> str:
         raise HTTPException(status_code=401, detail="Invalid token format") from e
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Authentication failed: {str(e)}") from e
+
+
+async def get_optional_user_id(authorization: str | None = Header(None)) -> str | None:
+    """
+    Extract user ID from JWT token if one is provided.
+
+    Args:
+        authorization: Authorization header with Bearer token
+
+    Returns:
+        User ID (UUID string), or None for anonymous or invalid tokens
+    """
+    if not authorization:
+        return None
+    try:
+        return await get_current_user_id(authorization)
+    except HTTPException:
+        return None
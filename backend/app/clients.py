@@ -0,0 +1,131 @@
+"""Shared clients for external APIs (ElevenLabs, Gemini)."""
+
+import logging
+import threading
+from typing import Any
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class UpstreamClients:
+    """
+    One pooled, keep-alive client per upstream API.
+
+    Clients are created once in the application lifespan (``start``) and
+    closed on shutdown (``close``), so consecutive TTS/STT calls reuse open
+    connections instead of paying a TCP+TLS handshake each time. Outside the
+    app (scripts, benchmarks) they are created lazily on first use.
+    """
+
+    def __init__(self):
+        """Initialize client holders and counters."""
+        self._elevenlabs: httpx.AsyncClient | None = None
+        self._http2 = False
+        self._gemini: Any = None
+        self._gemini_loaded = False
+        self._lock = threading.Lock()
+        self._counters = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+        }
+
+    async def start(self) -> None:
+        """Create the clients (called on application startup)."""
+        _ = self.elevenlabs
+        _ = self.gemini
+
+    async def close(self) -> None:
+        """Close the clients (called on application shutdown)."""
+        if self._elevenlabs is not None:
+            await self._elevenlabs.aclose()
+            self._elevenlabs = None
+
+        if self._gemini is not None:
+            close = getattr(self._gemini, "close", None)  # Only in newer SDK versions
+            if close is not None:
+                close()
+        self._gemini = None
+        self._gemini_loaded = False
+
+    @property
+    def elevenlabs(self) -> httpx.AsyncClient:
+        """Get the pooled ElevenLabs client (base URL and API key preset)."""
+        if self._elevenlabs is None:
+            self._http2 = self._http2_available()
+            self._elevenlabs = httpx.AsyncClient(
+                base_url=settings.elevenlabs_base_url,
+                headers={"xi-api-key": settings.elevenlabs_api_key},
+                http2=self._http2,
+                limits=httpx.Limits(
+                    max_connections=settings.http_max_connections,
+                    max_keepalive_connections=settings.http_max_keepalive_connections,
+                    keepalive_expiry=settings.http_keepalive_expiry_seconds,
+                ),
+                timeout=httpx.Timeout(
+                    settings.http_timeout_seconds, connect=settings.http_connect_timeout_seconds
+                ),
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._elevenlabs
+
+    @property
+    def gemini(self) -> Any:
+        """Get the Gemini client, or None if unavailable (no key or SDK)."""
+        if not self._gemini_loaded:
+            self._gemini_loaded = True
+            if settings.google_api_key:
+                try:
+                    from google import genai
+
+                    self._gemini = genai.Client(api_key=settings.google_api_key)
+                except Exception as e:
+                    logger.warning("google-genai client unavailable: %r", e)
+        return self._gemini
+
+    def stats(self) -> dict[str, Any]:
+        """Get upstream client statistics."""
+        with self._lock:
+            counters = dict(self._counters)
+        return {
+            **counters,
+            "http2": self._http2,
+            "max_connections": settings.http_max_connections,
+            "max_keepalive_connections": settings.http_max_keepalive_connections,
+            "gemini_ready": self._gemini is not None,
+        }
+
+    @staticmethod
+    def _http2_available() -> bool:
+        if not settings.http2_enabled:
+            return False
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            logger.warning("HTTP2_ENABLED is set but h2 isn't installed; using HTTP/1.1")
+            return False
+        return True
+
+    async def _on_request(self, request: httpx.Request) -> None:
+        with self._lock:
+            self._counters["requests"] += 1
+        request.extensions["trace"] = self._trace
+
+    async def _on_response(self, response: httpx.Response) -> None:
+        if response.status_code >= 400:
+            with self._lock:
+                self._counters["errors"] += 1
+
+    async def _trace(self, event_name: str, info: dict[str, Any]) -> None:
+        # httpcore reports each new TCP connection; reused ones don't appear
+        if event_name == "connection.connect_tcp.complete":
+            with self._lock:
+                self._counters["connections_opened"] += 1
+
+
+# Global upstream clients instance
+clients = UpstreamClients()
@@ -11,9 +11,88 @@ class Settings(BaseSettings):
     supabase_key: str
     supabase_service_key: str
 
+    # Database worker pool (Supabase client is synchronous)
+    db_pool_size: int = 16
+
     # External APIs (optional)
     elevenlabs_api_key: str = ""
     google_api_key: str = ""
+    elevenlabs_base_url: str = "https://api.elevenlabs.io"
+
+    # Gemini feedback (async SDK calls, bounded concurrency, per-call timeout)
+    gemini_model: str = "gemini-1.5-flash"
+    ai_max_concurrency: int = 8
+    ai_timeout_seconds: float = 10.0
+
+    # Feedback routing: rule-based templates where Gemini adds little value
+    ai_template_min_score: float = 95.0  # Scores at or above get template praise
+    ai_template_max_spoken_ratio: float = 0.2  # Near-empty transcripts (share of the text)
+    ai_llm_max_diff_words: int = 40  # More missed + extra words get template advice
+    ai_llm_user_budget: int = 30  # Gemini calls per user per window; 0 = unlimited
+    ai_llm_budget_window_seconds: float = 3600.0
+    ai_compact_prompt: bool = True  # Send excerpts around mistakes, not the whole text
+
+    # Background AI feedback jobs (feedback delivered after the score)
+    feedback_job_workers: int = 8  # Match ai_max_concurrency
+    feedback_job_max_jobs: int = 1000
+    feedback_job_ttl_seconds: float = 600.0
+
+    # AI feedback cache: same material, missed/extra words and score bucket share
+    # feedback (in-memory LRU with TTL; 0 disables)
+    feedback_cache_max_entries: int = 4096
+    feedback_cache_ttl_seconds: int = 86400
+    feedback_cache_dir: str = ""  # Optional disk tier, e.g. ".cache/feedback"
+    feedback_cache_score_bucket: float = 10.0  # Score points per bucket; 0 keys on the exact score
+
+    # Upstream HTTP clients (one pooled keep-alive client per API)
+    http_max_connections: int = 20
+    http_max_keepalive_connections: int = 10
+    http_keepalive_expiry_seconds: float = 30.0
+    http_connect_timeout_seconds: float = 5.0
+    http_timeout_seconds: float = 60.0
+    http2_enabled: bool = False  # Requires the h2 package
+
+    # TTS synthesis (per-sentence, concurrent)
+    tts_max_concurrency: int = 4
+    tts_max_retries: int = 2
+
+    # TTS audio cache (content-addressed, LRU on disk; 0 disables)
+    tts_cache_dir: str = ".cache/tts"
+    tts_cache_max_mb: int = 512
+
+    # STT uploads
+    stt_max_upload_mb: int = 25
+
+    # WAV uploads are downmixed/resampled and trimmed of silence before STT
+    stt_sample_rate: int = 16000  # 0 keeps the upload's rate and channels
+    stt_trim_silence: bool = True
+
+    # STT scheduler (global cap, fair per-user queue, backoff on upstream 429)
+    stt_max_concurrency: int = 8
+    stt_max_queue_depth: int = 100
+    stt_max_queue_wait_seconds: float = 15.0
+    stt_max_retries: int = 2
+
+    # Long recordings are split at pauses and transcribed in parallel
+    stt_timeout_seconds: float = 30.0
+    stt_split_min_seconds: float = 60.0
+    stt_split_chunk_seconds: float = 30.0
+
+    # Batch transcription
+    stt_batch_max_parts: int = 20
+    stt_batch_max_concurrency: int = 4
+
+    # STT transcript cache (in-memory LRU with TTL; 0 disables)
+    stt_cache_max_entries: int = 1024
+    stt_cache_ttl_seconds: int = 3600
+    stt_cache_dir: str = ""  # Optional disk tier, e.g. ".cache/stt"
+
+    # Per-material scoring profiles for feedback (in-memory LRU; 0 disables)
+    material_profile_cache_max_entries: int = 512
+
+    # Scoring: count sound-alike words (Metaphone keys) as correct
+    scoring_phonetic_matching: bool = False
+    scoring_phonetic_cache_size: int = 65536  # Encoded keys shared across materials
 
     # App Configuration
     environment: str = "development"
@@ -1,26 +1,109 @@
 """Database client initialization for Supabase."""
 
+import asyncio
+import threading
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, TypeVar
+
 from supabase import Client, create_client
 
 from app.config import settings
 
+T = TypeVar("T")
+
 
 class Database:
-    """Supabase database client wrapper."""
+    """
+    Supabase database client wrapper.
+
+    The Supabase Python client is synchronous, so every network call is
+    offloaded to a bounded thread pool instead of running on the event loop.
+    Query builders are cheap and local, so they are still created directly
+    via ``table()``; only ``execute()`` and storage calls go through the pool.
+    """
 
     def __init__(self):
-        """Initialize Supabase client."""
+        """Initialize Supabase client and the worker pool."""
         self.client: Client = create_client(settings.supabase_url, settings.supabase_service_key)
+        self.pool_size = settings.db_pool_size
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.pool_size, thread_name_prefix="supabase"
+        )
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._active = 0
 
     def get_client(self) -> Client:
         """Get Supabase client instance."""
         return self.client
 
+    def table(self, table_name: str):
+        """Start a query builder for a table (no I/O happens here)."""
+        return self.client.table(table_name)
+
+    def bucket(self, bucket_name: str):
+        """Get a storage bucket handle (no I/O happens here)."""
+        return self.client.storage.from_(bucket_name)
+
+    async def execute(self, query: Any) -> Any:
+        """
+        Execute a query builder in the worker pool.
+
+        Args:
+            query: Query builder returned by ``table(...)``
+
+        Returns:
+            The Supabase API response
+        """
+        return await self.run(query.execute)
+
+    async def run(self, func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """
+        Run a blocking Supabase call in the worker pool.
+
+        Args:
+            func: Blocking callable (e.g. a storage upload)
+            *args: Positional arguments for ``func``
+            **kwargs: Keyword arguments for ``func``
+
+        Returns:
+            Whatever ``func`` returns
+        """
+        with self._lock:
+            self._queued += 1
+
+        def _call() -> T:
+            with self._lock:
+                self._queued -= 1
+                self._active += 1
+            try:
+                return func(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._active -= 1
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, _call)
+
+    def stats(self) -> dict[str, int]:
+        """Get worker pool statistics."""
+        with self._lock:
+            return {
+                "pool_size": self.pool_size,
+                "active": self._active,
+                "queue_depth": self._queued,
+            }
+
+    def close(self) -> None:
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
 
 # Global database instance
 db = Database()
 
 
-def get_db() -> Client:
+def get_db() -> Database:
     """Dependency for FastAPI routes to get database client."""
-    return db.get_client()
+    return db
@@ -17,6 +17,14 @@ class SentenceCreate(SentenceBase):
     pass
 
 
+class WordTimestamp(BaseModel):
+    """Word-level timestamp within a sentence."""
+
+    word: str
+    start_time: float = Field(..., description="Start time in seconds")
+    end_time: float = Field(..., description="End time in seconds")
+
+
 class SentenceResponse(SentenceBase):
     """Sentence response model with timestamps."""
 
@@ -24,6 +32,9 @@ class SentenceResponse(SentenceBase):
     start_time: float = Field(..., description="Start time in seconds")
     end_time: float = Field(..., description="End time in seconds")
     sequence_order: int = Field(..., description="Order in the material")
+    words: list[WordTimestamp] | None = Field(
+        None, description="Word timestamps, when the TTS provided an alignment"
+    )
 
     class Config:
         from_attributes = True
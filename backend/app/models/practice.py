@@ -18,18 +18,48 @@ class TranscribeResponse(BaseModel):
     transcript: str = Field(..., description="Transcribed text")
 
 
+class BatchTranscribeItem(BaseModel):
+    """Result for one part of a batch transcription."""
+
+    index: int = Field(..., description="Position of the part in the upload")
+    status_code: int = Field(200, description="HTTP-style status for this part")
+    transcript: str | None = Field(None, description="Transcribed text, if successful")
+    error: str | None = Field(None, description="Error message, if failed")
+    retry_after: int | None = Field(None, description="Seconds to wait before retrying")
+
+
+class BatchTranscribeResponse(BaseModel):
+    """Response from batch transcription, in upload order."""
+
+    results: list[BatchTranscribeItem]
+
+
 class FeedbackRequest(BaseModel):
     """Request for feedback on practice."""
 
     material_id: str = Field(..., description="Material ID")
     user_transcript: str = Field(..., description="User's transcribed text")
+    # At most one of these narrows scoring to the sentences actually practiced
+    sentence_id: str | None = Field(None, description="Score against this sentence only")
+    sentence_range: tuple[int, int] | None = Field(
+        None, description="Score against sentences first..last (sequence order, inclusive)"
+    )
+    time_range: tuple[float, float] | None = Field(
+        None, description="Score against sentences centred in this (start, end) window, seconds"
+    )
+    async_feedback: bool = Field(
+        False, description="Return the score at once and generate AI feedback as a job"
+    )
 
 
 class WordAnalysis(BaseModel):
     """Word-level analysis."""
 
     word: str
-    status: str = Field(..., description="correct, missed, or extra")
+    status: str = Field(..., description="correct, missed, extra, or substituted")
+    spoken: str | None = Field(
+        None, description="Word said instead, if substituted or a phonetic match"
+    )
 
 
 class ComparisonResult(BaseModel):
@@ -43,13 +73,42 @@ class ComparisonResult(BaseModel):
     word_analysis: list[WordAnalysis]
 
 
+class SentenceScore(BaseModel):
+    """Score of one sentence within an attempt."""
+
+    sentence_id: str
+    sequence_order: int
+    start_time: float = Field(..., description="Start time in seconds")
+    end_time: float = Field(..., description="End time in seconds")
+    score: float = Field(..., ge=0, le=100, description="Score percentage")
+    total_words: int
+    matched_count: int
+
+
 class FeedbackResponse(BaseModel):
     """Response with score and AI feedback."""
 
     score: float = Field(..., ge=0, le=100, description="Score percentage")
     comparison: ComparisonResult
-    ai_feedback: str = Field(..., description="AI-generated feedback")
+    ai_feedback: str = Field(
+        "", description="AI-generated feedback (empty while a feedback job is pending)"
+    )
+    feedback_job_id: str | None = Field(
+        None, description="Job delivering ai_feedback, when requested asynchronously"
+    )
     xp_gained: int = Field(..., description="XP gained from this practice")
+    sentence_scores: list[SentenceScore] | None = Field(
+        None, description="Per-sentence breakdown of the scored sentences"
+    )
+
+
+class FeedbackJobResponse(BaseModel):
+    """State of an asynchronous AI feedback job."""
+
+    job_id: str
+    status: str = Field(..., description="pending, completed, or failed")
+    ai_feedback: str | None = Field(None, description="AI-generated feedback, once completed")
+    error: str | None = Field(None, description="Error message, if failed")
 
 
 class PracticeLogRequest(BaseModel):
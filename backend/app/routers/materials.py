@@ -1,18 +1,20 @@
 """Materials router for CRUD operations."""
 
-import uuid
+import tempfile
+from typing import Any
 
 from fastapi import APIRouter, Depends, HTTPException
-from supabase import Client
 
 from app.auth import get_current_user_id
-from app.database import get_db
+from app.database import Database, get_db
 from app.models.material import (
     MaterialCreateRequest,
     MaterialListItem,
     MaterialResponse,
     SentenceResponse,
 )
+from app.services.audio_cache_service import audio_cache_service
+from app.services.material_profile_service import material_profile_service
 from app.services.timestamp_service import timestamp_service
 from app.services.tts_service import tts_service
 
@@ -23,33 +25,51 @@ router = APIRouter()
 async def create_material(
     material: MaterialCreateRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Client = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """
     Create a new material with TTS audio and timestamps.
 
     Flow:
-    1. Generate audio from sentences using TTS
-    2. Upload audio to Supabase Storage
-    3. Generate timestamps for sentences
+    1. Reuse an identical track from Supabase Storage if one exists
+    2. Otherwise generate audio per sentence using TTS, join the clips
+       and upload under a content-addressed name
+    3. Derive sentence (and word) timestamps from the TTS alignment
     4. Insert material and sentences into database
     5. Return material with audio URL and sentences
     """
     try:
-        # Combine all sentences into single text for TTS
-        full_text = " ".join(material.sentences)
-
-        # Generate audio using TTS service
-        audio_bytes, duration_seconds = await tts_service.text_to_speech(full_text)
-
-        # Upload audio to Supabase Storage
-        file_name = f"{uuid.uuid4()}.wav"
-        db.storage.from_("audio-files").upload(
-            file_name, audio_bytes, file_options={"content-type": "audio/wav"}
-        )
-
-        # Get public URL
-        audio_url = db.storage.from_("audio-files").get_public_url(file_name)
+        # Audio is stored under a hash of its synthesis inputs
+        file_name = f"{tts_service.track_key(material.sentences)}.wav"
+        bucket = db.bucket("audio-files")
+        audio_url = bucket.get_public_url(file_name)
+
+        shared_track = await _find_shared_track(db, file_name, audio_url, material.sentences)
+        audio_cache_service.record_bucket_lookup(shared_track is not None)
+
+        if shared_track:
+            duration_seconds, timestamps = shared_track
+        else:
+            # Synthesize sentences concurrently into a single track on disk,
+            # then stream it to Supabase Storage without loading it in memory
+            with tempfile.NamedTemporaryFile(suffix=".wav") as track_file:
+                duration, clips = await tts_service.synthesize_sentences(
+                    material.sentences, track_file
+                )
+                with open(track_file.name, "rb") as upload_file:
+                    await db.run(
+                        bucket.upload,
+                        file_name,
+                        upload_file,
+                        file_options={"content-type": "audio/wav", "upsert": "true"},
+                    )
+
+                # Exact boundaries from the TTS alignment, or clip boundaries
+                # snapped into the pauses between sentences
+                timestamps = timestamp_service.timestamps_from_clips(
+                    clips, audio=track_file.name, include_words=True
+                )
+            duration_seconds = max(round(duration), 1)
 
         # Create material in database
         material_data = {
@@ -61,16 +81,13 @@ async def create_material(
             "created_by": user_id,
         }
 
-        material_response = db.table("materials").insert(material_data).execute()
+        material_response = await db.execute(db.table("materials").insert(material_data))
 
         if not material_response.data:
             raise HTTPException(status_code=500, detail="Failed to create material")
 
         material_id = material_response.data[0]["id"]
 
-        # Generate timestamps for sentences
-        timestamps = timestamp_service.generate_timestamps(material.sentences, duration_seconds)
-
         # Insert sentences with timestamps
         sentence_records = []
         for ts in timestamps:
@@ -80,33 +97,82 @@ async def create_material(
                 "start_time": ts["start_time"],
                 "end_time": ts["end_time"],
                 "sequence_order": ts["sequence_order"],
+                "words": ts.get("words"),
             }
             sentence_records.append(sentence_data)
 
         if sentence_records:
-            sentences_response = db.table("sentences").insert(sentence_records).execute()
+            sentences_response = await db.execute(db.table("sentences").insert(sentence_records))
 
             if not sentences_response.data:
                 # Rollback: delete material if sentences failed
-                db.table("materials").delete().eq("id", material_id).execute()
+                await db.execute(db.table("materials").delete().eq("id", material_id))
                 raise HTTPException(status_code=500, detail="Failed to create sentences")
 
         # Fetch complete material with sentences
         complete_material = await get_material_by_id(material_id, db)
 
+        # Warm the scoring profile so the first feedback needs no queries
+        material_profile_service.build(
+            material_id,
+            duration_seconds,
+            [(s.id, s.text, s.start_time, s.end_time) for s in complete_material.sentences],
+        )
+
         return complete_material
 
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+async def _find_shared_track(
+    db: Database, file_name: str, audio_url: str, sentences: list[str]
+) -> tuple[int, list[dict[str, Any]]] | None:
+    """
+    Find an existing material that already uses the same content-addressed track.
+
+    Returns:
+        Tuple of (duration_seconds, timestamps) to reuse, or None
+    """
+    material_response = await db.execute(
+        db.table("materials").select("id, duration_seconds").eq("audio_url", audio_url).limit(1)
+    )
+    if not material_response.data:
+        return None
+
+    if not await db.run(db.bucket("audio-files").exists, file_name):
+        return None
+
+    shared = material_response.data[0]
+    sentences_response = await db.execute(
+        db.table("sentences")
+        .select("start_time, end_time, sequence_order, words")
+        .eq("material_id", shared["id"])
+        .order("sequence_order")
+    )
+    if len(sentences_response.data) != len(sentences):
+        return None
+
+    timestamps = [
+        {
+            "text": text,
+            "start_time": float(s["start_time"]),
+            "end_time": float(s["end_time"]),
+            "sequence_order": s["sequence_order"],
+            "words": s.get("words"),
+        }
+        for text, s in zip(sentences, sentences_response.data, strict=True)
+    ]
+    return shared["duration_seconds"], timestamps
+
+
 @router.get("/materials", response_model=list[MaterialListItem])
 async def list_materials(
     difficulty: str | None = None,
     limit: int = 50,
     offset: int = 0,
     user_id: str = Depends(get_current_user_id),
-    db: Client = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """
     List user's materials with optional filtering.
@@ -125,7 +191,7 @@ async def list_materials(
 
         query = query.order("created_at", desc=True).limit(limit).offset(offset)
 
-        response = query.execute()
+        response = await db.execute(query)
 
         materials = []
         for material in response.data:
@@ -151,7 +217,7 @@ async def list_materials(
 
 
 @router.get("/materials/{material_id}", response_model=MaterialResponse)
-async def get_material(material_id: str, db: Client = Depends(get_db)):
+async def get_material(material_id: str, db: Database = Depends(get_db)):
     """
     Get a single material with all sentences.
     """
@@ -165,12 +231,12 @@ async def get_material(material_id: str, db: Client = Depends(get_db)):
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
-async def get_material_by_id(material_id: str, db: Client) -> MaterialResponse:
+async def get_material_by_id(material_id: str, db: Database) -> MaterialResponse:
     """
     Helper function to get material with sentences.
     """
     # Get material
-    material_response = db.table("materials").select("*").eq("id", material_id).execute()
+    material_response = await db.execute(db.table("materials").select("*").eq("id", material_id))
 
     if not material_response.data:
         raise HTTPException(status_code=404, detail="Material not found")
@@ -178,12 +244,8 @@ async def get_material_by_id(material_id: str, db: Client) -> MaterialResponse:
     material_data = material_response.data[0]
 
     # Get sentences
-    sentences_response = (
-        db.table("sentences")
-        .select("*")
-        .eq("material_id", material_id)
-        .order("sequence_order")
-        .execute()
+    sentences_response = await db.execute(
+        db.table("sentences").select("*").eq("material_id", material_id).order("sequence_order")
     )
 
     sentences = [
@@ -193,6 +255,7 @@ async def get_material_by_id(material_id: str, db: Client) -> MaterialResponse:
             start_time=s["start_time"],
             end_time=s["end_time"],
             sequence_order=s["sequence_order"],
+            words=s.get("words"),
         )
         for s in sentences_response.data
     ]
@@ -212,19 +275,15 @@ async def get_material_by_id(material_id: str, db: Client) -> MaterialResponse:
 
 @router.delete("/materials/{material_id}", status_code=204)
 async def delete_material(
-    material_id: str, user_id: str = Depends(get_current_user_id), db: Client = Depends(get_db)
+    material_id: str, user_id: str = Depends(get_current_user_id), db: Database = Depends(get_db)
 ):
     """
     Delete a material owned by the user.
     """
     try:
         # Check if material exists and is owned by user
-        material_response = (
-            db.table("materials")
-            .select("*")
-            .eq("id", material_id)
-            .eq("created_by", user_id)
-            .execute()
+        material_response = await db.execute(
+            db.table("materials").select("*").eq("id", material_id).eq("created_by", user_id)
         )
 
         if not material_response.data:
@@ -235,18 +294,27 @@ async def delete_material(
 
         material = material_response.data[0]
 
-        # Delete audio file from storage if exists
+        # Delete audio file from storage if no other material shares it
         if material.get("audio_url"):
             # Extract file name from URL
             # This is a simplified version - in production, handle URL parsing properly
             try:
-                file_name = material["audio_url"].split("/")[-1]
-                db.storage.from_("audio-files").remove([file_name])
+                shared_response = await db.execute(
+                    db.table("materials")
+                    .select("id")
+                    .eq("audio_url", material["audio_url"])
+                    .neq("id", material_id)
+                    .limit(1)
+                )
+                if not shared_response.data:
+                    file_name = material["audio_url"].split("?")[0].split("/")[-1]
+                    await db.run(db.bucket("audio-files").remove, [file_name])
             except Exception:
                 pass  # Continue even if storage deletion fails
 
         # Delete material (sentences will be cascade deleted)
-        db.table("materials").delete().eq("id", material_id).execute()
+        await db.execute(db.table("materials").delete().eq("id", material_id))
+        material_profile_service.invalidate(material_id)
 
         return None
 
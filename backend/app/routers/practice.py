@@ -1,160 +1,480 @@
 """Practice router for transcription, feedback, and logging."""
 
+import asyncio
+import json
+import math
+import os
+from collections.abc import AsyncIterator
 from datetime import date
+from typing import Any
 
-from fastapi import APIRouter, Depends, File, HTTPException, UploadFile
-from supabase import Client
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile
+from fastapi.responses import StreamingResponse
 
-from app.auth import get_current_user_id
-from app.database import get_db
+from app.auth import get_current_user_id, get_optional_user_id
+from app.config import settings
+from app.database import Database, get_db
 from app.models.practice import (
+    BatchTranscribeItem,
+    BatchTranscribeResponse,
     ComparisonResult,
     DailyGoal,
+    FeedbackJobResponse,
     FeedbackRequest,
     FeedbackResponse,
     PracticeLogRequest,
     PracticeLogResponse,
+    SentenceScore,
     TranscribeResponse,
     UserStats,
     WordAnalysis,
 )
 from app.services.ai_service import ai_service
+from app.services.audio_utils import CONTAINER_CONTENT_TYPES, CONTAINER_SNIFF_SIZE, sniff_container
+from app.services.feedback_job_service import (
+    PENDING,
+    FeedbackJob,
+    FeedbackQueueFullError,
+    feedback_job_service,
+)
 from app.services.gamification_service import GamificationService
-from app.services.scoring_service import scoring_service
+from app.services.material_profile_service import MaterialProfile, material_profile_service
+from app.services.scoring_service import ScoringProfile, scoring_service
+from app.services.stt_scheduler import STTOverloadedError
 from app.services.stt_service import stt_service
 
 router = APIRouter()
 
+SSE_KEEPALIVE_SECONDS = 15.0
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
 
 @router.post("/transcribe", response_model=TranscribeResponse)
 async def transcribe_audio(
+    request: Request,
     audio: UploadFile = File(...),
+    user_id: str | None = Depends(get_optional_user_id),
 ):
     """
     Transcribe audio file to text using STT service.
 
-    Accepts audio file upload and returns transcribed text.
+    Accepts audio file upload and returns transcribed text. The upload's
+    spooled file is streamed to the STT service without being read into
+    memory; empty, oversized or non-audio uploads are rejected up front.
+    Returns 503 with a Retry-After header when the STT upstream is saturated.
     """
     try:
-        # Read audio file
-        audio_content = await audio.read()
-
-        # Create a file-like object for the STT service
-        from io import BytesIO
-
-        audio_file = BytesIO(audio_content)
-
-        # Transcribe using STT service
-        transcript = await stt_service.speech_to_text(audio_file)
-
+        transcript = await _transcribe_upload(audio, _client_key(request, user_id))
         return TranscribeResponse(transcript=transcript)
 
+    except STTOverloadedError as e:
+        raise HTTPException(
+            status_code=503,
+            detail="Transcription is busy, please retry shortly",
+            headers={"Retry-After": str(_retry_after_seconds(e))},
+        ) from e
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Transcription failed: {str(e)}") from e
 
 
-@router.post("/feedback", response_model=FeedbackResponse)
-async def get_feedback(request: FeedbackRequest, db: Client = Depends(get_db)):
+@router.post("/transcribe/batch", response_model=BatchTranscribeResponse)
+async def transcribe_audio_batch(
+    request: Request,
+    audio: list[UploadFile] = File(...),
+    user_id: str | None = Depends(get_optional_user_id),
+):
     """
-    Generate feedback for user's practice attempt.
+    Transcribe several audio files (e.g. one per sentence) in one request.
 
-    Compares user's transcript with expected text, calculates score,
-    and generates AI feedback.
+    Parts are transcribed concurrently, at most ``stt_batch_max_concurrency``
+    at a time and through the same upstream scheduler as single uploads.
+    Results come back in upload order; a failing part gets its own status
+    code and error instead of failing the whole batch.
     """
-    try:
-        # Get material to retrieve expected text
-        expected_text = None
-        duration = 30
-
-        try:
-            material_response = (
-                db.table("materials").select("*").eq("id", request.material_id).execute()
-            )
+    if len(audio) > settings.stt_batch_max_parts:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many audio parts (max {settings.stt_batch_max_parts})",
+        )
 
-            if not material_response.data:
-                # If material not found, use demo text
-                expected_text = (
-                    "Hello, my name is John. Nice to meet you. I like to study English every day."
+    user_key = _client_key(request, user_id)
+    semaphore = asyncio.Semaphore(settings.stt_batch_max_concurrency)
+
+    async def transcribe_part(index: int, part: UploadFile) -> BatchTranscribeItem:
+        async with semaphore:
+            try:
+                transcript = await _transcribe_upload(part, user_key)
+                return BatchTranscribeItem(index=index, transcript=transcript)
+            except STTOverloadedError as e:
+                return BatchTranscribeItem(
+                    index=index,
+                    status_code=503,
+                    error="Transcription is busy, please retry shortly",
+                    retry_after=_retry_after_seconds(e),
                 )
-            else:
-                material = material_response.data[0]
-
-                # Get all sentences for this material
-                try:
-                    sentences_response = (
-                        db.table("sentences")
-                        .select("text")
-                        .eq("material_id", request.material_id)
-                        .order("sequence_order")
-                        .execute()
-                    )
-
-                    if sentences_response.data:
-                        # Combine sentences into expected text
-                        expected_text = " ".join([s["text"] for s in sentences_response.data])
-                    else:
-                        # No sentences found, use demo text
-                        expected_text = "Hello, my name is John. Nice to meet you."
-                except Exception:
-                    # If sentences table doesn't exist, use demo text
-                    expected_text = "Hello, my name is John. Nice to meet you."
-
-                duration = material.get("duration_seconds", 30)
-        except Exception:
-            # If any database error (invalid UUID, table doesn't exist, etc.)
-            if expected_text is None:
-                expected_text = (
-                    "Hello, my name is John. Nice to meet you. I like to study English every day."
+            except HTTPException as e:
+                return BatchTranscribeItem(index=index, status_code=e.status_code, error=e.detail)
+            except Exception as e:
+                return BatchTranscribeItem(
+                    index=index, status_code=500, error=f"Transcription failed: {str(e)}"
                 )
 
-        # Calculate score using scoring service
-        score_result = scoring_service.calculate_score(expected_text, request.user_transcript)
+    results = await asyncio.gather(
+        *(transcribe_part(index, part) for index, part in enumerate(audio))
+    )
+    return BatchTranscribeResponse(results=results)
 
-        # Get word analysis
-        word_analysis = scoring_service.get_word_analysis(expected_text, request.user_transcript)
-        word_analysis_models = [WordAnalysis(**wa) for wa in word_analysis]
 
-        # Generate AI feedback
-        ai_feedback_text = await ai_service.generate_feedback(
-            expected_text=expected_text,
-            user_text=request.user_transcript,
-            score=score_result["score"],
-            missed_words=score_result["missed_words"],
-            extra_words=score_result["extra_words"],
-        )
+async def _transcribe_upload(audio: UploadFile, user_key: str) -> str:
+    """Validate an audio upload and transcribe it with the STT service."""
+    container = await _validate_audio_upload(audio)
 
-        # Calculate XP gain
-        gamification = GamificationService(db)
-        xp_gained = gamification.calculate_xp_gain(score_result["score"], duration)
-
-        # Build comparison result
-        comparison = ComparisonResult(
-            expected_text=expected_text,
-            user_text=request.user_transcript,
-            matched_words=score_result["matched_words"],
-            missed_words=score_result["missed_words"],
-            extra_words=score_result["extra_words"],
-            word_analysis=word_analysis_models,
-        )
+    # Transcribe using STT service
+    return await stt_service.speech_to_text(
+        audio.file,
+        filename=f"audio.{container}",
+        content_type=CONTAINER_CONTENT_TYPES[container],
+        user_key=user_key,
+    )
+
+
+def _retry_after_seconds(error: STTOverloadedError) -> int:
+    """Round an overload retry hint up to whole seconds for Retry-After."""
+    return max(math.ceil(error.retry_after), 1)
+
+
+def _client_key(request: Request, user_id: str | None) -> str:
+    """Identify the caller for fair queuing (user ID, else client address)."""
+    if user_id:
+        return user_id
+    return f"anonymous:{request.client.host if request.client else 'unknown'}"
 
-        return FeedbackResponse(
-            score=score_result["score"],
-            comparison=comparison,
-            ai_feedback=ai_feedback_text,
-            xp_gained=xp_gained,
+
+async def _validate_audio_upload(audio: UploadFile) -> str:
+    """
+    Check an audio upload's size and container without reading its body.
+
+    Leaves the file positioned at the start.
+
+    Returns:
+        Detected container (key of ``CONTAINER_CONTENT_TYPES``)
+    """
+    size = audio.size
+    if size is None:
+        size = audio.file.seek(0, os.SEEK_END)
+
+    max_bytes = settings.stt_max_upload_mb * 1024 * 1024
+    if size == 0:
+        raise HTTPException(status_code=400, detail="Audio file is empty")
+    if size > max_bytes:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Audio file is too large (max {settings.stt_max_upload_mb} MB)",
         )
 
+    await audio.seek(0)
+    header = await audio.read(CONTAINER_SNIFF_SIZE)
+    await audio.seek(0)
+
+    container = sniff_container(header)
+    if container is None:
+        raise HTTPException(status_code=415, detail="Unsupported or invalid audio format")
+    return container
+
+
+@router.post("/feedback", response_model=FeedbackResponse)
+async def get_feedback(
+    request: FeedbackRequest,
+    http_request: Request,
+    user_id: str | None = Depends(get_optional_user_id),
+    db: Database = Depends(get_db),
+):
+    """
+    Generate feedback for user's practice attempt.
+
+    Compares user's transcript with expected text, calculates score,
+    and generates AI feedback. ``sentence_id``, ``sentence_range`` or
+    ``time_range`` restrict scoring (and the XP duration) to the sentences
+    practiced, e.g. a single looped sentence; the response then breaks the
+    score down per scored sentence.
+
+    With ``async_feedback`` the score is returned without waiting for the
+    LLM: ``ai_feedback`` is empty and ``feedback_job_id`` names a job to
+    poll (``GET /feedback/jobs/{id}``) or stream (``.../events``). If the
+    job queue is full, feedback is generated inline as usual.
+
+    Attempts where an LLM adds little (near-perfect, barely started, very
+    many mistakes) or callers over their Gemini budget get rule-based
+    feedback instead (see ``AIService``).
+    """
+    try:
+        response, feedback_params = await _score_attempt(request, db)
+        feedback_params["user_key"] = _client_key(http_request, user_id)
+
+        # Generate AI feedback, or queue it and answer with the score now
+        if request.async_feedback:
+            try:
+                job = await feedback_job_service.submit(**feedback_params)
+                response.feedback_job_id = job.job_id
+            except FeedbackQueueFullError:
+                pass
+        if response.feedback_job_id is None:
+            response.ai_feedback = await ai_service.generate_feedback(**feedback_params)
+
+        return response
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Feedback generation failed: {str(e)}") from e
+
+
+@router.post("/feedback/stream")
+async def stream_feedback(
+    request: FeedbackRequest,
+    http_request: Request,
+    user_id: str | None = Depends(get_optional_user_id),
+    db: Database = Depends(get_db),
+):
+    """
+    Score a practice attempt and stream the AI feedback as Server-Sent Events.
+
+    Accepts the same body as ``/feedback`` (``async_feedback`` is ignored).
+    Sends a ``score`` event with the ``FeedbackResponse`` (``ai_feedback``
+    empty) as soon as the attempt is scored, a ``token`` event per chunk of
+    AI text as Gemini generates it, and a ``done`` event with the full
+    text. Without Gemini, or if it fails before its first chunk, the
+    template feedback arrives as a single chunk.
+    """
+    try:
+        response, feedback_params = await _score_attempt(request, db)
+        feedback_params["user_key"] = _client_key(http_request, user_id)
     except HTTPException:
         raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Feedback generation failed: {str(e)}") from e
 
+    async def events() -> AsyncIterator[str]:
+        yield _sse("score", response.model_dump_json())
+        chunks = []
+        async for text in ai_service.stream_feedback(**feedback_params):
+            chunks.append(text)
+            yield _sse("token", json.dumps({"text": text}))
+        yield _sse("done", json.dumps({"ai_feedback": "".join(chunks).strip()}))
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+async def _score_attempt(
+    request: FeedbackRequest, db: Database
+) -> tuple[FeedbackResponse, dict[str, Any]]:
+    """
+    Score a practice attempt against its material (or the selected sentences).
+
+    Returns:
+        Tuple of (response with empty ``ai_feedback``, keyword arguments
+        for ``AIService.generate_feedback``)
+
+    Raises:
+        HTTPException: 400/404 for an invalid sentence selection
+    """
+    selectors = [request.sentence_id, request.sentence_range, request.time_range]
+    if sum(selector is not None for selector in selectors) > 1:
+        raise HTTPException(
+            status_code=400,
+            detail="Pass at most one of sentence_id, sentence_range and time_range",
+        )
+
+    # Get the material's scoring profile (cached; materials never change)
+    expected: str | ScoringProfile
+    duration = 30
+    material: MaterialProfile | None = None
+    first = 0
+
+    try:
+        material = await material_profile_service.get(db, request.material_id)
+
+        if material is None:
+            # If material not found, use demo text
+            expected = (
+                "Hello, my name is John. Nice to meet you. I like to study English every day."
+            )
+        else:
+            if material.sentence_ids:
+                expected = material.scoring
+            else:
+                # No sentences found, use demo text
+                expected = "Hello, my name is John. Nice to meet you."
+
+            duration = material.duration_seconds
+    except Exception:
+        # If any database error (invalid UUID, table doesn't exist, etc.)
+        material = None
+        expected = "Hello, my name is John. Nice to meet you. I like to study English every day."
+
+    if isinstance(expected, ScoringProfile) and material is not None:
+        selection = _select_sentences(material, request)
+        if selection is not None:
+            first, last = selection
+            expected = scoring_service.slice_profile(expected, first, last)
+            start_time, end_time = (
+                material.sentence_times[first][0],
+                material.sentence_times[last][1],
+            )
+            duration = max(math.ceil(end_time - start_time), 1)
+    elif any(selector is not None for selector in selectors):
+        raise HTTPException(status_code=404, detail="Material sentences not found")
+
+    expected_text = expected.expected_text if isinstance(expected, ScoringProfile) else expected
+
+    # Score and word analysis from a single alignment
+    score_result = scoring_service.analyze(expected, request.user_transcript)
+    word_analysis_models = [WordAnalysis(**wa) for wa in score_result["word_analysis"]]
+
+    # Calculate XP gain
+    gamification = GamificationService(db)
+    xp_gained = gamification.calculate_xp_gain(score_result["score"], duration)
+
+    # Build comparison result
+    comparison = ComparisonResult(
+        expected_text=expected_text,
+        user_text=request.user_transcript,
+        matched_words=score_result["matched_words"],
+        missed_words=score_result["missed_words"],
+        extra_words=score_result["extra_words"],
+        word_analysis=word_analysis_models,
+    )
+
+    sentence_scores = None
+    if material is not None and "sentence_scores" in score_result:
+        sentence_scores = [
+            SentenceScore(
+                sentence_id=material.sentence_ids[first + offset],
+                sequence_order=first + offset,
+                start_time=material.sentence_times[first + offset][0],
+                end_time=material.sentence_times[first + offset][1],
+                **sentence,
+            )
+            for offset, sentence in enumerate(score_result["sentence_scores"])
+        ]
+
+    response = FeedbackResponse(
+        score=score_result["score"],
+        comparison=comparison,
+        xp_gained=xp_gained,
+        sentence_scores=sentence_scores,
+    )
+    feedback_params = {
+        "expected_text": expected_text,
+        "user_text": request.user_transcript,
+        "score": score_result["score"],
+        "missed_words": score_result["missed_words"],
+        "extra_words": score_result["extra_words"],
+    }
+    return response, feedback_params
+
+
+@router.get("/feedback/jobs/{job_id}", response_model=FeedbackJobResponse)
+async def get_feedback_job(job_id: str):
+    """
+    Poll an asynchronous AI feedback job.
+
+    Returns 404 for unknown or expired jobs (they are kept for
+    ``feedback_job_ttl_seconds`` after finishing).
+    """
+    job = feedback_job_service.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Feedback job not found")
+    return _job_response(job)
+
+
+@router.get("/feedback/jobs/{job_id}/events")
+async def stream_feedback_job(job_id: str):
+    """
+    Stream an asynchronous AI feedback job as Server-Sent Events.
+
+    Sends one ``feedback`` event with the ``FeedbackJobResponse`` once the
+    job finishes (at once if it already has), with keep-alive comments
+    while it is pending, then closes the stream.
+    """
+    if feedback_job_service.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Feedback job not found")
+
+    async def events() -> AsyncIterator[str]:
+        while True:
+            job = await feedback_job_service.wait(job_id, SSE_KEEPALIVE_SECONDS)
+            if job is None:
+                yield _sse("error", json.dumps({"detail": "Feedback job expired"}))
+                return
+            if job.status != PENDING:
+                yield _sse("feedback", _job_response(job).model_dump_json())
+                return
+            yield ": keep-alive\n\n"
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _sse(event: str, data: str) -> str:
+    """Format one Server-Sent Event (``data`` must be a single line, e.g. JSON)."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _job_response(job: FeedbackJob) -> FeedbackJobResponse:
+    return FeedbackJobResponse(
+        job_id=job.job_id, status=job.status, ai_feedback=job.feedback, error=job.error
+    )
+
+
+def _select_sentences(
+    material: MaterialProfile, request: FeedbackRequest
+) -> tuple[int, int] | None:
+    """
+    Resolve a feedback request's sentence selector against a material.
+
+    Returns:
+        (first, last) sentence indices, inclusive, or None to score the
+        whole material
+
+    Raises:
+        HTTPException: 400 if the selector matches no sentence
+    """
+    count = len(material.sentence_ids)
+    if request.sentence_id is not None:
+        try:
+            index = material.sentence_ids.index(request.sentence_id)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Sentence not found in material") from None
+        return index, index
+
+    if request.sentence_range is not None:
+        first, last = request.sentence_range
+        if not 0 <= first <= last < count:
+            raise HTTPException(
+                status_code=400, detail=f"sentence_range must lie within 0..{count - 1}"
+            )
+        return first, last
+
+    if request.time_range is not None:
+        start, end = request.time_range
+        selected = [
+            index
+            for index, (sentence_start, sentence_end) in enumerate(material.sentence_times)
+            if start <= (sentence_start + sentence_end) / 2 <= end
+        ]
+        if not selected:
+            raise HTTPException(status_code=400, detail="No sentence lies within time_range")
+        return selected[0], selected[-1]
+
+    return None
+
 
 @router.post("/practice-logs", response_model=PracticeLogResponse)
 async def save_practice_log(
     request: PracticeLogRequest,
     user_id: str = Depends(get_current_user_id),
-    db: Client = Depends(get_db),
+    db: Database = Depends(get_db),
 ):
     """
     Save practice log and update user stats, streak, and achievements.
@@ -190,7 +510,7 @@ async def save_practice_log(
                 "ai_feedback": request.ai_feedback,
             }
 
-            log_response = db.table("practice_logs").insert(practice_log_data).execute()
+            log_response = await db.execute(db.table("practice_logs").insert(practice_log_data))
             if log_response.data:
                 log_id = log_response.data[0]["id"]
 
@@ -212,7 +532,9 @@ async def save_practice_log(
         )
 
         try:
-            stats_response = db.table("user_stats").select("*").eq("user_id", user_id).execute()
+            stats_response = await db.execute(
+                db.table("user_stats").select("*").eq("user_id", user_id)
+            )
             if stats_response.data:
                 user_stats = UserStats(**stats_response.data[0])
         except Exception:
@@ -228,12 +550,11 @@ async def save_practice_log(
         )
 
         try:
-            goal_response = (
+            goal_response = await db.execute(
                 db.table("daily_goals")
                 .select("*")
                 .eq("user_id", user_id)
                 .eq("goal_date", today.isoformat())
-                .execute()
             )
             if goal_response.data:
                 daily_goal = DailyGoal(**goal_response.data[0])
@@ -258,12 +579,14 @@ async def save_practice_log(
 
 
 @router.get("/stats", response_model=UserStats)
-async def get_user_stats(user_id: str = Depends(get_current_user_id), db: Client = Depends(get_db)):
+async def get_user_stats(
+    user_id: str = Depends(get_current_user_id), db: Database = Depends(get_db)
+):
     """
     Get user statistics.
     """
     try:
-        stats_response = db.table("user_stats").select("*").eq("user_id", user_id).execute()
+        stats_response = await db.execute(db.table("user_stats").select("*").eq("user_id", user_id))
 
         if not stats_response.data:
             # Return default stats if not exists
@@ -299,19 +622,20 @@ async def get_user_stats(user_id: str = Depends(get_current_user_id), db: Client
 
 
 @router.get("/daily-goal", response_model=DailyGoal)
-async def get_daily_goal(user_id: str = Depends(get_current_user_id), db: Client = Depends(get_db)):
+async def get_daily_goal(
+    user_id: str = Depends(get_current_user_id), db: Database = Depends(get_db)
+):
     """
     Get today's daily goal for the user.
     """
     try:
         today = date.today()
 
-        goal_response = (
+        goal_response = await db.execute(
             db.table("daily_goals")
             .select("*")
             .eq("user_id", user_id)
             .eq("goal_date", today.isoformat())
-            .execute()
         )
 
         if not goal_response.data:
@@ -341,19 +665,18 @@ async def get_daily_goal(user_id: str = Depends(get_current_user_id), db: Client
 
 @router.get("/practice-logs")
 async def get_practice_logs(
-    limit: int = 50, user_id: str = Depends(get_current_user_id), db: Client = Depends(get_db)
+    limit: int = 50, user_id: str = Depends(get_current_user_id), db: Database = Depends(get_db)
 ):
     """
     Get practice logs for the user.
     """
     try:
-        logs_response = (
+        logs_response = await db.execute(
             db.table("practice_logs")
             .select("*")
             .eq("user_id", user_id)
             .order("created_at", desc=True)
             .limit(limit)
-            .execute()
         )
 
         return logs_response.data if logs_response.data else []
@@ -1,11 +1,41 @@
 """AI feedback service with Google Gemini API and mock fallback."""
 
+import asyncio
 import logging
+import time
+from collections import Counter, deque
+from collections.abc import AsyncIterator
+from contextlib import aclosing
+from typing import Any
 
+from app.clients import clients
 from app.config import settings
+from app.services.feedback_cache_service import feedback_cache_service
+from app.services.scoring_service import ScoringService
 
 logger = logging.getLogger(__name__)
 
+TTFT_SAMPLES = 1000
+BUDGET_SWEEP_USERS = 10000  # Forget idle users' budgets past this many tracked users
+
+# Compact prompts
+EXCERPT_WINDOW = 3  # Words of context on each side of a missed word
+MAX_EXCERPTS = 5
+MAX_PROMPT_WORDS = 10  # Missed or extra words listed
+
+# Routing decisions: ROUTE_LLM goes to Gemini, the others are reasons for a template
+ROUTE_LLM = "llm"
+ROUTE_HIGH_SCORE = "high_score"
+ROUTE_NEAR_EMPTY = "near_empty"
+ROUTE_LARGE_DIFF = "large_diff"
+ROUTE_BUDGET = "budget"
+ROUTES = (ROUTE_LLM, ROUTE_HIGH_SCORE, ROUTE_NEAR_EMPTY, ROUTE_LARGE_DIFF, ROUTE_BUDGET)
+
+FILLER_WORDS = frozenset({"uh", "um", "er", "erm", "ah", "hmm", "mm"})
+SMALL_WORDS = frozenset(
+    {"a", "an", "the", "to", "of", "in", "on", "at", "for", "and", "or", "but", "is", "are"}
+)
+
 
 class AIService:
     """AI service for generating pronunciation feedback."""
@@ -15,6 +45,14 @@ class AIService:
         # If no API key is provided, always use mock.
         # Otherwise, attempt Gemini and fall back to mock on any error.
         self.use_mock = settings.use_mock_ai
+        self._semaphore = asyncio.Semaphore(settings.ai_max_concurrency)
+        self._counters = {"completed": 0, "timed_out": 0, "failed": 0, "streamed": 0}
+        self._ttft: deque[float] = deque(maxlen=TTFT_SAMPLES)  # Streaming time to first token
+        self._gemini_seconds = 0.0
+        self._in_flight = 0
+        self._routes = dict.fromkeys(ROUTES, 0)
+        self._llm_calls: dict[str, deque[float]] = {}  # User key -> Gemini call times
+        self._prompt_chars = 0
 
     async def generate_feedback(
         self,
@@ -23,29 +61,274 @@ class AIService:
         score: float,
         missed_words: list[str],
         extra_words: list[str],
+        user_key: str | None = None,
     ) -> str:
         """
         Generate AI feedback based on user performance.
 
+        Attempts the router (``_route``) doesn't send to Gemini get template
+        feedback. Gemini feedback is served through
+        ``feedback_cache_service``, so identical outcomes on the same
+        material (including concurrent ones) share one call; the template
+        fallback of a failed call is not cached. The per-user Gemini budget
+        is only checked and charged on a cache miss, so users who spent it
+        still get cached feedback.
+
         Args:
             expected_text: Original expected text
             user_text: User's transcribed text
             score: Calculated score (0-100)
             missed_words: Words user missed
             extra_words: Extra words user added
+            user_key: Caller identity for the per-user Gemini budget
 
         Returns:
             AI-generated feedback text
         """
-        if self.use_mock or not settings.google_api_key:
-            return self._generate_mock_feedback(
+        if (
+            self.use_mock
+            or not settings.google_api_key
+            or self._route(expected_text, user_text, score, missed_words, extra_words, user_key)
+            != ROUTE_LLM
+        ):
+            return self._generate_template_feedback(
                 expected_text, user_text, score, missed_words, extra_words
             )
-        return await self._gemini_feedback(
+
+        async def create() -> str:
+            self._charge(user_key)
+            return await self._gemini_feedback(
+                expected_text, user_text, score, missed_words, extra_words
+            )
+
+        try:
+            key = None
+            if feedback_cache_service.enabled:
+                key = feedback_cache_service.make_key(
+                    expected_text, score, missed_words, extra_words
+                )
+            if self._over_budget(user_key):
+                cached = await feedback_cache_service.get(key) if key is not None else None
+                if cached is not None:
+                    return cached
+                self._refile_over_budget(user_key)
+                return self._generate_template_feedback(
+                    expected_text, user_text, score, missed_words, extra_words
+                )
+            if key is None:
+                return await create()
+            return await feedback_cache_service.get_or_create(key, create)
+        except Exception:
+            return self._generate_template_feedback(
+                expected_text, user_text, score, missed_words, extra_words
+            )
+
+    async def stream_feedback(
+        self,
+        expected_text: str,
+        user_text: str,
+        score: float,
+        missed_words: list[str],
+        extra_words: list[str],
+        user_key: str | None = None,
+    ) -> AsyncIterator[str]:
+        """
+        Generate AI feedback as chunks of text, as Gemini produces them.
+
+        Uses the SDK's streaming API under the same concurrency limit as
+        ``generate_feedback``; the wait for a slot, the first chunk and each
+        following chunk are each bounded by ``ai_timeout_seconds``. Without
+        Gemini, for attempts the router keeps from it, or if it fails
+        before its first chunk, the template feedback is yielded as a
+        single chunk; a failure after that ends the stream early. Feedback
+        found in ``feedback_cache_service`` is yielded as a single chunk,
+        and a completed stream is stored there. As in ``generate_feedback``,
+        the per-user Gemini budget only applies on a cache miss.
+
+        Args:
+            expected_text: Original expected text
+            user_text: User's transcribed text
+            score: Calculated score (0-100)
+            missed_words: Words user missed
+            extra_words: Extra words user added
+            user_key: Caller identity for the per-user Gemini budget
+
+        Yields:
+            Chunks of feedback text
+        """
+        if (
+            not self.use_mock
+            and settings.google_api_key
+            and self._route(expected_text, user_text, score, missed_words, extra_words, user_key)
+            == ROUTE_LLM
+        ):
+            key = None
+            if feedback_cache_service.enabled:
+                key = feedback_cache_service.make_key(
+                    expected_text, score, missed_words, extra_words
+                )
+                cached = await feedback_cache_service.get(key)
+                if cached is not None:
+                    yield cached
+                    return
+
+            if self._over_budget(user_key):
+                self._refile_over_budget(user_key)
+                yield self._generate_template_feedback(
+                    expected_text, user_text, score, missed_words, extra_words
+                )
+                return
+
+            start = time.perf_counter()
+            parts: list[str] = []
+            streamed = False
+            try:
+                self._charge(user_key)
+                prompt = self._build_prompt(
+                    expected_text, user_text, score, missed_words, extra_words
+                )
+                self._prompt_chars += len(prompt)
+                async with aclosing(self._stream_gemini(prompt)) as chunks:
+                    async for text in chunks:
+                        if not streamed:
+                            streamed = True
+                            self._ttft.append(time.perf_counter() - start)
+                        parts.append(text)
+                        yield text
+                self._record("completed", time.perf_counter() - start)
+                if streamed:
+                    self._counters["streamed"] += 1
+                    if key is not None:
+                        await feedback_cache_service.put(
+                            key, "".join(parts), time.perf_counter() - start
+                        )
+                    return
+            except TimeoutError:
+                self._record("timed_out", time.perf_counter() - start)
+                logger.warning("Gemini feedback stream timed out. Falling back to template.")
+            except Exception as e:
+                self._record("failed", time.perf_counter() - start)
+                logger.warning("Gemini streaming failed (%r). Falling back to template.", e)
+            if streamed:
+                return
+
+        yield self._generate_template_feedback(
             expected_text, user_text, score, missed_words, extra_words
         )
 
-    def _generate_mock_feedback(
+    def _route(
+        self,
+        expected_text: str,
+        user_text: str,
+        score: float,
+        missed_words: list[str],
+        extra_words: list[str],
+        user_key: str | None,
+    ) -> str:
+        """
+        Decide whether an attempt's feedback is worth a Gemini call.
+
+        Templates cover the attempts an LLM can't say much more about:
+        (near-)perfect scores, transcripts that barely started (usually a
+        recording problem) and attempts with so many mistakes that the
+        advice is to slow down and retry. Every decision is logged and
+        counted; the per-user budget is checked later, on a feedback cache
+        miss (see ``_over_budget``).
+
+        Returns:
+            ``ROUTE_LLM``, or the reason for using a template
+        """
+        diff_words = len(missed_words) + len(extra_words)
+        expected_words = len(ScoringService.tokenize(expected_text))
+        spoken_words = len(ScoringService.tokenize(user_text))
+
+        if score >= settings.ai_template_min_score:
+            route = ROUTE_HIGH_SCORE
+        elif (
+            expected_words and spoken_words / expected_words < settings.ai_template_max_spoken_ratio
+        ):
+            route = ROUTE_NEAR_EMPTY
+        elif diff_words > settings.ai_llm_max_diff_words:
+            route = ROUTE_LARGE_DIFF
+        else:
+            route = ROUTE_LLM
+
+        self._routes[route] += 1
+        logger.info(
+            "Feedback route %s: score %.1f, %d missed/extra words, %d of %d words spoken, user %s",
+            route,
+            score,
+            diff_words,
+            spoken_words,
+            expected_words,
+            user_key or "-",
+        )
+        return route
+
+    def _over_budget(self, user_key: str | None) -> bool:
+        """Check whether a user has no Gemini calls left in the budget window."""
+        if not user_key or settings.ai_llm_user_budget <= 0:
+            return False
+        calls = self._llm_calls.get(user_key)
+        if calls is None:
+            return False
+        cutoff = time.time() - settings.ai_llm_budget_window_seconds
+        while calls and calls[0] <= cutoff:
+            calls.popleft()
+        if not calls:
+            del self._llm_calls[user_key]
+            return False
+        return len(calls) >= settings.ai_llm_user_budget
+
+    def _refile_over_budget(self, user_key: str | None) -> None:
+        """Move an LLM-routed attempt that missed the cache to ``ROUTE_BUDGET``."""
+        self._routes[ROUTE_LLM] -= 1
+        self._routes[ROUTE_BUDGET] += 1
+        logger.info("Feedback route %s: user %s spent the Gemini budget", ROUTE_BUDGET, user_key)
+
+    def _charge(self, user_key: str | None) -> None:
+        """Count a Gemini call against a user's budget."""
+        if not user_key or settings.ai_llm_user_budget <= 0:
+            return
+        now = time.time()
+        if user_key not in self._llm_calls and len(self._llm_calls) >= BUDGET_SWEEP_USERS:
+            cutoff = now - settings.ai_llm_budget_window_seconds
+            for key in [
+                key for key, calls in self._llm_calls.items() if not calls or calls[-1] <= cutoff
+            ]:
+                del self._llm_calls[key]
+        self._llm_calls.setdefault(user_key, deque()).append(now)
+
+    async def _stream_gemini(self, prompt: str) -> AsyncIterator[str]:
+        """Stream one Gemini request's text chunks once a concurrency slot is free."""
+        await asyncio.wait_for(self._semaphore.acquire(), settings.ai_timeout_seconds)
+        self._in_flight += 1
+        try:
+            client = clients.gemini
+            if client is None:
+                raise RuntimeError("google-genai client is unavailable")
+
+            stream = await asyncio.wait_for(
+                client.aio.models.generate_content_stream(
+                    model=settings.gemini_model,
+                    contents=prompt,
+                ),
+                settings.ai_timeout_seconds,
+            )
+            chunks = aiter(stream)
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(anext(chunks), settings.ai_timeout_seconds)
+                except StopAsyncIteration:
+                    return
+                text = getattr(chunk, "text", None)
+                if text:
+                    yield text
+        finally:
+            self._in_flight -= 1
+            self._semaphore.release()
+
+    def _generate_template_feedback(
         self,
         expected_text: str,
         user_text: str,
@@ -54,7 +337,13 @@ class AIService:
         extra_words: list[str],
     ) -> str:
         """
-        Generate template-based feedback.
+        Generate rule-based feedback.
+
+        Used for the attempts the router keeps from Gemini, without an API
+        key and when a Gemini call fails. Besides score-based encouragement
+        it points out recordings that barely started, word endings (a
+        missed word said as a variant of itself), dropped small words,
+        fillers and other added words.
 
         Args:
             expected_text: Original expected text
@@ -64,7 +353,7 @@ class AIService:
             extra_words: Extra words user added
 
         Returns:
-            Mock feedback
+            Template feedback
         """
         feedback_parts = []
 
@@ -80,19 +369,57 @@ class AIService:
         else:
             feedback_parts.append("Keep practicing! Every attempt makes you better.")
 
+        expected_words = ScoringService.tokenize(expected_text)
+        spoken_words = ScoringService.tokenize(user_text)
+        if (
+            expected_words
+            and len(spoken_words) / len(expected_words) < settings.ai_template_max_spoken_ratio
+        ):
+            # Advice on single words would miss the point
+            feedback_parts.append(
+                f"Only {len(spoken_words)} of the {len(expected_words)} words came through. "
+                "Check that your microphone is on and try reading the whole passage "
+                "along with the audio."
+            )
+            missed_words, extra_words = [], []
+
+        # Word endings: a missed word said as a variant of itself ("walk" for "walked")
+        missed, extra = list(missed_words), list(extra_words)
+        endings = []
+        for word in missed_words:
+            variant = next((other for other in extra if _is_variant(word, other)), None)
+            if variant is not None and len(endings) < 2:
+                endings.append(f'"{variant}" for "{word}"')
+                missed.remove(word)
+                extra.remove(variant)
+        if endings:
+            feedback_parts.append(f"You said {' and '.join(endings)} - watch the word endings.")
+
         # Specific feedback on mistakes
-        if missed_words:
-            if len(missed_words) <= 3:
+        small = [word for word in missed if word in SMALL_WORDS]
+        if len(small) >= 2 and len(small) * 2 >= len(missed):
+            examples = " and ".join(f'"{word}"' for word in list(dict.fromkeys(small))[:2])
+            feedback_parts.append(
+                f"Small words like {examples} are easy to swallow when shadowing; "
+                "keep them light but audible."
+            )
+        elif missed:
+            if len(missed) <= 3:
                 feedback_parts.append(
-                    f"Focus on pronouncing these words more clearly: {', '.join(missed_words)}."
+                    f"Focus on pronouncing these words more clearly: {', '.join(missed)}."
                 )
             else:
                 feedback_parts.append(
-                    f"Try to include all words - you missed {len(missed_words)} words. "
+                    f"Try to include all words - you missed {len(missed)} words. "
                     "Slow down and enunciate each word carefully."
                 )
 
-        if extra_words:
+        fillers = [word for word in extra if word in FILLER_WORDS]
+        if fillers:
+            feedback_parts.append(
+                f'Try to leave out fillers like "{fillers[0]}"; a short pause sounds more natural.'
+            )
+        elif extra:
             feedback_parts.append(
                 "Be careful not to add extra words. Listen closely to the original audio."
             )
@@ -118,6 +445,13 @@ class AIService:
         """
         Call Google Gemini API for AI-generated feedback.
 
+        Uses the SDK's async API on the app-wide client, so the event loop
+        keeps serving other requests during the LLM round trip. At most
+        ``ai_max_concurrency`` calls run at once, and each call (including
+        its wait for a slot) is bounded by ``ai_timeout_seconds``. Timeouts
+        and failures are logged and counted, then re-raised so the caller
+        can fall back to template feedback without caching it.
+
         Args:
             expected_text: Original expected text
             user_text: User's transcribed text
@@ -127,59 +461,86 @@ class AIService:
 
         Returns:
             AI-generated feedback
+
+        Raises:
+            TimeoutError: If the call took longer than ``ai_timeout_seconds``
+            Exception: Any error from the SDKs
         """
+        prompt = self._build_prompt(expected_text, user_text, score, missed_words, extra_words)
+        self._prompt_chars += len(prompt)
+        start = time.perf_counter()
         try:
-            # Try new package first (google-genai)
+            text = await asyncio.wait_for(self._call_gemini(prompt), settings.ai_timeout_seconds)
+            self._record("completed", time.perf_counter() - start)
+            return text
+        except TimeoutError:
+            self._record("timed_out", time.perf_counter() - start)
+            logger.warning(
+                "Gemini feedback timed out after %.1fs. Falling back to template.",
+                settings.ai_timeout_seconds,
+            )
+            raise
+        except Exception as e:
+            self._record("failed", time.perf_counter() - start)
+            logger.warning("Gemini API failed (%r). Falling back to template.", e)
+            raise
+
+    async def _call_gemini(self, prompt: str) -> str:
+        """Run one Gemini request once a concurrency slot is free."""
+        async with self._semaphore:
+            self._in_flight += 1
             try:
-                # Preferred import path
-                from google import genai
-            except Exception:
-                # Some environments expose it as google.genai
-                import google.genai as genai
-
-                client = genai.Client(api_key=settings.google_api_key)
-
-                prompt = f"""You are an encouraging English pronunciation coach.
-
-A student practiced shadowing this text:
-"{expected_text}"
-
-Their transcribed speech was:
-"{user_text}"
-
-They scored {score}% accuracy.
-Missed words: {", ".join(missed_words) if missed_words else "none"}
-Extra words: {", ".join(extra_words) if extra_words else "none"}
-
-Provide brief, encouraging feedback (2-3 sentences) focusing on:
-1. What they did well
-2. One specific area to improve
-3. Motivation to keep practicing
+                # New package (google-genai); the client is shared app-wide
+                client = clients.gemini
+                if client is None:
+                    raise RuntimeError("google-genai client is unavailable")
 
-Keep it friendly, supportive, and actionable."""
-
-                response = client.models.generate_content(
-                    model="gemini-1.5-flash",
+                response = await client.aio.models.generate_content(
+                    model=settings.gemini_model,
                     contents=prompt,
                 )
 
-            text = getattr(response, "text", None)
-            if isinstance(text, str) and text.strip():
-                return text.strip()
-
-            # Defensive fallback in case SDK response shape differs
-            return str(response)
-
-        except Exception as new_sdk_error:
-            # Fall back to old package only if it's available.
-            # This package is deprecated upstream, so we keep it as a last resort.
-            try:
-                import google.generativeai as genai
-
-                genai.configure(api_key=settings.google_api_key)
-                model = genai.GenerativeModel("gemini-pro")
+                text = getattr(response, "text", None)
+                if isinstance(text, str) and text.strip():
+                    return text.strip()
+
+                # Defensive fallback in case SDK response shape differs
+                return str(response)
+
+            except Exception as new_sdk_error:
+                # Fall back to old package only if it's available.
+                # This package is deprecated upstream, so we keep it as a last resort.
+                try:
+                    import google.generativeai as genai
+
+                    genai.configure(api_key=settings.google_api_key)
+                    model = genai.GenerativeModel("gemini-pro")
+                    response = await model.generate_content_async(prompt)
+                    return response.text
+                except Exception as old_sdk_error:
+                    raise RuntimeError(
+                        f"new SDK: {new_sdk_error!r}, old SDK: {old_sdk_error!r}"
+                    ) from old_sdk_error
+            finally:
+                self._in_flight -= 1
+
+    @staticmethod
+    def _build_prompt(
+        expected_text: str,
+        user_text: str,
+        score: float,
+        missed_words: list[str],
+        extra_words: list[str],
+    ) -> str:
+        """
+        Build the coaching prompt for Gemini.
 
-                prompt = f"""You are an encouraging English pronunciation coach.
+        With ``ai_compact_prompt`` the text and transcript are replaced by
+        short excerpts of the text around the missed words, so prompt
+        tokens (and latency) stay flat however long the material is.
+        """
+        if not settings.ai_compact_prompt:
+            return f"""You are an encouraging English pronunciation coach.
 
 A student practiced shadowing this text:
 "{expected_text}"
@@ -198,17 +559,97 @@ Provide brief, encouraging feedback (2-3 sentences) focusing on:
 
 Keep it friendly, supportive, and actionable."""
 
-                response = await model.generate_content_async(prompt)
-                return response.text
-            except Exception as old_sdk_error:
-                logger.warning(
-                    "Gemini API failed (new=%s, old=%s). Falling back to mock.",
-                    repr(new_sdk_error),
-                    repr(old_sdk_error),
-                )
-            return self._generate_mock_feedback(
-                expected_text, user_text, score, missed_words, extra_words
-            )
+        words = ScoringService.tokenize(expected_text)
+        lines = [
+            "You are an encouraging English pronunciation coach.",
+            "",
+            f"A student shadowed a {len(words)}-word text and scored {score}% accuracy.",
+        ]
+        excerpts = _excerpts(words, missed_words)
+        if excerpts:
+            lines.append("Where they slipped (missed words in [brackets]):")
+            lines.extend(f'"{excerpt}"' for excerpt in excerpts)
+        lines += [
+            f"Missed words: {_word_list(missed_words)}",
+            f"Extra words: {_word_list(extra_words)}",
+            "",
+            "Provide brief, encouraging feedback (2-3 sentences) focusing on:",
+            "1. What they did well",
+            "2. One specific area to improve",
+            "3. Motivation to keep practicing",
+            "",
+            "Keep it friendly, supportive, and actionable.",
+        ]
+        return "\n".join(lines)
+
+    def _record(self, outcome: str, seconds: float) -> None:
+        self._counters[outcome] += 1
+        self._gemini_seconds += seconds
+
+    def stats(self) -> dict[str, Any]:
+        """Get Gemini call and routing statistics."""
+        calls = self._counters["completed"] + self._counters["timed_out"]
+        calls += self._counters["failed"]
+        ttft = sorted(self._ttft)
+        routed = sum(self._routes.values())
+        avoided = routed - self._routes[ROUTE_LLM]
+        return {
+            **self._counters,
+            "in_flight": self._in_flight,
+            "max_concurrency": settings.ai_max_concurrency,
+            "timeout_seconds": settings.ai_timeout_seconds,
+            "avg_seconds": round(self._gemini_seconds / calls, 3) if calls else 0.0,
+            "avg_ttft_seconds": round(sum(ttft) / len(ttft), 3) if ttft else 0.0,
+            "p95_ttft_seconds": round(ttft[int(len(ttft) * 0.95)], 3) if ttft else 0.0,
+            "avg_prompt_chars": round(self._prompt_chars / calls) if calls else 0,
+            "routes": dict(self._routes),
+            "llm_avoided_ratio": round(avoided / routed, 3) if routed else 0.0,
+            "budget_users": len(self._llm_calls),
+        }
+
+
+def _is_variant(word: str, other: str) -> bool:
+    """Check if two words differ only in their ending ("walk"/"walked", "cat"/"cats")."""
+    short, long = sorted((word, other), key=len)
+    return (
+        len(short) >= 3 and long != short and long.startswith(short) and len(long) - len(short) <= 3
+    )
+
+
+def _excerpts(words: list[str], missed_words: list[str]) -> list[str]:
+    """Cut excerpts of the text around (the first occurrences of) the missed words."""
+    remaining = Counter(missed_words)
+    marked = []
+    for index, word in enumerate(words):
+        if remaining[word] > 0:
+            remaining[word] -= 1
+            marked.append(index)
+            if len(marked) == MAX_EXCERPTS:
+                break
+
+    spans: list[list[int]] = []  # Merged [start, end) windows
+    for index in marked:
+        start, end = max(index - EXCERPT_WINDOW, 0), min(index + EXCERPT_WINDOW + 1, len(words))
+        if spans and start <= spans[-1][1]:
+            spans[-1][1] = end
+        else:
+            spans.append([start, end])
+
+    marks = set(marked)
+    excerpts = []
+    for start, end in spans:
+        text = " ".join(f"[{words[i]}]" if i in marks else words[i] for i in range(start, end))
+        excerpts.append(f"{'... ' if start else ''}{text}{' ...' if end < len(words) else ''}")
+    return excerpts
+
+
+def _word_list(words: list[str]) -> str:
+    """List words for a compact prompt, capped at ``MAX_PROMPT_WORDS``."""
+    if not words:
+        return "none"
+    listed = ", ".join(words[:MAX_PROMPT_WORDS])
+    more = len(words) - MAX_PROMPT_WORDS
+    return f"{listed} (and {more} more)" if more > 0 else listed
 
 
 # Global AI service instance
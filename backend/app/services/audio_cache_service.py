@@ -0,0 +1,210 @@
+"""Content-addressed cache for synthesized TTS audio."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AudioCacheService:
+    """
+    Disk-backed LRU cache for TTS clips (and their alignment), keyed by a hash
+    of the synthesis inputs.
+
+    Identical text with identical voice/model/settings always produces the
+    same key, so re-created materials skip the TTS call entirely. The
+    storage bucket acts as a second tier for whole tracks (see
+    ``record_bucket_lookup``); this class only keeps the counters for it.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int):
+        """Initialize audio cache."""
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self._index: OrderedDict[str, int] = OrderedDict()  # key -> size, oldest first
+        self._size = 0
+        self._loaded = False
+        self._lock = threading.Lock()
+        self._counters = {
+            "disk_hits": 0,
+            "disk_misses": 0,
+            "bucket_hits": 0,
+            "bucket_misses": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Check if the disk tier is enabled."""
+        return self.max_bytes > 0
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalize text so trivially different inputs share a key."""
+        return " ".join(unicodedata.normalize("NFC", text).split())
+
+    @classmethod
+    def make_key(
+        cls,
+        text: str,
+        voice_id: str,
+        model_id: str,
+        voice_settings: dict[str, Any],
+        output_format: str,
+        previous_text: str | None = None,
+        next_text: str | None = None,
+    ) -> str:
+        """
+        Build the content address for a synthesized clip.
+
+        The neighbouring sentences are part of the address because the TTS
+        API uses them to shape the clip's prosody.
+
+        Args:
+            text: Text to synthesize
+            voice_id: TTS voice ID
+            model_id: TTS model ID
+            voice_settings: Voice settings sent to the TTS API
+            output_format: Audio output format
+            previous_text: Preceding sentence sent as context, if any
+            next_text: Following sentence sent as context, if any
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        fields = {
+            "text": cls.normalize_text(text),
+            "voice_id": voice_id,
+            "model_id": model_id,
+            "voice_settings": voice_settings,
+            "output_format": output_format,
+        }
+        # Only present when set, so clips synthesized without context keep their address
+        if previous_text:
+            fields["previous_text"] = cls.normalize_text(previous_text)
+        if next_text:
+            fields["next_text"] = cls.normalize_text(next_text)
+        payload = json.dumps(
+            fields,
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> bytes | None:
+        """
+        Get a cached clip.
+
+        Args:
+            key: Content address from ``make_key``
+
+        Returns:
+            Cached audio bytes, or None on a miss
+        """
+        if not self.enabled:
+            return None
+        data = await asyncio.to_thread(self._read, key)
+        with self._lock:
+            self._counters["disk_hits" if data is not None else "disk_misses"] += 1
+        return data
+
+    async def put(self, key: str, data: bytes) -> None:
+        """
+        Store a clip, evicting least recently used entries over the size limit.
+
+        Args:
+            key: Content address from ``make_key``
+            data: Audio bytes
+        """
+        if not self.enabled or len(data) > self.max_bytes:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, data)
+        except OSError as e:
+            logger.warning("Failed to write TTS cache entry %s: %r", key, e)
+
+    def record_bucket_lookup(self, hit: bool) -> None:
+        """Count a whole-track lookup against the storage bucket."""
+        with self._lock:
+            self._counters["bucket_hits" if hit else "bucket_misses"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            return {
+                **self._counters,
+                "entries": len(self._index),
+                "size_bytes": self._size,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from files on disk (oldest mtime first)."""
+        entries = []
+        if self.cache_dir.exists():
+            for path in self.cache_dir.glob("*/*.bin"):
+                stat = path.stat()
+                entries.append((stat.st_mtime, path.stem, stat.st_size))
+        entries.sort()
+        for _, key, size in entries:
+            self._index[key] = size
+            self._size += size
+        self._loaded = True
+
+    def _read(self, key: str) -> bytes | None:
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Persist recency across restarts
+            return data
+        except OSError:
+            with self._lock:
+                self._size -= self._index.pop(key, 0)
+            return None
+
+    def _write(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        evicted = []
+        with self._lock:
+            if not self._loaded:
+                self._load_index()
+            self._size -= self._index.pop(key, 0)
+            self._index[key] = len(data)
+            self._size += len(data)
+            while self._size > self.max_bytes and self._index:
+                old_key, old_size = self._index.popitem(last=False)
+                self._size -= old_size
+                evicted.append(old_key)
+
+        for old_key in evicted:
+            self._path(old_key).unlink(missing_ok=True)
+
+
+# Global audio cache instance
+audio_cache_service = AudioCacheService(
+    settings.tts_cache_dir, settings.tts_cache_max_mb * 1024 * 1024
+)
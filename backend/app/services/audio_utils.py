@@ -0,0 +1,405 @@
+"""Audio helpers shared by the TTS/STT services (16-bit PCM WAV)."""
+
+import io
+import math
+import os
+from pathlib import Path
+from typing import BinaryIO
+
+import numpy as np
+
+# Output format used for all generated material audio
+SAMPLE_RATE = 22050
+NUM_CHANNELS = 1
+BITS_PER_SAMPLE = 16
+BYTES_PER_SAMPLE = NUM_CHANNELS * BITS_PER_SAMPLE // 8
+BYTES_PER_SECOND = SAMPLE_RATE * BYTES_PER_SAMPLE
+WAV_HEADER_SIZE = 44
+
+# Frames processed per block when computing energy (bounds float32 temporaries)
+ENERGY_BLOCK_FRAMES = 4096
+
+# Splitting long recordings at pauses
+SPLIT_SILENCE_DB = 35.0  # Frames this far below the loudest frame count as silence
+SPLIT_MAX_CHUNK_RATIO = 1.5  # Chunks may stretch to this multiple of the target to reach a pause
+
+# Trimming silence before STT
+TRIM_SILENCE_DB = 40.0  # Frames this far below the loudest frame count as silence
+TRIM_MIN_PEAK_DB = -60.0  # Recordings whose loudest frame is quieter than this are all silence
+TRIM_PADDING_SECONDS = 0.25  # Kept around the speech so word onsets/releases aren't clipped
+
+# Resampling reads taps as strided column views, instead of gathering them,
+# when a period has at most this many (e.g. 48 kHz -> 16 kHz)
+RESAMPLE_MAX_COLUMN_TAPS = 16
+
+# MIME types of the upload containers accepted for transcription
+CONTAINER_CONTENT_TYPES = {
+    "webm": "audio/webm",
+    "ogg": "audio/ogg",
+    "wav": "audio/wav",
+    "flac": "audio/flac",
+    "mp4": "audio/mp4",
+    "aac": "audio/aac",
+    "mp3": "audio/mpeg",
+}
+
+# Bytes needed to recognize any of the containers above
+CONTAINER_SNIFF_SIZE = 12
+
+
+def wav_header(
+    data_size: int,
+    sample_rate: int = SAMPLE_RATE,
+    num_channels: int = NUM_CHANNELS,
+    bits_per_sample: int = BITS_PER_SAMPLE,
+) -> bytes:
+    """
+    Build a canonical 44-byte PCM WAV header.
+
+    Args:
+        data_size: Size of the PCM data chunk in bytes
+        sample_rate: Samples per second
+        num_channels: Number of channels
+        bits_per_sample: Bits per sample
+
+    Returns:
+        WAV header bytes
+    """
+    block_align = num_channels * bits_per_sample // 8
+
+    header = bytearray()
+    header.extend(b"RIFF")
+    header.extend((36 + data_size).to_bytes(4, "little"))
+    header.extend(b"WAVE")
+    header.extend(b"fmt ")
+    header.extend((16).to_bytes(4, "little"))  # Format chunk size
+    header.extend((1).to_bytes(2, "little"))  # Audio format (PCM)
+    header.extend(num_channels.to_bytes(2, "little"))
+    header.extend(sample_rate.to_bytes(4, "little"))
+    header.extend((sample_rate * block_align).to_bytes(4, "little"))
+    header.extend(block_align.to_bytes(2, "little"))
+    header.extend(bits_per_sample.to_bytes(2, "little"))
+    header.extend(b"data")
+    header.extend(data_size.to_bytes(4, "little"))
+    return bytes(header)
+
+
+def sniff_container(header: bytes) -> str | None:
+    """
+    Identify an audio container from its first bytes.
+
+    Args:
+        header: At least ``CONTAINER_SNIFF_SIZE`` bytes from the start of the file
+
+    Returns:
+        Key of ``CONTAINER_CONTENT_TYPES``, or None if unrecognized
+    """
+    if header.startswith(b"\x1a\x45\xdf\xa3"):  # EBML (WebM/Matroska)
+        return "webm"
+    if header.startswith(b"OggS"):
+        return "ogg"
+    if header.startswith(b"RIFF") and header[8:12] == b"WAVE":
+        return "wav"
+    if header.startswith(b"fLaC"):
+        return "flac"
+    if header[4:8] == b"ftyp":  # ISO base media (MP4/M4A)
+        return "mp4"
+    if len(header) >= 2 and header[0] == 0xFF and header[1] & 0xF6 == 0xF0:  # ADTS
+        return "aac"
+    if header.startswith(b"ID3") or (
+        len(header) >= 2 and header[0] == 0xFF and header[1] & 0xE0 == 0xE0
+    ):  # MPEG audio frame sync
+        return "mp3"
+    return None
+
+
+def pcm_duration(data_size: int) -> float:
+    """Get duration in seconds of a PCM data chunk in the default format."""
+    return data_size / BYTES_PER_SECOND
+
+
+def parse_wav_header(data: bytes | memoryview) -> tuple[int, int, int, int, int]:
+    """
+    Locate the fmt and data chunks of a RIFF/WAVE buffer.
+
+    Args:
+        data: Start of a WAV file (must include the data chunk header)
+
+    Returns:
+        Tuple of (sample_rate, num_channels, bits_per_sample, data_offset, data_size)
+
+    Raises:
+        ValueError: If the buffer is not a 16-bit PCM WAV file
+    """
+    if bytes(data[:4]) != b"RIFF" or bytes(data[8:12]) != b"WAVE":
+        raise ValueError("Not a WAV file")
+
+    fmt = None
+    pos = 12
+    while pos + 8 <= len(data):
+        chunk_id = bytes(data[pos : pos + 4])
+        chunk_size = int.from_bytes(data[pos + 4 : pos + 8], "little")
+        body = pos + 8
+
+        if chunk_id == b"fmt ":
+            audio_format = int.from_bytes(data[body : body + 2], "little")
+            num_channels = int.from_bytes(data[body + 2 : body + 4], "little")
+            sample_rate = int.from_bytes(data[body + 4 : body + 8], "little")
+            bits_per_sample = int.from_bytes(data[body + 14 : body + 16], "little")
+            # 0xFFFE is WAVE_FORMAT_EXTENSIBLE, which wraps plain PCM here
+            if audio_format not in (1, 0xFFFE) or bits_per_sample != 16:
+                raise ValueError("Only 16-bit PCM WAV is supported")
+            fmt = (sample_rate, num_channels, bits_per_sample)
+        elif chunk_id == b"data":
+            if fmt is None:
+                raise ValueError("WAV data chunk appears before fmt chunk")
+            return (*fmt, body, chunk_size)
+
+        pos = body + chunk_size + (chunk_size & 1)
+
+    raise ValueError("WAV data chunk not found")
+
+
+def decode_wav(source: bytes | memoryview | str | Path | BinaryIO) -> tuple[np.ndarray, int]:
+    """
+    Decode 16-bit PCM WAV without copying the sample data.
+
+    In-memory buffers are wrapped with ``np.frombuffer`` and files are
+    memory-mapped, so even long recordings don't add to resident memory.
+
+    Args:
+        source: WAV bytes, a path to a WAV file, or an open binary file
+            (``BytesIO`` or backed by a file descriptor, like an upload's
+            spooled file)
+
+    Returns:
+        Tuple of (samples, sample_rate); samples is int16 with shape
+        (n,) for mono or (n, channels) otherwise
+    """
+    if isinstance(source, str | Path):
+        path = Path(source)
+        with path.open("rb") as f:
+            header = f.read(64 * 1024)
+        available = path.stat().st_size
+    elif hasattr(source, "read"):
+        source.seek(0)
+        header = source.read(64 * 1024)
+        available = source.seek(0, os.SEEK_END)
+        source.seek(0)
+    else:
+        header = source
+        available = len(source)
+
+    sample_rate, num_channels, bits_per_sample, offset, size = parse_wav_header(header)
+
+    # Streamed WAVs may carry a placeholder size; trust the real length instead
+    block_align = num_channels * bits_per_sample // 8
+    size = min(size, available - offset) if size else available - offset
+    count = (size // block_align) * num_channels
+
+    if isinstance(source, io.BytesIO):
+        samples = np.frombuffer(source.getbuffer(), dtype="<i2", count=count, offset=offset)
+    elif isinstance(source, str | Path) or hasattr(source, "read"):
+        if count == 0:
+            samples = np.zeros(0, dtype="<i2")
+        else:
+            samples = np.memmap(source, dtype="<i2", mode="r", offset=offset, shape=(count,))
+    else:
+        samples = np.frombuffer(source, dtype="<i2", count=count, offset=offset)
+
+    if num_channels > 1:
+        samples = samples.reshape(-1, num_channels)
+    return samples, sample_rate
+
+
+def to_mono(samples: np.ndarray) -> np.ndarray:
+    """Downmix (n, channels) samples to mono; mono input is returned unchanged."""
+    if samples.ndim == 1:
+        return samples
+    total = samples[:, 0].astype(np.int32)
+    for channel in range(1, samples.shape[1]):
+        total += samples[:, channel]
+    total //= samples.shape[1]
+    return total.astype(np.int16)
+
+
+def frame_length(sample_rate: int, frame_ms: float) -> int:
+    """Get the number of samples in an analysis frame."""
+    return max(int(sample_rate * frame_ms / 1000), 1)
+
+
+def frame_energy_db(samples: np.ndarray, sample_rate: int, frame_ms: float = 10.0) -> np.ndarray:
+    """
+    Compute per-frame RMS energy in dBFS.
+
+    Args:
+        samples: Mono int16 samples
+        sample_rate: Samples per second
+        frame_ms: Frame length in milliseconds
+
+    Returns:
+        float32 array with one dBFS value per full frame
+    """
+    frame_len = frame_length(sample_rate, frame_ms)
+    num_frames = len(samples) // frame_len
+    frames = samples[: num_frames * frame_len].reshape(num_frames, frame_len)
+
+    energy = np.empty(num_frames, dtype=np.float32)
+    for start in range(0, num_frames, ENERGY_BLOCK_FRAMES):
+        block = frames[start : start + ENERGY_BLOCK_FRAMES].astype(np.float32)
+        # Sum of squares per frame in one pass, without a squared temporary
+        np.einsum("ij,ij->i", block, block, out=energy[start : start + ENERGY_BLOCK_FRAMES])
+
+    energy *= 1.0 / (32768.0 * 32768.0 * frame_len)
+    energy += 1e-10  # Avoid log(0) on digital silence
+    np.log10(energy, out=energy)
+    energy *= 10.0
+    return energy
+
+
+def find_split_points(
+    samples: np.ndarray,
+    sample_rate: int,
+    chunk_seconds: float,
+    frame_ms: float = 10.0,
+) -> list[int]:
+    """
+    Choose where to cut a long recording so chunks end in pauses.
+
+    Silent runs are found with a vectorized energy VAD. Each cut goes in
+    the longest pause between half and ``SPLIT_MAX_CHUNK_RATIO`` times the
+    target length after the previous cut (preferring pauses near the
+    target); if there is none, the chunk is cut at the target length.
+
+    Args:
+        samples: Mono int16 samples
+        sample_rate: Samples per second
+        chunk_seconds: Target chunk length in seconds
+        frame_ms: Analysis frame length in milliseconds
+
+    Returns:
+        Sample offsets of the cuts, ascending (empty if no split is needed)
+    """
+    frame_len = frame_length(sample_rate, frame_ms)
+    energy = frame_energy_db(samples, sample_rate, frame_ms)
+    num_frames = len(energy)
+    chunk_frames = max(int(chunk_seconds * sample_rate / frame_len), 1)
+    max_frames = int(chunk_frames * SPLIT_MAX_CHUNK_RATIO)
+    if num_frames <= max_frames:
+        return []
+
+    quiet = energy < energy.max() - SPLIT_SILENCE_DB
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], quiet.view(np.int8), [0]))))
+    run_starts, run_ends = edges[::2], edges[1::2]
+    centres = (run_starts + run_ends) // 2
+    lengths = run_ends - run_starts
+
+    cuts = []
+    position = 0
+    while num_frames - position > max_frames:
+        target = position + chunk_frames
+        candidates = np.flatnonzero(
+            (centres > position + chunk_frames // 2) & (centres < position + max_frames)
+        )
+        if len(candidates):
+            # Longest pause wins; distance from the target breaks near-ties
+            score = lengths[candidates] - np.abs(centres[candidates] - target) / chunk_frames
+            position = int(centres[candidates[np.argmax(score)]])
+        else:
+            position = target
+        cuts.append(position * frame_len)
+    return cuts
+
+
+def trim_silence(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: float = 10.0,
+    padding_seconds: float = TRIM_PADDING_SECONDS,
+) -> tuple[int, int]:
+    """
+    Find the span of a recording between its leading and trailing silence.
+
+    Uses the same frame-energy VAD as ``find_split_points``; frames more
+    than ``TRIM_SILENCE_DB`` below the loudest one are silence. Pauses
+    inside the speech are kept.
+
+    Args:
+        samples: Mono int16 samples
+        sample_rate: Samples per second
+        frame_ms: Analysis frame length in milliseconds
+        padding_seconds: Audio kept on either side of the speech
+
+    Returns:
+        Tuple of (start, end) sample offsets; (0, 0) if the recording is
+        all silence
+    """
+    energy = frame_energy_db(samples, sample_rate, frame_ms)
+    if not len(energy):
+        return 0, len(samples)
+
+    peak = energy.max()
+    if peak < TRIM_MIN_PEAK_DB:
+        return 0, 0
+
+    voiced = np.flatnonzero(energy >= peak - TRIM_SILENCE_DB)
+    frame_len = frame_length(sample_rate, frame_ms)
+    padding = int(padding_seconds * sample_rate)
+    start = max(int(voiced[0]) * frame_len - padding, 0)
+    end = min((int(voiced[-1]) + 1) * frame_len + padding, len(samples))
+    return start, end
+
+
+def resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """
+    Downmix to mono and downsample int16 samples to a lower rate.
+
+    Each output sample is the mean of the input samples (across all
+    channels) it covers: a box anti-alias filter evaluated only at the
+    output positions. That is a crude low-pass, but speech energy sits well
+    below the new Nyquist frequency, which is all STT needs. The sample
+    positions repeat every ``sample_rate / gcd`` inputs (441 at 44.1 kHz ->
+    16 kHz), and a period's taps never reach into the next one, so the
+    input is viewed as one row per period without copying. Whole frames
+    (every channel of one instant) are gathered per tap and downmixed
+    there, so only the taps are read; with a few outputs per period (48 kHz
+    -> 16 kHz) the taps are strided column views and nothing is gathered.
+    A trailing partial period (under 10 ms at common rates) is dropped.
+    Input already at or below the target rate is only downmixed.
+
+    Args:
+        samples: int16 samples, shape (n,) or (n, channels)
+        sample_rate: Samples per second of the input
+        target_rate: Samples per second of the output
+
+    Returns:
+        Mono int16 samples at ``target_rate`` (or at ``sample_rate`` if
+        that is already low enough)
+    """
+    width = -(-sample_rate // target_rate)  # Input samples per output sample, rounded up
+    divisor = math.gcd(sample_rate, target_rate)
+    period_in, period_out = sample_rate // divisor, target_rate // divisor
+    num_periods = len(samples) // period_in
+    if sample_rate <= target_rate or num_periods <= 0:
+        return to_mono(samples)
+
+    num_channels = samples.shape[1] if samples.ndim > 1 else 1
+    taps = width * num_channels
+    flat = np.ascontiguousarray(samples).reshape(-1)[: num_periods * period_in * num_channels]
+    columns = np.arange(period_out) * sample_rate // target_rate
+
+    total = np.zeros((num_periods, period_out), dtype=np.int32)
+    if period_out * taps <= RESAMPLE_MAX_COLUMN_TAPS:
+        rows = flat.reshape(num_periods, period_in * num_channels)
+        for index, column in enumerate(columns * num_channels):
+            for tap in range(taps):
+                total[:, index] += rows[:, column + tap]
+    else:
+        # Frames as single items, so each tap is one gather of all channels
+        rows = flat.view(np.dtype((np.void, 2 * num_channels))).reshape(num_periods, period_in)
+        for tap in range(width):
+            gathered = rows.take(columns + tap, axis=1).view("<i2")
+            for channel in range(num_channels):
+                total += gathered[:, channel::num_channels]
+    total //= taps
+    return total.astype(np.int16).ravel()
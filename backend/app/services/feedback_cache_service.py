@@ -0,0 +1,87 @@
+"""Cache for AI feedback, keyed by a canonical signature of the scoring outcome."""
+
+import hashlib
+import json
+from typing import Any
+
+from app.config import settings
+from app.services.text_cache import TextCache
+
+
+class FeedbackCacheService(TextCache):
+    """
+    Two-tier AI feedback cache with request coalescing.
+
+    Attempts at the same material with the same missed and extra words and
+    a score in the same bucket get the same feedback, so most repeats of a
+    common mistake skip the Gemini call. Wider buckets raise the hit ratio
+    at the cost of feedback variety; ``stats`` reports both sides.
+    """
+
+    def __init__(
+        self, max_entries: int, ttl_seconds: float, cache_dir: str = "", score_bucket: float = 10.0
+    ):
+        """Initialize feedback cache."""
+        super().__init__(max_entries, ttl_seconds, cache_dir)
+        self.score_bucket = score_bucket
+
+    def make_key(
+        self,
+        expected_text: str,
+        score: float,
+        missed_words: list[str],
+        extra_words: list[str],
+    ) -> str:
+        """
+        Hash the canonical signature of an attempt's outcome.
+
+        The material is identified by its whitespace- and case-normalized
+        text, the words are compared as sorted lowercase multisets and the
+        score by its bucket. The transcript itself is not part of the key:
+        beyond the missed and extra words it only adds noise.
+
+        Args:
+            expected_text: Original expected text
+            score: Calculated score (0-100)
+            missed_words: Words user missed
+            extra_words: Extra words user added
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        signature = {
+            "text": hashlib.sha256(" ".join(expected_text.lower().split()).encode()).hexdigest(),
+            "missed": sorted(word.lower() for word in missed_words),
+            "extra": sorted(word.lower() for word in extra_words),
+            "bucket": self.bucket(score),
+            "model": settings.gemini_model,
+        }
+        return hashlib.sha256(json.dumps(signature, sort_keys=True).encode()).hexdigest()
+
+    def bucket(self, score: float) -> float:
+        """
+        Get the score bucket of a score.
+
+        Args:
+            score: Calculated score (0-100)
+
+        Returns:
+            Index of the ``score_bucket``-wide bucket, or the score rounded to
+            two decimals if bucketing is off (width 0)
+        """
+        if self.score_bucket <= 0:
+            return round(score, 2)
+        return score // self.score_bucket
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        return {**super().stats(), "score_bucket": self.score_bucket}
+
+
+# Global feedback cache instance
+feedback_cache_service = FeedbackCacheService(
+    settings.feedback_cache_max_entries,
+    settings.feedback_cache_ttl_seconds,
+    settings.feedback_cache_dir,
+    settings.feedback_cache_score_bucket,
+)
@@ -0,0 +1,226 @@
+"""Background generation of AI feedback, decoupled from scoring."""
+
+import asyncio
+import logging
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+from app.services.ai_service import ai_service
+
+logger = logging.getLogger(__name__)
+
+PENDING = "pending"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class FeedbackQueueFullError(Exception):
+    """Raised when ``max_jobs`` feedback jobs are already pending."""
+
+
+class FeedbackJob:
+    """One AI feedback request and, once a worker has run it, its result."""
+
+    __slots__ = ("job_id", "status", "feedback", "error", "created_at", "finished_at", "done")
+
+    def __init__(self, job_id: str):
+        """Initialize a pending job."""
+        self.job_id = job_id
+        self.status = PENDING
+        self.feedback: str | None = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self.done = asyncio.Event()
+
+
+class FeedbackJobService:
+    """
+    Queue of AI feedback jobs served by a fixed pool of worker tasks.
+
+    ``submit`` returns a job ID at once, so a score can be returned without
+    waiting for the LLM; clients poll ``get`` or wait on ``wait`` (the SSE
+    endpoint) for the text. Jobs live in memory for ``ttl_seconds`` after
+    finishing, at most ``max_jobs`` of them; a job is only visible to the
+    worker process that created it.
+    """
+
+    def __init__(self, workers: int, max_jobs: int, ttl_seconds: float):
+        """Initialize feedback job service."""
+        self.workers = max(workers, 1)
+        self.max_jobs = max_jobs
+        self.ttl_seconds = ttl_seconds
+        self._jobs: OrderedDict[str, FeedbackJob] = OrderedDict()  # Oldest first
+        self._queue: asyncio.Queue[tuple[FeedbackJob, dict[str, Any]]] | None = None
+        self._tasks: list[asyncio.Task[None]] = []
+        self._counters = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "expired": 0,
+        }
+        self._queue_seconds = 0.0
+        self._run_seconds = 0.0
+
+    async def start(self) -> None:
+        """Start the worker tasks (called on application startup)."""
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def close(self) -> None:
+        """Stop the workers (called on application shutdown); pending jobs are dropped."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    async def submit(
+        self,
+        expected_text: str,
+        user_text: str,
+        score: float,
+        missed_words: list[str],
+        extra_words: list[str],
+        user_key: str | None = None,
+    ) -> FeedbackJob:
+        """
+        Queue AI feedback generation for an attempt.
+
+        Args:
+            expected_text: Original expected text
+            user_text: User's transcribed text
+            score: Calculated score (0-100)
+            missed_words: Words user missed
+            extra_words: Extra words user added
+            user_key: Caller identity for the per-user Gemini budget
+
+        Returns:
+            The pending job
+
+        Raises:
+            FeedbackQueueFullError: If ``max_jobs`` jobs are still pending
+        """
+        await self.start()  # Lazily, outside the app (scripts, benchmarks)
+        assert self._queue is not None
+
+        self._purge()
+        if len(self._jobs) >= self.max_jobs:
+            self._counters["rejected"] += 1
+            raise FeedbackQueueFullError("Too many pending feedback jobs")
+
+        job = FeedbackJob(uuid.uuid4().hex)
+        self._jobs[job.job_id] = job
+        self._counters["submitted"] += 1
+        self._queue.put_nowait(
+            (
+                job,
+                {
+                    "expected_text": expected_text,
+                    "user_text": user_text,
+                    "score": score,
+                    "missed_words": missed_words,
+                    "extra_words": extra_words,
+                    "user_key": user_key,
+                },
+            )
+        )
+        return job
+
+    def get(self, job_id: str) -> FeedbackJob | None:
+        """
+        Get a job by ID.
+
+        Args:
+            job_id: ID returned by ``submit``
+
+        Returns:
+            The job, or None if unknown or expired
+        """
+        job = self._jobs.get(job_id)
+        if job is not None and self._expired(job, time.time()):
+            return None
+        return job
+
+    async def wait(self, job_id: str, timeout: float) -> FeedbackJob | None:
+        """
+        Wait up to ``timeout`` seconds for a job to finish.
+
+        Args:
+            job_id: ID returned by ``submit``
+            timeout: Seconds to wait
+
+        Returns:
+            The job (still pending if the timeout ran out), or None if unknown
+        """
+        job = self.get(job_id)
+        if job is None or job.status != PENDING:
+            return job
+        try:
+            await asyncio.wait_for(job.done.wait(), timeout)
+        except TimeoutError:
+            pass
+        return job
+
+    def stats(self) -> dict[str, Any]:
+        """Get job queue statistics."""
+        finished = self._counters["completed"] + self._counters["failed"]
+        return {
+            **self._counters,
+            "pending": sum(job.status == PENDING for job in self._jobs.values()),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "stored": len(self._jobs),
+            "workers": len(self._tasks),
+            "avg_queue_seconds": round(self._queue_seconds / finished, 3) if finished else 0.0,
+            "avg_run_seconds": round(self._run_seconds / finished, 3) if finished else 0.0,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        queue = self._queue
+        while True:
+            job, params = await queue.get()
+            started = time.time()
+            try:
+                job.feedback = await ai_service.generate_feedback(**params)
+                job.status = COMPLETED
+            except Exception as e:
+                logger.warning("Feedback job %s failed: %r", job.job_id, e)
+                job.error = str(e)
+                job.status = FAILED
+            job.finished_at = time.time()
+            self._counters[job.status] += 1
+            self._queue_seconds += started - job.created_at
+            self._run_seconds += job.finished_at - started
+            job.done.set()
+            queue.task_done()
+
+    def _expired(self, job: FeedbackJob, now: float) -> bool:
+        return job.finished_at is not None and job.finished_at + self.ttl_seconds <= now
+
+    def _purge(self) -> None:
+        """Drop expired jobs, then the oldest finished ones beyond ``max_jobs``."""
+        now = time.time()
+        for job_id in [job_id for job_id, job in self._jobs.items() if self._expired(job, now)]:
+            del self._jobs[job_id]
+            self._counters["expired"] += 1
+        if len(self._jobs) < self.max_jobs:
+            return
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.status != PENDING]:
+            del self._jobs[job_id]
+            if len(self._jobs) < self.max_jobs:
+                break
+
+
+# Global feedback job service instance
+feedback_job_service = FeedbackJobService(
+    settings.feedback_job_workers,
+    settings.feedback_job_max_jobs,
+    settings.feedback_job_ttl_seconds,
+)
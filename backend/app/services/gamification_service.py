@@ -3,7 +3,7 @@
 from datetime import date, timedelta
 from typing import Any
 
-from supabase import Client
+from app.database import Database
 
 
 class GamificationService:
@@ -63,7 +63,7 @@ class GamificationService:
         "level_10": {"title": "Expert Learner", "description": "Reach level 10", "icon": "🏆"},
     }
 
-    def __init__(self, db: Client):
+    def __init__(self, db: Database):
         """Initialize gamification service."""
         self.db = db
 
@@ -83,7 +83,9 @@ class GamificationService:
             Dictionary with current_streak and longest_streak
         """
         # Get current user stats
-        stats_response = self.db.table("user_stats").select("*").eq("user_id", user_id).execute()
+        stats_response = await self.db.execute(
+            self.db.table("user_stats").select("*").eq("user_id", user_id)
+        )
 
         today = date.today()
 
@@ -95,7 +97,7 @@ class GamificationService:
                 "longest_streak": 1,
                 "last_practice_date": today.isoformat(),
             }
-            self.db.table("user_stats").insert(new_stats).execute()
+            await self.db.execute(self.db.table("user_stats").insert(new_stats))
             return {"current_streak": 1, "longest_streak": 1}
 
         stats = stats_response.data[0]
@@ -122,13 +124,17 @@ class GamificationService:
         longest_streak = max(stats.get("longest_streak", 0), current_streak)
 
         # Update database
-        self.db.table("user_stats").update(
-            {
-                "current_streak": current_streak,
-                "longest_streak": longest_streak,
-                "last_practice_date": today.isoformat(),
-            }
-        ).eq("user_id", user_id).execute()
+        await self.db.execute(
+            self.db.table("user_stats")
+            .update(
+                {
+                    "current_streak": current_streak,
+                    "longest_streak": longest_streak,
+                    "last_practice_date": today.isoformat(),
+                }
+            )
+            .eq("user_id", user_id)
+        )
 
         return {"current_streak": current_streak, "longest_streak": longest_streak}
 
@@ -184,7 +190,9 @@ class GamificationService:
         xp_gained = self.calculate_xp_gain(score, duration_seconds)
 
         # Get current stats
-        stats_response = self.db.table("user_stats").select("*").eq("user_id", user_id).execute()
+        stats_response = await self.db.execute(
+            self.db.table("user_stats").select("*").eq("user_id", user_id)
+        )
 
         if not stats_response.data:
             # Create new stats
@@ -215,7 +223,9 @@ class GamificationService:
             "average_score": average_score,
         }
 
-        self.db.table("user_stats").update(updated_stats).eq("user_id", user_id).execute()
+        await self.db.execute(
+            self.db.table("user_stats").update(updated_stats).eq("user_id", user_id)
+        )
 
         return {**updated_stats, "xp_gained": xp_gained}
 
@@ -243,11 +253,8 @@ class GamificationService:
             List of newly unlocked achievements
         """
         # Get existing achievements
-        existing_response = (
-            self.db.table("achievements")
-            .select("achievement_type")
-            .eq("user_id", user_id)
-            .execute()
+        existing_response = await self.db.execute(
+            self.db.table("achievements").select("achievement_type").eq("user_id", user_id)
         )
         existing_types = {ach["achievement_type"] for ach in existing_response.data}
 
@@ -300,7 +307,7 @@ class GamificationService:
                 "icon": achievement_data["icon"],
             }
 
-            self.db.table("achievements").insert(new_achievement).execute()
+            await self.db.execute(self.db.table("achievements").insert(new_achievement))
             new_achievements.append(new_achievement)
 
         return new_achievements
@@ -318,12 +325,11 @@ class GamificationService:
         today = date.today()
 
         # Get or create today's goal
-        goal_response = (
+        goal_response = await self.db.execute(
             self.db.table("daily_goals")
             .select("*")
             .eq("user_id", user_id)
             .eq("goal_date", today.isoformat())
-            .execute()
         )
 
         if not goal_response.data:
@@ -334,15 +340,17 @@ class GamificationService:
                 "completed_count": 1,
                 "goal_date": today.isoformat(),
             }
-            self.db.table("daily_goals").insert(new_goal).execute()
+            await self.db.execute(self.db.table("daily_goals").insert(new_goal))
             return new_goal
         else:
             # Increment completed count
             goal = goal_response.data[0]
             completed_count = goal["completed_count"] + 1
 
-            self.db.table("daily_goals").update({"completed_count": completed_count}).eq(
-                "id", goal["id"]
-            ).execute()
+            await self.db.execute(
+                self.db.table("daily_goals")
+                .update({"completed_count": completed_count})
+                .eq("id", goal["id"])
+            )
 
             return {**goal, "completed_count": completed_count}
@@ -0,0 +1,164 @@
+"""In-memory cache of per-material scoring profiles."""
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from app.config import settings
+from app.database import Database
+from app.services.scoring_service import ScoringProfile, scoring_service
+
+
+class MaterialProfile:
+    """Everything feedback scoring needs from a material, without the database."""
+
+    __slots__ = ("material_id", "duration_seconds", "sentence_ids", "sentence_times", "scoring")
+
+    def __init__(
+        self,
+        material_id: str,
+        duration_seconds: int | None,
+        sentence_ids: list[str],
+        sentence_times: list[tuple[float, float]],
+        scoring: ScoringProfile,
+    ):
+        """Initialize material profile."""
+        self.material_id = material_id
+        self.duration_seconds = duration_seconds
+        self.sentence_ids = sentence_ids  # In sequence order
+        self.sentence_times = sentence_times  # (start_time, end_time) of each sentence
+        self.scoring = scoring
+
+
+class MaterialProfileService:
+    """
+    LRU cache of material scoring profiles, keyed by material ID.
+
+    Materials never change after creation, so a profile (normalized and
+    interned tokens, sentence boundaries and duration) is built once, at
+    ``create_material`` time or on first use, and feedback for a hot
+    material needs no database round trips. ``delete_material``
+    invalidates the entry; other workers only drop it through LRU eviction,
+    which at worst lets feedback be scored against a deleted material.
+    """
+
+    def __init__(self, max_entries: int):
+        """Initialize material profile cache."""
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, MaterialProfile] = OrderedDict()  # Oldest first
+        self._lock = threading.Lock()
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "builds": 0,
+            "evictions": 0,
+            "invalidations": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled."""
+        return self.max_entries > 0
+
+    def build(
+        self,
+        material_id: str,
+        duration_seconds: int | None,
+        sentences: list[tuple[str, str, float, float]],
+    ) -> MaterialProfile:
+        """
+        Build a material's profile and cache it.
+
+        A profile without sentences is returned but not cached: the material
+        may still be being created, and its sentences would otherwise never
+        be picked up.
+
+        Args:
+            material_id: Material ID
+            duration_seconds: Audio duration of the material
+            sentences: (sentence_id, text, start_time, end_time) tuples in
+                sequence order
+
+        Returns:
+            Material profile
+        """
+        profile = MaterialProfile(
+            material_id,
+            duration_seconds,
+            [sentence_id for sentence_id, _, _, _ in sentences],
+            [(float(start), float(end)) for _, _, start, end in sentences],
+            scoring_service.build_profile([text for _, text, _, _ in sentences]),
+        )
+        with self._lock:
+            self._counters["builds"] += 1
+            if self.enabled and sentences:
+                self._entries[material_id] = profile
+                self._entries.move_to_end(material_id)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self._counters["evictions"] += 1
+        return profile
+
+    async def get(self, db: Database, material_id: str) -> MaterialProfile | None:
+        """
+        Get a material's profile, loading it from the database on a miss.
+
+        Args:
+            db: Database client
+            material_id: Material ID
+
+        Returns:
+            Material profile, or None if the material doesn't exist
+
+        Raises:
+            Exception: If a database query fails
+        """
+        with self._lock:
+            profile = self._entries.get(material_id)
+            if profile is not None:
+                self._entries.move_to_end(material_id)
+                self._counters["hits"] += 1
+                return profile
+            self._counters["misses"] += 1
+
+        material_response = await db.execute(
+            db.table("materials").select("duration_seconds").eq("id", material_id)
+        )
+        if not material_response.data:
+            return None
+
+        sentences_response = await db.execute(
+            db.table("sentences")
+            .select("id, text, start_time, end_time")
+            .eq("material_id", material_id)
+            .order("sequence_order")
+        )
+        return self.build(
+            material_id,
+            material_response.data[0].get("duration_seconds", 30),
+            [
+                (s["id"], s["text"], s["start_time"], s["end_time"])
+                for s in sentences_response.data or []
+            ],
+        )
+
+    def invalidate(self, material_id: str) -> None:
+        """Drop a material's profile (called when the material is deleted)."""
+        with self._lock:
+            if self._entries.pop(material_id, None) is not None:
+                self._counters["invalidations"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(self._counters["hits"] / lookups, 3) if lookups else 0.0,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+            }
+
+
+# Global material profile cache instance
+material_profile_service = MaterialProfileService(settings.material_profile_cache_max_entries)
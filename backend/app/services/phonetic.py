@@ -0,0 +1,128 @@
+"""Metaphone phonetic keys for sound-alike word matching."""
+
+VOWELS = frozenset("AEIOU")
+FRONT_VOWELS = frozenset("EIY")  # Soften C and G
+INITIAL_SILENT = ("AE", "GN", "KN", "PN", "WR")  # First letter is dropped
+
+# Common homophones whose spelling Metaphone keys differently
+PHONETIC_SPELLINGS = {
+    "two": "to",
+    "one": "won",
+    "eight": "ate",
+    "eye": "i",
+    "ewe": "you",
+    "whole": "hole",
+    "hour": "our",
+}
+
+
+def metaphone(word: str) -> str:
+    """
+    Encode a word with Lawrence Philips' original Metaphone.
+
+    Words that sound alike get equal keys ("there"/"their" -> "0R",
+    "write"/"right" -> "RT"); "0" stands for "th" and "X" for "sh". Vowels
+    are only kept as a first letter. Non-letters are ignored.
+
+    Args:
+        word: Word, any case
+
+    Returns:
+        Phonetic key (empty if the word has no letters)
+    """
+    letters = [c for c in word.upper() if "A" <= c <= "Z"]
+    # Adjacent duplicates sound as one, except CC ("accent")
+    text = "".join(c for i, c in enumerate(letters) if i == 0 or c != letters[i - 1] or c == "C")
+    if not text:
+        return ""
+
+    if text[:2] in INITIAL_SILENT:
+        text = text[1:]
+    elif text[0] == "X":
+        text = "S" + text[1:]
+    elif text[:2] == "WH":
+        text = "W" + text[2:]
+
+    n = len(text)
+    key = []
+    for i, c in enumerate(text):
+        prev = text[i - 1] if i > 0 else ""
+        nxt = text[i + 1] if i + 1 < n else ""
+        after = text[i + 2] if i + 2 < n else ""
+
+        if c in VOWELS:
+            if i == 0:
+                key.append(c)
+        elif c == "B":
+            if not (prev == "M" and i == n - 1):  # "dumb"
+                key.append("B")
+        elif c == "C":
+            if (nxt == "I" and after == "A") or nxt == "H":
+                key.append("K" if prev == "S" else "X")  # "school" vs "church"
+            elif nxt in FRONT_VOWELS:
+                if prev != "S":  # "science"
+                    key.append("S")
+            else:
+                key.append("K")
+        elif c == "D":
+            key.append("J" if nxt == "G" and after in FRONT_VOWELS else "T")
+        elif c == "G":
+            if nxt == "H" and not (i + 2 >= n or after in VOWELS):
+                continue  # "night"
+            if nxt == "N" and (i + 2 == n or text[i + 2 :] == "ED"):
+                continue  # "sign", "signed"
+            if prev == "D" and nxt in FRONT_VOWELS:
+                continue  # "edge": DG already gave J
+            key.append("J" if nxt in FRONT_VOWELS else "K")
+        elif c == "H":
+            if prev and prev in "CGPST":
+                continue  # Part of CH, GH, PH, SH or TH
+            if prev in VOWELS and nxt not in VOWELS:
+                continue  # "ah"
+            key.append("H")
+        elif c == "K":
+            if prev != "C":
+                key.append("K")
+        elif c == "P":
+            key.append("F" if nxt == "H" else "P")
+        elif c == "Q":
+            key.append("K")
+        elif c == "S":
+            if nxt == "H" or (nxt == "I" and after and after in "OA"):
+                key.append("X")
+            else:
+                key.append("S")
+        elif c == "T":
+            if nxt == "I" and after and after in "OA":
+                key.append("X")
+            elif nxt == "H":
+                key.append("0")
+            elif not (nxt == "C" and after == "H"):  # "watch"
+                key.append("T")
+        elif c == "V":
+            key.append("F")
+        elif c in "WY":
+            if nxt and nxt in VOWELS:
+                key.append(c)
+        elif c == "X":
+            key.append("KS")
+        elif c == "Z":
+            key.append("S")
+        else:  # F J L M N R
+            key.append(c)
+    return "".join(key)
+
+
+def phonetic_key(word: str) -> str:
+    """
+    Get the sound-alike key of a normalized (lowercase) word.
+
+    Args:
+        word: Lowercase word
+
+    Returns:
+        Metaphone key of the word (or of its homophone spelling); words
+        without letters, like numbers, key as themselves so they only
+        match exactly
+    """
+    return metaphone(PHONETIC_SPELLINGS.get(word, word)) or f"={word}"
@@ -1,12 +1,79 @@
 """Scoring service for comparing user transcripts with expected text."""
 
 import re
+from bisect import bisect_right
+from functools import lru_cache
 from typing import Any
 
+from app.config import settings
+from app.services.phonetic import phonetic_key
+from app.services.word_alignment import (
+    CORRECT,
+    EXTRA,
+    MISSED,
+    SUBSTITUTED,
+    align_ids,
+    intern_words,
+    lookup_ids,
+)
+
+PUNCTUATION_PATTERN = re.compile(r"[^\w\s]")
+
+
+class ScoringProfile:
+    """
+    Expected text of a material, tokenized and interned once for scoring.
+
+    Built by ``ScoringService.build_profile``; scoring a transcript against
+    a profile only has to tokenize the transcript. The phonetic index maps
+    each Metaphone key of the text to a sound class, so phonetic scoring
+    looks user words up instead of comparing keys.
+    """
+
+    __slots__ = (
+        "expected_text",
+        "sentences",
+        "words",
+        "word_ids",
+        "vocabulary",
+        "sentence_starts",
+        "phonetic_ids",
+        "phonetic_classes",
+        "phonetic_index",
+    )
+
+    def __init__(
+        self,
+        expected_text: str,
+        sentences: list[str],
+        words: list[str],
+        word_ids: list[int],
+        vocabulary: dict[str, int],
+        sentence_starts: list[int],
+        phonetic_ids: list[int],
+        phonetic_classes: list[int],
+        phonetic_index: dict[str, int],
+    ):
+        """Initialize scoring profile."""
+        self.expected_text = expected_text
+        self.sentences = sentences
+        self.words = words
+        self.word_ids = word_ids
+        self.vocabulary = vocabulary
+        self.sentence_starts = sentence_starts  # Word offset of each sentence, plus the total
+        self.phonetic_ids = phonetic_ids  # Sound class of each word
+        self.phonetic_classes = phonetic_classes  # Word ID -> sound class
+        self.phonetic_index = phonetic_index  # Phonetic key -> sound class
+
 
 class ScoringService:
     """Service for calculating pronunciation accuracy scores."""
 
+    def __init__(self, phonetic_cache_size: int = 65536):
+        """Initialize scoring service with a bounded cache of phonetic keys."""
+        # Shared by all materials, so common words are encoded once per process
+        self.phonetic_key = lru_cache(maxsize=phonetic_cache_size)(phonetic_key)
+
     @staticmethod
     def clean_text(text: str) -> str:
         """
@@ -18,102 +85,295 @@ class ScoringService:
         Returns:
             Cleaned text (lowercase, no punctuation)
         """
-        # Convert to lowercase
-        text = text.lower()
-        # Remove punctuation
-        text = re.sub(r"[^\w\s]", "", text)
-        # Normalize whitespace
-        text = " ".join(text.split())
-        return text
+        return " ".join(ScoringService.tokenize(text))
 
-    def calculate_score(self, expected_text: str, user_text: str) -> dict[str, Any]:
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """
+        Split text into comparison words (lowercase, no punctuation).
+
+        Args:
+            text: Raw text
+
+        Returns:
+            Words in order
         """
-        Calculate pronunciation score using word-level matching.
+        return PUNCTUATION_PATTERN.sub("", text.lower()).split()
 
-        Algorithm:
-        1. Clean both texts (lowercase, remove punctuation)
-        2. Split into words
-        3. Calculate intersection
-        4. Score = (matched words / total expected words) × 100
+    def build_profile(self, sentences: list[str]) -> ScoringProfile:
+        """
+        Tokenize and intern a material's sentences for repeated scoring.
 
         Args:
-            expected_text: Original expected text
+            sentences: Sentence texts in order
+
+        Returns:
+            Scoring profile of the sentences joined with spaces
+        """
+        words: list[str] = []
+        sentence_starts = [0]
+        for sentence in sentences:
+            words.extend(self.tokenize(sentence))
+            sentence_starts.append(len(words))
+
+        vocabulary: dict[str, int] = {}
+        word_ids = [vocabulary.setdefault(word, len(vocabulary)) for word in words]
+
+        phonetic_index: dict[str, int] = {}
+        phonetic_classes = [
+            phonetic_index.setdefault(self.phonetic_key(word), len(phonetic_index))
+            for word in vocabulary
+        ]
+        phonetic_ids = [phonetic_classes[word_id] for word_id in word_ids]
+        return ScoringProfile(
+            " ".join(sentences),
+            list(sentences),
+            words,
+            word_ids,
+            vocabulary,
+            sentence_starts,
+            phonetic_ids,
+            phonetic_classes,
+            phonetic_index,
+        )
+
+    def slice_profile(self, profile: ScoringProfile, first: int, last: int) -> ScoringProfile:
+        """
+        Narrow a profile to a run of its sentences, e.g. the one being practiced.
+
+        Only the selected sentences' tokens are copied; the vocabulary and
+        phonetic index are shared, so scoring costs what the selection
+        holds, not the whole material.
+
+        Args:
+            profile: Profile of the whole material
+            first: Index of the first selected sentence
+            last: Index of the last selected sentence (inclusive)
+
+        Returns:
+            Scoring profile of the selected sentences
+        """
+        start, end = profile.sentence_starts[first], profile.sentence_starts[last + 1]
+        sentences = profile.sentences[first : last + 1]
+        return ScoringProfile(
+            " ".join(sentences),
+            sentences,
+            profile.words[start:end],
+            profile.word_ids[start:end],
+            profile.vocabulary,
+            [offset - start for offset in profile.sentence_starts[first : last + 2]],
+            profile.phonetic_ids[start:end],
+            profile.phonetic_classes,
+            profile.phonetic_index,
+        )
+
+    def analyze(
+        self,
+        expected: str | ScoringProfile,
+        user_text: str,
+        phonetic: bool | None = None,
+    ) -> dict[str, Any]:
+        """
+        Score a transcript and analyze it word by word in one pass.
+
+        Each text is tokenized once (the expected one not at all when a
+        precomputed profile is given) and the words aligned in order
+        (minimum edit distance), so repeated, reordered and substituted
+        words are counted per occurrence. The score, word lists and
+        per-word analysis are all read off that one alignment.
+
+        In phonetic mode words match when they sound alike (same Metaphone
+        key), so homophones the STT picked ("their" for "there", "to" for
+        "two") count as correct. With a profile a user word costs one dict
+        lookup, plus one cached key encoding if the text doesn't contain it.
+
+        Args:
+            expected: Original expected text, or its scoring profile
             user_text: User's transcribed text
+            phonetic: Match sound-alike words; defaults to the
+                ``scoring_phonetic_matching`` setting
 
         Returns:
             Dictionary containing:
-            - score: Percentage score (0-100)
-            - matched_words: List of correctly matched words
-            - missed_words: Words user didn't say
-            - extra_words: Words user added that weren't in original
+            - score: Correctly aligned words / total expected words × 100
+            - matched_words: Words said correctly
+            - missed_words: Expected words not said (skipped or substituted)
+            - extra_words: Words said that weren't expected (added or substituted)
             - total_words: Total words in expected text
+            - matched_count / missed_count / substituted_count / extra_count:
+              Number of alignment steps of each kind
+            - phonetic_match_count: Correct words spelled differently from
+              the expected ones (phonetic mode only; else 0)
+            - word_analysis: Per-word objects in reading order, with status
+              correct/missed/extra, or substituted (plus the ``spoken``
+              word, which phonetic matches carry too)
+            - sentence_scores: Only when scored against a profile; per
+              sentence of it, a dict with ``total_words``,
+              ``matched_count`` and ``score``
         """
-        # Clean texts
-        expected_clean = self.clean_text(expected_text)
-        user_clean = self.clean_text(user_text)
-
-        # Split into words
-        expected_words = expected_clean.split()
-        user_words = user_clean.split()
+        if phonetic is None:
+            phonetic = settings.scoring_phonetic_matching
 
-        # Convert to sets for comparison
-        expected_set = set(expected_words)
-        user_set = set(user_words)
+        user_words = self.tokenize(user_text)
+        if isinstance(expected, ScoringProfile):
+            expected_words = expected.words
+            if phonetic:
+                expected_ids = expected.phonetic_ids
+                user_ids = self._lookup_phonetic_ids(expected, user_words)
+            else:
+                expected_ids = expected.word_ids
+                user_ids = lookup_ids(expected.vocabulary, user_words)
+        else:
+            expected_words = self.tokenize(expected)
+            if phonetic:
+                expected_ids, user_ids = intern_words(
+                    [self.phonetic_key(word) for word in expected_words],
+                    [self.phonetic_key(word) for word in user_words],
+                )
+            else:
+                expected_ids, user_ids = intern_words(expected_words, user_words)
 
-        # Calculate matches
-        matched_words = expected_set.intersection(user_set)
-        missed_words = expected_set - user_set
-        extra_words = user_set - expected_set
+        matched_words = set()
+        missed_words = set()
+        extra_words = set()
+        counts = {CORRECT: 0, SUBSTITUTED: 0, MISSED: 0, EXTRA: 0}
+        phonetic_matches = 0
+        word_analysis = []
+        correct_indices = []
+        for status, i, j in align_ids(expected_ids, user_ids):
+            counts[status] += 1
+            if status == CORRECT:
+                correct_indices.append(i)
+                matched_words.add(expected_words[i])
+                if expected_words[i] == user_words[j]:
+                    word_analysis.append({"word": expected_words[i], "status": status})
+                else:
+                    phonetic_matches += 1
+                    word_analysis.append(
+                        {"word": expected_words[i], "status": status, "spoken": user_words[j]}
+                    )
+            elif status == MISSED:
+                missed_words.add(expected_words[i])
+                word_analysis.append({"word": expected_words[i], "status": status})
+            elif status == EXTRA:
+                extra_words.add(user_words[j])
+                word_analysis.append({"word": user_words[j], "status": status})
+            else:
+                missed_words.add(expected_words[i])
+                extra_words.add(user_words[j])
+                word_analysis.append(
+                    {"word": expected_words[i], "status": status, "spoken": user_words[j]}
+                )
 
         # Calculate score
         total_words = len(expected_words)
         if total_words == 0:
             score = 100.0
         else:
-            # Use word-level matching
-            matched_count = len(matched_words)
-            score = round((matched_count / total_words) * 100, 2)
+            score = round((counts[CORRECT] / total_words) * 100, 2)
 
-        return {
+        result = {
             "score": score,
             "matched_words": sorted(matched_words),
             "missed_words": sorted(missed_words),
             "extra_words": sorted(extra_words),
             "total_words": total_words,
-            "matched_count": len(matched_words),
+            "matched_count": counts[CORRECT],
+            "missed_count": counts[MISSED],
+            "substituted_count": counts[SUBSTITUTED],
+            "extra_count": counts[EXTRA],
+            "phonetic_match_count": phonetic_matches,
+            "word_analysis": word_analysis,
         }
+        if isinstance(expected, ScoringProfile):
+            result["sentence_scores"] = self._sentence_scores(
+                expected.sentence_starts, correct_indices
+            )
+        return result
 
-    def get_word_analysis(self, expected_text: str, user_text: str) -> list[dict[str, Any]]:
+    @staticmethod
+    def _sentence_scores(
+        sentence_starts: list[int], correct_indices: list[int]
+    ) -> list[dict[str, Any]]:
+        """Break correct expected-word indices down by sentence."""
+        matched = [0] * (len(sentence_starts) - 1)
+        for i in correct_indices:
+            matched[bisect_right(sentence_starts, i) - 1] += 1
+
+        scores = []
+        for index, matched_count in enumerate(matched):
+            total_words = sentence_starts[index + 1] - sentence_starts[index]
+            scores.append(
+                {
+                    "total_words": total_words,
+                    "matched_count": matched_count,
+                    "score": round(matched_count / total_words * 100, 2) if total_words else 100.0,
+                }
+            )
+        return scores
+
+    def _lookup_phonetic_ids(self, profile: ScoringProfile, words: list[str]) -> list[int]:
+        """Map words to the profile's sound classes; unmatched keys get fresh IDs."""
+        unknown: dict[str, int] = {}
+        base = len(profile.phonetic_index)
+        ids = []
+        for word in words:
+            word_id = profile.vocabulary.get(word)
+            if word_id is not None:
+                ids.append(profile.phonetic_classes[word_id])
+                continue
+            key = self.phonetic_key(word)
+            sound_class = profile.phonetic_index.get(key)
+            if sound_class is None:
+                sound_class = unknown.setdefault(key, base + len(unknown))
+            ids.append(sound_class)
+        return ids
+
+    def stats(self) -> dict[str, Any]:
+        """Get phonetic key cache statistics."""
+        info = self.phonetic_key.cache_info()
+        lookups = info.hits + info.misses
+        return {
+            "phonetic_matching": settings.scoring_phonetic_matching,
+            "phonetic_key_hits": info.hits,
+            "phonetic_key_misses": info.misses,
+            "phonetic_key_hit_ratio": round(info.hits / lookups, 3) if lookups else 0.0,
+            "phonetic_keys_cached": info.currsize,
+            "phonetic_key_cache_size": info.maxsize,
+        }
+
+    def calculate_score(self, expected_text: str, user_text: str) -> dict[str, Any]:
         """
-        Get detailed word-by-word analysis.
+        Calculate pronunciation score using word-level alignment.
+
+        Prefer ``analyze`` when the word analysis is needed too.
 
         Args:
             expected_text: Original expected text
             user_text: User's transcribed text
 
         Returns:
-            List of word analysis objects with status (correct/missed/extra)
+            The ``analyze`` result without ``word_analysis``
         """
-        expected_clean = self.clean_text(expected_text)
-        user_clean = self.clean_text(user_text)
+        result = self.analyze(expected_text, user_text)
+        del result["word_analysis"]
+        return result
 
-        expected_words = expected_clean.split()
-        user_words = user_clean.split()
-
-        user_set = set(user_words)
+    def get_word_analysis(self, expected_text: str, user_text: str) -> list[dict[str, Any]]:
+        """
+        Get detailed word-by-word analysis.
 
-        analysis = []
-        for word in expected_words:
-            analysis.append({"word": word, "status": "correct" if word in user_set else "missed"})
+        Prefer ``analyze`` when the score is needed too.
 
-        # Add extra words
-        expected_set = set(expected_words)
-        for word in user_words:
-            if word not in expected_set:
-                analysis.append({"word": word, "status": "extra"})
+        Args:
+            expected_text: Original expected text
+            user_text: User's transcribed text
 
-        return analysis
+        Returns:
+            The ``word_analysis`` list of ``analyze``
+        """
+        return self.analyze(expected_text, user_text)["word_analysis"]
 
 
 # Global scoring service instance
-scoring_service = ScoringService()
+scoring_service = ScoringService(settings.scoring_phonetic_cache_size)
@@ -0,0 +1,265 @@
+"""Admission control for upstream STT calls."""
+
+import asyncio
+import logging
+import time
+from collections import OrderedDict, deque
+from collections.abc import Awaitable, Callable
+from email.utils import parsedate_to_datetime
+from typing import Any, TypeVar
+
+import httpx
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class STTOverloadedError(Exception):
+    """Raised when an STT call can't be admitted (or keeps being throttled) in time."""
+
+    def __init__(self, retry_after: float):
+        """Initialize with the suggested client retry delay in seconds."""
+        super().__init__(f"STT is overloaded, retry after {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class STTScheduler:
+    """
+    Bounded-concurrency scheduler with fair per-user queuing.
+
+    At most ``limit`` upstream calls run at once. Waiting calls are queued
+    per user and slots are handed out round-robin across users, so one
+    client's burst can't starve everyone else. When the upstream answers
+    429/503 the scheduler pauses for its ``Retry-After``, halves the limit
+    and retries the call; the limit grows back by one after each full window
+    of successes. Callers whose estimated wait exceeds the configured bound
+    fail fast with ``STTOverloadedError`` instead of queuing.
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+    DEFAULT_RETRY_AFTER = 1.0  # Doubles per consecutive throttle without Retry-After
+    MAX_RETRY_AFTER = 60.0
+    INITIAL_SERVICE_SECONDS = 2.0  # Service time estimate before any call completes
+    SERVICE_TIME_SMOOTHING = 0.2
+    WAIT_SAMPLES = 1000
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue_depth: int,
+        max_wait_seconds: float,
+        max_retries: int,
+    ):
+        """Initialize STT scheduler."""
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_queue_depth = max_queue_depth
+        self.max_wait_seconds = max_wait_seconds
+        self.max_retries = max_retries
+
+        self._limit = self.max_concurrency
+        self._active = 0
+        self._successes = 0  # Since the limit last changed
+        self._throttle_streak = 0
+        self._paused_until = 0.0
+        self._resume_handle: asyncio.TimerHandle | None = None
+        self._service_seconds = self.INITIAL_SERVICE_SECONDS
+        # user -> waiting (future, enqueued_at) pairs; users are served in order, then rotated
+        self._queues: OrderedDict[str, deque[tuple[asyncio.Future[None], float]]] = OrderedDict()
+        self._waiting = 0
+        self._waits: deque[float] = deque(maxlen=self.WAIT_SAMPLES)
+        self._counters = {
+            "admitted": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "throttled": 0,
+            "retried": 0,
+        }
+
+    async def run(self, user_key: str, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run an upstream call once a slot is free, retrying throttled attempts.
+
+        Args:
+            user_key: Fairness key (user ID or client address)
+            call: Coroutine factory making the upstream call
+
+        Returns:
+            Whatever ``call`` returns
+
+        Raises:
+            STTOverloadedError: If the call can't be admitted in time or is
+                still throttled after ``max_retries`` retries
+        """
+        for attempt in range(self.max_retries + 1):
+            await self._acquire(user_key)
+            start = time.monotonic()
+            try:
+                result = await call()
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in self.THROTTLE_STATUSES:
+                    raise
+                retry_after = self._throttle(e.response.headers.get("Retry-After"))
+                if attempt == self.max_retries:
+                    raise STTOverloadedError(retry_after) from e
+                self._counters["retried"] += 1
+                continue
+            finally:
+                self._release()
+
+            self._record_success(time.monotonic() - start)
+            return result
+
+        raise AssertionError("unreachable")
+
+    def stats(self) -> dict[str, Any]:
+        """Get scheduler statistics."""
+        waits = sorted(self._waits)
+        return {
+            **self._counters,
+            "limit": self._limit,
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queue_depth": self._waiting,
+            "queued_users": len(self._queues),
+            "paused_seconds": round(max(self._paused_until - time.monotonic(), 0.0), 3),
+            "avg_service_seconds": round(self._service_seconds, 3),
+            "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "p95_wait_seconds": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+        }
+
+    async def _acquire(self, user_key: str) -> None:
+        now = time.monotonic()
+        if self._waiting == 0 and self._active < self._limit and now >= self._paused_until:
+            self._admit(0.0)
+            return
+
+        estimate = self._estimated_wait(now)
+        if self._waiting >= self.max_queue_depth or estimate > self.max_wait_seconds:
+            self._counters["rejected"] += 1
+            raise STTOverloadedError(estimate)
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(user_key, deque()).append((future, now))
+        self._waiting += 1
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait_seconds)
+        except TimeoutError as e:
+            self._forget(user_key, future)
+            self._counters["timed_out"] += 1
+            raise STTOverloadedError(self._estimated_wait(time.monotonic())) from e
+        except BaseException:
+            if future.done() and not future.cancelled():
+                self._release()  # Slot was granted just as the caller was cancelled
+            else:
+                self._forget(user_key, future)
+            raise
+
+    def _admit(self, waited: float) -> None:
+        self._active += 1
+        self._counters["admitted"] += 1
+        self._waits.append(waited)
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _dispatch(self) -> None:
+        """Hand free slots to waiting calls, round-robin across users."""
+        now = time.monotonic()
+        if now < self._paused_until:
+            self._schedule_resume(now)
+            return
+
+        while self._queues and self._active < self._limit:
+            user_key, queue = next(iter(self._queues.items()))
+            future, enqueued_at = queue.popleft()
+            self._waiting -= 1
+            if queue:
+                self._queues.move_to_end(user_key)
+            else:
+                del self._queues[user_key]
+
+            if future.done():  # Caller gave up while queued
+                continue
+            future.set_result(None)
+            self._admit(now - enqueued_at)
+
+    def _forget(self, user_key: str, future: asyncio.Future[None]) -> None:
+        queue = self._queues.get(user_key)
+        if queue is None:
+            return
+        for entry in queue:
+            if entry[0] is future:
+                queue.remove(entry)
+                self._waiting -= 1
+                break
+        if not queue:
+            del self._queues[user_key]
+
+    def _schedule_resume(self, now: float) -> None:
+        if self._resume_handle is not None:
+            self._resume_handle.cancel()
+        loop = asyncio.get_running_loop()
+        self._resume_handle = loop.call_later(self._paused_until - now, self._dispatch)
+
+    def _throttle(self, retry_after_header: str | None) -> float:
+        """Pause dispatching and halve the limit after an upstream 429/503."""
+        self._counters["throttled"] += 1
+        self._throttle_streak += 1
+        retry_after = self._parse_retry_after(retry_after_header)
+        if retry_after is None:
+            retry_after = self.DEFAULT_RETRY_AFTER * 2 ** (self._throttle_streak - 1)
+        retry_after = min(retry_after, self.MAX_RETRY_AFTER)
+
+        self._paused_until = max(self._paused_until, time.monotonic() + retry_after)
+        self._limit = max(self._limit // 2, 1)
+        self._successes = 0
+        logger.warning(
+            "STT upstream throttled; pausing %.1fs, concurrency limit now %d",
+            retry_after,
+            self._limit,
+        )
+        return retry_after
+
+    def _record_success(self, service_seconds: float) -> None:
+        self._throttle_streak = 0
+        self._service_seconds += self.SERVICE_TIME_SMOOTHING * (
+            service_seconds - self._service_seconds
+        )
+        if self._limit < self.max_concurrency:
+            self._successes += 1
+            if self._successes >= self._limit:
+                self._limit += 1
+                self._successes = 0
+                self._dispatch()
+
+    def _estimated_wait(self, now: float) -> float:
+        """Estimate how long a newly queued call would wait for a slot."""
+        paused = max(self._paused_until - now, 0.0)
+        return paused + (self._waiting + 1) * self._service_seconds / self._limit
+
+    @staticmethod
+    def _parse_retry_after(value: str | None) -> float | None:
+        """Parse a Retry-After header (delay in seconds or an HTTP date)."""
+        if not value:
+            return None
+        try:
+            return max(float(value), 0.0)
+        except ValueError:
+            pass
+        try:
+            return max(parsedate_to_datetime(value).timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return None
+
+
+# Global STT scheduler instance
+stt_scheduler = STTScheduler(
+    settings.stt_max_concurrency,
+    settings.stt_max_queue_depth,
+    settings.stt_max_queue_wait_seconds,
+    settings.stt_max_retries,
+)
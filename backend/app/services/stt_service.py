@@ -1,31 +1,370 @@
 """Speech-to-Text service with ElevenLabs API and mock fallback."""
 
+import asyncio
+import functools
+import logging
+import os
 import random
-from typing import BinaryIO
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO
 
+import numpy as np
+
+from app.clients import clients
 from app.config import settings
+from app.services.audio_utils import (
+    CONTAINER_CONTENT_TYPES,
+    WAV_HEADER_SIZE,
+    decode_wav,
+    find_split_points,
+    resample,
+    to_mono,
+    trim_silence,
+    wav_header,
+)
+from app.services.stt_scheduler import STTOverloadedError, stt_scheduler
+from app.services.transcript_cache_service import transcript_cache_service
+
+logger = logging.getLogger(__name__)
 
 
 class STTService:
     """Speech-to-Text service that switches between real and mock implementations."""
 
+    DECODE_SAMPLE_RATE = 16000  # Rate compressed uploads are decoded to for splitting
+    SPLIT_MIN_COMPRESSED_BYTES = 256 * 1024  # Roughly 30 s of Opus; smaller isn't worth decoding
+    CHUNK_SPOOL_MAX_BYTES = 1024 * 1024  # Larger WAV chunks go to disk, like uploads
+
     def __init__(self):
         """Initialize STT service."""
         self.use_mock = settings.use_mock_stt
+        self._lock = threading.Lock()
+        self._counters = {
+            "preprocessed": 0,
+            "silent_skipped": 0,
+            "bytes_in": 0,
+            "bytes_out": 0,
+            "audio_seconds_in": 0.0,
+            "audio_seconds_out": 0.0,
+            "preprocess_seconds": 0.0,
+        }
 
-    async def speech_to_text(self, audio_file: BinaryIO) -> str:
+    async def speech_to_text(
+        self,
+        audio_file: BinaryIO,
+        filename: str = "audio.webm",
+        content_type: str = "audio/webm",
+        user_key: str = "anonymous",
+    ) -> str:
         """
         Convert speech audio to text.
 
         Args:
-            audio_file: Audio file binary data
+            audio_file: Audio file positioned at the start (read, not loaded, by the upload)
+            filename: File name sent to the STT API
+            content_type: MIME type of the audio container
+            user_key: Caller identity used for fair queuing of upstream calls
 
         Returns:
             Transcribed text
+
+        Raises:
+            STTOverloadedError: If the upstream is saturated or rate limiting us;
+                callers should retry later rather than get a mock transcript
         """
         if self.use_mock:
             return await self._generate_mock_transcript(audio_file)
-        return await self._elevenlabs_stt(audio_file)
+
+        try:
+            return await self._cached_stt(audio_file, filename, content_type, user_key)
+        except STTOverloadedError:
+            raise
+        except Exception as e:
+            # If ElevenLabs API fails, fall back to mock transcript
+            logger.warning("ElevenLabs STT failed: %r, falling back to mock", e)
+            return await self._generate_mock_transcript(audio_file)
+
+    def stats(self) -> dict[str, Any]:
+        """Get WAV preprocessing statistics (bytes and audio seconds not uploaded)."""
+        with self._lock:
+            counters = dict(self._counters)
+        preprocessed = counters["preprocessed"]
+        return {
+            "preprocessed": preprocessed,
+            "silent_skipped": counters["silent_skipped"],
+            "bytes_saved": counters["bytes_in"] - counters["bytes_out"],
+            "audio_seconds_saved": round(
+                counters["audio_seconds_in"] - counters["audio_seconds_out"], 3
+            ),
+            "bytes_ratio": (
+                round(counters["bytes_out"] / counters["bytes_in"], 3)
+                if counters["bytes_in"]
+                else 1.0
+            ),
+            "avg_preprocess_ms": (
+                round(counters["preprocess_seconds"] * 1000 / preprocessed, 3)
+                if preprocessed
+                else 0.0
+            ),
+        }
+
+    async def _cached_stt(
+        self, audio_file: BinaryIO, filename: str, content_type: str, user_key: str
+    ) -> str:
+        """
+        Transcribe through the transcript cache and the upstream scheduler.
+
+        Identical audio (e.g. a client retrying the same recording) is only
+        sent upstream once, including when the retries overlap. Calls that
+        do go upstream wait for a scheduler slot.
+
+        Args:
+            audio_file: Audio file positioned at the start
+            filename: File name sent to the API
+            content_type: MIME type of the audio container
+            user_key: Caller identity used for fair queuing
+
+        Returns:
+            Transcribed text
+        """
+
+        async def transcribe() -> str:
+            return await self._transcribe_upstream(audio_file, filename, content_type, user_key)
+
+        if not transcript_cache_service.enabled:
+            return await transcribe()
+
+        key = await transcript_cache_service.make_key(
+            audio_file, {"provider": "elevenlabs", "content_type": content_type}
+        )
+        return await transcript_cache_service.get_or_transcribe(key, transcribe)
+
+    async def _transcribe_upstream(
+        self, audio_file: BinaryIO, filename: str, content_type: str, user_key: str
+    ) -> str:
+        """
+        Transcribe a recording upstream, trimming WAV and splitting long takes.
+
+        WAV uploads are trimmed of leading/trailing silence and downmixed and
+        resampled to ``stt_sample_rate`` first (see ``_decode_wav``), so less
+        audio is uploaded and billed; an all-silent take isn't sent at all.
+        Recordings longer than ``stt_split_min_seconds`` are cut into chunks
+        of about ``stt_split_chunk_seconds`` that end in silence. The chunks
+        are transcribed in parallel and their transcripts joined in order,
+        so latency tracks the slowest chunk rather than the whole take.
+
+        Args:
+            audio_file: Audio file positioned at the start
+            filename: File name sent to the API
+            content_type: MIME type of the audio container
+            user_key: Caller identity used for fair queuing
+
+        Returns:
+            Transcribed text
+        """
+        chunks = await self._prepare_chunks(audio_file, content_type)
+        if chunks is None:
+            return await stt_scheduler.run(
+                user_key, lambda: self._elevenlabs_stt(audio_file, filename, content_type)
+            )
+        if not chunks:
+            return ""
+        try:
+            return await self._transcribe_chunks(chunks, user_key)
+        finally:
+            for chunk in chunks:
+                chunk.close()
+
+    async def _transcribe_chunks(self, chunks: list[BinaryIO], user_key: str) -> str:
+        """Transcribe WAV chunks in parallel and join their transcripts in order."""
+        tasks = [
+            asyncio.create_task(
+                stt_scheduler.run(
+                    user_key,
+                    functools.partial(self._elevenlabs_stt, chunk, "chunk.wav", "audio/wav"),
+                )
+            )
+            for chunk in chunks
+        ]
+        try:
+            transcripts = await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+        return " ".join(transcript.strip() for transcript in transcripts if transcript.strip())
+
+    async def _prepare_chunks(
+        self, audio_file: BinaryIO, content_type: str
+    ) -> list[BinaryIO] | None:
+        """
+        Re-encode a recording as the WAV chunk(s) to upload.
+
+        Args:
+            audio_file: Audio file positioned at the start
+            content_type: MIME type of the audio container
+
+        Returns:
+            WAV chunks in spooled temporary files, which the caller closes
+            (empty if the recording is all silence), or None if the upload
+            should be sent as is: it can't be decoded, or it needs no split
+            and re-encoding wouldn't make it smaller
+        """
+        decoded = await self._decode(audio_file, content_type)
+        if decoded is None:
+            return None
+
+        samples, sample_rate, seconds_in = decoded
+        is_wav = content_type == CONTAINER_CONTENT_TYPES["wav"]
+        size = audio_file.seek(0, os.SEEK_END)
+        audio_file.seek(0)
+        if not len(samples):
+            with self._lock:
+                self._counters["silent_skipped"] += 1
+            if is_wav:
+                self._record_upload(size, 0, seconds_in, 0.0)
+            return []
+
+        cuts = []
+        if len(samples) >= settings.stt_split_min_seconds * sample_rate:
+            cuts = await asyncio.to_thread(
+                find_split_points, samples, sample_rate, settings.stt_split_chunk_seconds
+            )
+        bounds = [0, *cuts, len(samples)]
+        bytes_out = samples.nbytes + WAV_HEADER_SIZE * (len(bounds) - 1)
+        if not cuts and bytes_out >= size:
+            if is_wav:
+                self._record_upload(size, size, seconds_in, seconds_in)
+            return None
+
+        chunks = await asyncio.to_thread(self._spool_chunks, samples, sample_rate, bounds)
+        if is_wav:
+            self._record_upload(size, bytes_out, seconds_in, len(samples) / sample_rate)
+        return chunks
+
+    def _spool_chunks(
+        self, samples: np.ndarray, sample_rate: int, bounds: list[int]
+    ) -> list[BinaryIO]:
+        """Write ``samples[bounds[i]:bounds[i + 1]]`` as WAV files, on disk past the spool limit."""
+        chunks: list[BinaryIO] = []
+        try:
+            for start, end in zip(bounds, bounds[1:], strict=False):
+                chunk = samples[start:end]
+                spooled = tempfile.SpooledTemporaryFile(max_size=self.CHUNK_SPOOL_MAX_BYTES)
+                chunks.append(spooled)  # type: ignore[arg-type]
+                spooled.write(wav_header(chunk.nbytes, sample_rate))
+                spooled.write(np.ascontiguousarray(chunk))
+                spooled.seek(0)
+        except BaseException:
+            for spooled in chunks:
+                spooled.close()
+            raise
+        return chunks
+
+    def _record_upload(
+        self, bytes_in: int, bytes_out: int, seconds_in: float, seconds_out: float
+    ) -> None:
+        """Count what a preprocessed WAV upload saved (nothing if it is sent as is)."""
+        with self._lock:
+            self._counters["bytes_in"] += bytes_in
+            self._counters["bytes_out"] += bytes_out
+            self._counters["audio_seconds_in"] += seconds_in
+            self._counters["audio_seconds_out"] += seconds_out
+
+    async def _decode(
+        self, audio_file: BinaryIO, content_type: str
+    ) -> tuple[np.ndarray, int, float] | None:
+        """
+        Decode an upload to mono 16-bit PCM.
+
+        WAV is memory-mapped and preprocessed (``_decode_wav``). Other
+        containers need ``ffmpeg`` on
+        the PATH (it reads the upload's file descriptor and writes PCM to a
+        pipe); without it they are left undecoded.
+
+        Args:
+            audio_file: Audio file positioned at the start
+            content_type: MIME type of the audio container
+
+        Returns:
+            Tuple of (mono int16 samples, sample_rate, seconds of audio
+            before preprocessing), or None
+        """
+        try:
+            if content_type == CONTAINER_CONTENT_TYPES["wav"]:
+                return await asyncio.to_thread(self._decode_wav, audio_file)
+
+            size = audio_file.seek(0, os.SEEK_END)
+            audio_file.seek(0)
+            if size < self.SPLIT_MIN_COMPRESSED_BYTES or shutil.which("ffmpeg") is None:
+                return None
+
+            process = await asyncio.create_subprocess_exec(
+                "ffmpeg",
+                "-v",
+                "error",
+                "-i",
+                "pipe:0",
+                "-f",
+                "s16le",
+                "-ac",
+                "1",
+                "-ar",
+                str(self.DECODE_SAMPLE_RATE),
+                "pipe:1",
+                stdin=audio_file.fileno(),
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+            pcm, errors = await process.communicate()
+            if process.returncode != 0:
+                logger.warning("ffmpeg couldn't decode upload: %s", errors.decode(errors="replace"))
+                return None
+            samples = np.frombuffer(pcm, dtype="<i2")
+            return samples, self.DECODE_SAMPLE_RATE, len(samples) / self.DECODE_SAMPLE_RATE
+        except (OSError, ValueError) as e:
+            logger.warning("Couldn't decode upload for splitting: %r", e)
+            return None
+        finally:
+            audio_file.seek(0)
+
+    def _decode_wav(self, audio_file: BinaryIO) -> tuple[np.ndarray, int, float]:
+        """
+        Decode a WAV upload and cut it down to what STT needs.
+
+        Downmixes and resamples to ``stt_sample_rate`` (0 keeps the upload's
+        rate), then trims leading/trailing silence with the energy VAD when
+        ``stt_trim_silence`` is set. Both are single vectorized passes over
+        the memory-mapped samples, a few milliseconds per 30 s clip.
+
+        Args:
+            audio_file: WAV file positioned at the start
+
+        Returns:
+            Tuple of (mono int16 samples, sample_rate, seconds of audio in
+            the upload); samples is empty if the recording is all silence
+        """
+        start = time.perf_counter()
+        samples, sample_rate = decode_wav(audio_file)
+        seconds_in = len(samples) / sample_rate
+
+        if settings.stt_sample_rate:
+            samples = resample(samples, sample_rate, settings.stt_sample_rate)
+            sample_rate = min(sample_rate, settings.stt_sample_rate)
+        else:
+            samples = to_mono(samples)
+        if settings.stt_trim_silence:
+            begin, end = trim_silence(samples, sample_rate)
+            samples = samples[begin:end]
+
+        # Bytes and seconds are counted once it's known what gets uploaded
+        with self._lock:
+            self._counters["preprocessed"] += 1
+            self._counters["preprocess_seconds"] += time.perf_counter() - start
+        return samples, sample_rate, seconds_in
 
     async def _generate_mock_transcript(self, audio_file: BinaryIO) -> str:
         """
@@ -62,40 +401,35 @@ class STTService:
             phrase2 = random.choice(mock_phrases)
             return f"{phrase1} {phrase2}"
 
-    async def _elevenlabs_stt(self, audio_file: BinaryIO) -> str:
+    async def _elevenlabs_stt(
+        self, audio_file: BinaryIO, filename: str = "audio.webm", content_type: str = "audio/webm"
+    ) -> str:
         """
         Call ElevenLabs API for speech-to-text.
 
+        The file object is handed to httpx as is, so the multipart body is
+        streamed from it in chunks rather than copied into memory.
+
         Args:
             audio_file: Audio file to transcribe
+            filename: File name sent to the API
+            content_type: MIME type of the audio container
 
         Returns:
             Transcribed text
-        """
-        import httpx
-
-        api_key = settings.elevenlabs_api_key
-        url = "https://api.elevenlabs.io/v1/speech-to-text"
-
-        headers = {"xi-api-key": api_key}
-
-        # Read the audio content
-        audio_content = audio_file.read()
-        audio_file.seek(0)  # Reset file pointer
 
-        files = {"audio": ("audio.webm", audio_content, "audio/webm")}
+        Raises:
+            httpx.HTTPError: If the request fails
+        """
+        files = {"audio": (filename, audio_file, content_type)}
 
-        try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(url, headers=headers, files=files)
-                response.raise_for_status()
+        response = await clients.elevenlabs.post(
+            "/v1/speech-to-text", files=files, timeout=settings.stt_timeout_seconds
+        )
+        response.raise_for_status()
 
-                result = response.json()
-                return result.get("text", "")
-        except (httpx.HTTPError, Exception) as e:
-            # If ElevenLabs API fails, fall back to mock transcript
-            print(f"ElevenLabs STT failed: {str(e)}, falling back to mock")
-            return await self._generate_mock_transcript(audio_file)
+        result = response.json()
+        return result.get("text", "")
 
 
 # Global STT service instance
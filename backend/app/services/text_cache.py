@@ -0,0 +1,227 @@
+"""Two-tier text cache with request coalescing, shared by the STT and AI feedback caches."""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+
+class TextCache:
+    """
+    Two-tier cache of upstream text results with request coalescing.
+
+    Results live in a bounded in-memory LRU with a TTL, optionally backed
+    by JSON files on disk so they survive restarts. Identical requests
+    arriving while the first one is still in flight wait for its result
+    instead of making their own upstream call. Subclasses provide the keys.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float, cache_dir: str = ""):
+        """Initialize text cache."""
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        # key -> (text, expires_at, upstream latency in seconds), oldest first
+        self._entries: OrderedDict[str, tuple[str, float, float]] = OrderedDict()
+        self._in_flight: dict[str, asyncio.Future[str]] = {}
+        self._lock = threading.Lock()
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "coalesced": 0,
+            "misses": 0,
+        }
+        self._saved_seconds = 0.0
+        self._upstream_seconds = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        """Check if caching is enabled."""
+        return self.max_entries > 0
+
+    async def get_or_create(self, key: str, create: Callable[[], Awaitable[str]]) -> str:
+        """
+        Get a cached text, or run ``create`` once for all concurrent callers.
+
+        Failures are not cached; every waiting caller sees the exception.
+        If the caller making the upstream call is cancelled (e.g. its client
+        disconnected), the next waiting caller makes it instead.
+
+        Args:
+            key: Cache key
+            create: Coroutine factory making the upstream call
+
+        Returns:
+            Cached or created text
+        """
+        while True:
+            cached = self._get_memory(key)
+            if cached is not None:
+                return cached
+
+            in_flight = self._in_flight.get(key)
+            if in_flight is None:
+                break
+            try:
+                text = await asyncio.shield(in_flight)
+            except asyncio.CancelledError:
+                task = asyncio.current_task()
+                if not in_flight.cancelled() or (task is not None and task.cancelling()):
+                    raise
+                continue  # Only the leader was cancelled: take over
+            with self._lock:
+                self._counters["coalesced"] += 1
+                entry = self._entries.get(key)
+                if entry is not None:
+                    self._saved_seconds += entry[2]
+            return text
+
+        future: asyncio.Future[str] = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        try:
+            text = await self._get_disk(key)
+            if text is None:
+                with self._lock:
+                    self._counters["misses"] += 1
+                start = time.perf_counter()
+                text = await create()
+                latency = time.perf_counter() - start
+                with self._lock:
+                    self._upstream_seconds += latency
+                await self._put(key, text, latency)
+            future.set_result(text)
+            return text
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved so lone failures aren't logged as unhandled
+            raise
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            del self._in_flight[key]
+
+    async def get(self, key: str) -> str | None:
+        """
+        Get a cached text without creating it; a miss counts towards the stats.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached text, or None
+        """
+        text = self._get_memory(key)
+        if text is None:
+            text = await self._get_disk(key)
+        if text is None:
+            with self._lock:
+                self._counters["misses"] += 1
+        return text
+
+    async def put(self, key: str, text: str, latency: float) -> None:
+        """
+        Store a text created outside ``get_or_create`` (e.g. assembled from a stream).
+
+        Args:
+            key: Cache key
+            text: Text to store
+            latency: Seconds the upstream call took
+        """
+        with self._lock:
+            self._upstream_seconds += latency
+        await self._put(key, text, latency)
+
+    def stats(self) -> dict[str, Any]:
+        """Get cache statistics."""
+        with self._lock:
+            hits = self._counters["memory_hits"] + self._counters["disk_hits"]
+            hits += self._counters["coalesced"]
+            lookups = hits + self._counters["misses"]
+            return {
+                **self._counters,
+                "hit_ratio": round(hits / lookups, 3) if lookups else 0.0,
+                "saved_seconds": round(self._saved_seconds, 3),
+                "upstream_seconds": round(self._upstream_seconds, 3),
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "in_flight": len(self._in_flight),
+            }
+
+    def _get_memory(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            text, expires_at, latency = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            self._counters["memory_hits"] += 1
+            self._saved_seconds += latency
+            return text
+
+    def _remember(self, key: str, text: str, expires_at: float, latency: float) -> None:
+        with self._lock:
+            self._entries[key] = (text, expires_at, latency)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    async def _get_disk(self, key: str) -> str | None:
+        if self.cache_dir is None:
+            return None
+        entry = await asyncio.to_thread(self._read, key)
+        if entry is None:
+            return None
+
+        text, expires_at, latency = entry
+        self._remember(key, text, expires_at, latency)
+        with self._lock:
+            self._counters["disk_hits"] += 1
+            self._saved_seconds += latency
+        return text
+
+    async def _put(self, key: str, text: str, latency: float) -> None:
+        expires_at = time.time() + self.ttl_seconds
+        self._remember(key, text, expires_at, latency)
+        if self.cache_dir is None:
+            return
+        try:
+            await asyncio.to_thread(self._write, key, text, expires_at, latency)
+        except OSError as e:
+            logger.warning("Failed to write %s entry %s: %r", type(self).__name__, key, e)
+
+    def _path(self, key: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def _read(self, key: str) -> tuple[str, float, float] | None:
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        if entry["expires_at"] <= time.time():
+            path.unlink(missing_ok=True)
+            return None
+        return entry["text"], entry["expires_at"], entry["latency"]
+
+    def _write(self, key: str, text: str, expires_at: float, latency: float) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(f".{threading.get_ident()}.tmp")
+        tmp_path.write_text(
+            json.dumps({"text": text, "expires_at": expires_at, "latency": latency}),
+            encoding="utf-8",
+        )
+        os.replace(tmp_path, path)
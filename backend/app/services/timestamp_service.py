@@ -1,45 +1,402 @@
 """Timestamp service for generating sentence timing in audio."""
 
+import re
+import struct
+from pathlib import Path
 from typing import Any
 
+import numpy as np
+
+from app.services.audio_utils import decode_wav, frame_energy_db, frame_length, to_mono
+
+AudioSource = bytes | memoryview | str | Path
+
+WORD_PATTERN = re.compile(r"\S+")
+
+
+class CharacterAlignment:
+    """
+    Per-character start/end times for a piece of synthesized text.
+
+    Times are kept in two float32 arrays rather than per-character objects,
+    so a 10-minute material costs a few tens of KB.
+    """
+
+    __slots__ = ("characters", "starts", "ends")
+
+    def __init__(self, characters: str, starts: np.ndarray, ends: np.ndarray):
+        """Initialize character alignment."""
+        if not len(characters) == len(starts) == len(ends):
+            raise ValueError("Alignment arrays must match the number of characters")
+        self.characters = characters
+        self.starts = np.asarray(starts, dtype=np.float32)
+        self.ends = np.asarray(ends, dtype=np.float32)
+
+    def __len__(self) -> int:
+        return len(self.characters)
+
+    @classmethod
+    def from_elevenlabs(cls, payload: dict[str, Any]) -> "CharacterAlignment":
+        """
+        Parse an ElevenLabs ``alignment`` object.
+
+        Args:
+            payload: Dict with characters, character_start_times_seconds
+                and character_end_times_seconds
+
+        Returns:
+            Character alignment
+        """
+        return cls(
+            "".join(payload["characters"]),
+            np.array(payload["character_start_times_seconds"], dtype=np.float32),
+            np.array(payload["character_end_times_seconds"], dtype=np.float32),
+        )
+
+    @classmethod
+    def uniform(cls, text: str, duration: float) -> "CharacterAlignment":
+        """Spread characters evenly over a duration (used by mock TTS)."""
+        edges = np.linspace(0.0, duration, len(text) + 1, dtype=np.float32)
+        return cls(text, edges[:-1], edges[1:])
+
+    @classmethod
+    def concat(
+        cls, parts: list[tuple["CharacterAlignment", float]], separator: str = " "
+    ) -> "CharacterAlignment":
+        """
+        Join clip alignments into one track alignment.
+
+        Args:
+            parts: (alignment, clip start time in seconds) pairs, in order
+            separator: Text inserted between clips (zero-length in time)
+
+        Returns:
+            Track alignment whose text is ``separator.join`` of the clip texts
+        """
+        characters = []
+        starts = []
+        ends = []
+        for i, (alignment, offset) in enumerate(parts):
+            if i > 0 and separator:
+                gap = np.full(len(separator), offset, dtype=np.float32)
+                characters.append(separator)
+                starts.append(gap)
+                ends.append(gap)
+            characters.append(alignment.characters)
+            starts.append(alignment.starts + np.float32(offset))
+            ends.append(alignment.ends + np.float32(offset))
+
+        if not parts:
+            return cls("", np.empty(0, np.float32), np.empty(0, np.float32))
+        return cls("".join(characters), np.concatenate(starts), np.concatenate(ends))
+
+    def span(self, start: int, end: int) -> tuple[float, float] | None:
+        """
+        Get the time span of the non-whitespace characters in [start, end).
+
+        Returns:
+            Tuple of (start_time, end_time), or None if the range is blank
+        """
+        text = self.characters[start:end]
+        first = len(text) - len(text.lstrip())
+        last = len(text.rstrip())
+        if first >= last:
+            return None
+        return float(self.starts[start + first]), float(self.ends[start + last - 1])
+
+    def words(self, start: int, end: int) -> list[dict[str, Any]]:
+        """
+        Get word-level timings for the characters in [start, end).
+
+        Returns:
+            List of dicts with word, start_time and end_time
+        """
+        return [
+            {
+                "word": match.group(),
+                "start_time": round(float(self.starts[match.start()]), 3),
+                "end_time": round(float(self.ends[match.end() - 1]), 3),
+            }
+            for match in WORD_PATTERN.finditer(self.characters, start, end)
+        ]
+
+    def to_bytes(self) -> bytes:
+        """Serialize to a compact binary form (count, float32 arrays, UTF-8 text)."""
+        return b"".join(
+            [
+                struct.pack("<I", len(self)),
+                self.starts.astype("<f4").tobytes(),
+                self.ends.astype("<f4").tobytes(),
+                self.characters.encode("utf-8"),
+            ]
+        )
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CharacterAlignment":
+        """Deserialize from ``to_bytes`` output."""
+        (count,) = struct.unpack_from("<I", data)
+        starts = np.frombuffer(data, dtype="<f4", count=count, offset=4)
+        ends = np.frombuffer(data, dtype="<f4", count=count, offset=4 + 4 * count)
+        characters = data[4 + 8 * count :].decode("utf-8")
+        return cls(characters, starts, ends)
+
 
 class TimestampService:
     """Service for generating timestamps for sentences in audio."""
 
-    @staticmethod
-    def generate_timestamps(sentences: list[str], total_duration: int) -> list[dict[str, Any]]:
+    # Energy-based alignment parameters
+    FRAME_MS = 10.0
+    SILENCE_DB = 35.0  # Frames this far below the loudest frame count as silence
+    MIN_PEAK_DB = -60.0  # Quieter audio than this is treated as all silence
+    MIN_GAP_SECONDS = 0.15
+    GAP_BONUS = 0.5  # Seconds of duration error traded per second of pause length
+    MAX_GAPS_PER_BOUNDARY = 4
+    MAX_SHIFT_SECONDS = 1.0  # Allowed duration error for word-count priors...
+    MAX_SHIFT_RATIO = 0.4  # ...or this fraction of the sentence, if larger
+    CLIP_MAX_SHIFT_SECONDS = 0.75  # Allowed duration error for TTS clip priors
+
+    def generate_timestamps(
+        self,
+        sentences: list[str],
+        total_duration: float,
+        audio: AudioSource | None = None,
+        alignment: CharacterAlignment | None = None,
+        include_words: bool = False,
+    ) -> list[dict[str, Any]]:
         """
-        Generate timestamps for sentences based on word count.
+        Generate timestamps for sentences.
 
-        Uses a simple heuristic: distribute time proportionally based on
-        the number of words in each sentence.
+        With TTS character alignment, boundaries are exact: each sentence
+        spans its first to last spoken character, and the switch between
+        sentences happens in the middle of the pause. Otherwise time is
+        distributed proportionally to the number of words in each sentence,
+        and if the audio is given each boundary is then snapped to a pause
+        in the signal, using the word-count split only as a prior.
 
         Args:
             sentences: List of sentence texts
             total_duration: Total audio duration in seconds
+            audio: Optional 16-bit PCM WAV (bytes or file path) to align against
+            alignment: Optional character alignment for ``" ".join(sentences)``
+            include_words: Add word-level timings (requires alignment)
 
         Returns:
             List of timestamp dictionaries with start_time, end_time, text
+            (and words, if requested and available)
         """
         if not sentences:
             return []
 
+        if alignment is not None and alignment.characters == " ".join(sentences):
+            return self._timestamps_from_alignment(
+                sentences, total_duration, alignment, include_words
+            )
+
         # Count words in each sentence
-        word_counts = [len(sentence.split()) for sentence in sentences]
-        total_words = sum(word_counts)
+        word_counts = np.array([len(sentence.split()) for sentence in sentences], dtype=np.float64)
+        total_words = word_counts.sum()
 
         if total_words == 0:
             return []
 
-        timestamps = []
-        current_time = 0.0
+        boundaries = np.concatenate(([0.0], np.cumsum(word_counts) / total_words * total_duration))
+
+        if audio is not None:
+            boundaries = self.align_boundaries(
+                audio, boundaries, self.MAX_SHIFT_SECONDS, self.MAX_SHIFT_RATIO
+            )
+
+        return self._build_timestamps(sentences, boundaries, total_duration)
 
-        for i, (sentence, word_count) in enumerate(zip(sentences, word_counts, strict=True)):
-            # Calculate duration for this sentence
-            sentence_duration = (word_count / total_words) * total_duration
+    def timestamps_from_clips(
+        self,
+        clips: list[dict[str, Any]],
+        audio: AudioSource | None = None,
+        include_words: bool = False,
+    ) -> list[dict[str, Any]]:
+        """
+        Build timestamps from per-sentence TTS clips.
+
+        If every clip carries character alignment, timestamps come straight
+        from it. Otherwise the clip boundaries are the sentence boundaries,
+        and if the audio is given each boundary is moved into the middle of
+        the surrounding pause so subtitles switch during silence rather than
+        right before the next sentence starts.
+
+        Args:
+            clips: Clip dicts from ``TTSService.synthesize_sentences``
+            audio: Optional 16-bit PCM WAV (bytes or file path) to align against
+            include_words: Add word-level timings (requires alignment)
+
+        Returns:
+            List of timestamp dictionaries with start_time, end_time, text
+            (and words, if requested and available)
+        """
+        if not clips:
+            return []
+
+        if all(clip.get("alignment") is not None for clip in clips):
+            alignment = CharacterAlignment.concat(
+                [(clip["alignment"], clip["start_time"]) for clip in clips]
+            )
+            return self._timestamps_from_alignment(
+                [clip["text"] for clip in clips],
+                round(clips[-1]["end_time"], 3),
+                alignment,
+                include_words,
+            )
+
+        boundaries = np.array(
+            [clips[0]["start_time"], *(clip["end_time"] for clip in clips)], dtype=np.float64
+        )
+
+        if audio is not None:
+            boundaries = self.align_boundaries(audio, boundaries, self.CLIP_MAX_SHIFT_SECONDS)
+
+        return self._build_timestamps(
+            [clip["text"] for clip in clips], boundaries, round(clips[-1]["end_time"], 3)
+        )
+
+    def _timestamps_from_alignment(
+        self,
+        sentences: list[str],
+        total_duration: float,
+        alignment: CharacterAlignment,
+        include_words: bool,
+    ) -> list[dict[str, Any]]:
+        """Derive timestamps from character alignment of ``" ".join(sentences)``."""
+        char_ranges = []
+        position = 0
+        for sentence in sentences:
+            char_ranges.append((position, position + len(sentence)))
+            position += len(sentence) + 1
+
+        spans = [alignment.span(start, end) for start, end in char_ranges]
+
+        # Switch sentences halfway between one's last and the next's first character
+        boundaries = np.empty(len(sentences) + 1, dtype=np.float64)
+        boundaries[0] = 0.0
+        boundaries[-1] = total_duration
+        for i in range(1, len(sentences)):
+            previous, current = spans[i - 1], spans[i]
+            if previous is not None and current is not None:
+                boundaries[i] = (previous[1] + current[0]) / 2
+            elif current is not None:
+                boundaries[i] = current[0]
+            elif previous is not None:
+                boundaries[i] = previous[1]
+            else:
+                boundaries[i] = boundaries[i - 1]
+        boundaries = np.maximum.accumulate(np.clip(boundaries, 0.0, total_duration))
+
+        timestamps = self._build_timestamps(sentences, boundaries, total_duration)
+        if include_words:
+            for ts, (start, end) in zip(timestamps, char_ranges, strict=True):
+                ts["words"] = alignment.words(start, end)
+        return timestamps
+
+    def align_boundaries(
+        self,
+        audio: AudioSource,
+        boundaries: np.ndarray,
+        max_shift: float,
+        shift_ratio: float = 0.0,
+    ) -> np.ndarray:
+        """
+        Snap internal sentence boundaries to pauses in the audio.
+
+        Frame energy is computed with vectorized NumPy and runs of quiet
+        frames become candidate gaps. A dynamic program then picks one gap
+        per boundary, in order, so that each sentence's aligned duration
+        stays close to its prior duration (within the search window) while
+        favouring longer pauses. Matching durations rather than absolute
+        positions keeps drift in the prior from accumulating. If no
+        consistent assignment exists the prior is returned unchanged.
 
-            start_time = round(current_time, 3)
-            end_time = round(current_time + sentence_duration, 3)
+        Args:
+            audio: 16-bit PCM WAV (bytes or file path)
+            boundaries: Prior boundaries in seconds, including start and end
+            max_shift: Minimum allowed duration error per sentence in seconds
+            shift_ratio: Allowed duration error as a fraction of the sentence duration
+
+        Returns:
+            Aligned boundaries (same shape, non-decreasing)
+        """
+        if len(boundaries) <= 2:
+            return boundaries
+
+        samples, sample_rate = decode_wav(audio)
+        energy_db = frame_energy_db(to_mono(samples), sample_rate, self.FRAME_MS)
+        if energy_db.size == 0 or energy_db.max() < self.MIN_PEAK_DB:
+            return boundaries
+
+        gap_starts, gap_ends = self._find_gaps(
+            energy_db,
+            frame_seconds=frame_length(sample_rate, self.FRAME_MS) / sample_rate,
+            max_gaps=self.MAX_GAPS_PER_BOUNDARY * len(boundaries),
+        )
+        if gap_starts.size == 0:
+            return boundaries
+
+        # Nodes: start, each gap centre, end
+        centers = np.concatenate(([boundaries[0]], (gap_starts + gap_ends) / 2, [boundaries[-1]]))
+        bonus = np.concatenate(([0.0], (gap_ends - gap_starts) * self.GAP_BONUS, [0.0]))
+        spans = centers[None, :] - centers[:, None]  # spans[k, j]: time from node k to node j
+        nodes = np.arange(len(centers))
+
+        durations = np.diff(boundaries)
+        cost = np.full(len(centers), np.inf)
+        cost[0] = 0.0
+        back = np.empty((len(durations), len(centers)), dtype=np.intp)
+        for i, duration in enumerate(durations):
+            window = max(max_shift, shift_ratio * duration)
+            error = np.abs(spans - duration)
+            total = cost[:, None] + np.where((spans > 0) & (error <= window), error, np.inf)
+            back[i] = total.argmin(axis=0)
+            cost = total[back[i], nodes] - bonus
+
+        if not np.isfinite(cost[-1]):
+            return boundaries
+
+        path = [len(centers) - 1]
+        for i in range(len(durations) - 1, -1, -1):
+            path.append(back[i, path[-1]])
+        return centers[path[::-1]]
+
+    def _find_gaps(
+        self, energy_db: np.ndarray, frame_seconds: float, max_gaps: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Find pauses as runs of quiet frames.
+
+        Only the ``max_gaps`` longest pauses are kept, which bounds the
+        alignment cost on noisy recordings.
+
+        Returns:
+            Tuple of (gap_starts, gap_ends) in seconds, in time order
+        """
+        silent = energy_db < energy_db.max() - self.SILENCE_DB
+        edges = np.flatnonzero(np.diff(np.concatenate(([0], silent.view(np.int8), [0]))))
+        starts, ends = edges[0::2], edges[1::2]
+
+        keep = (ends - starts) * frame_seconds >= self.MIN_GAP_SECONDS
+        starts, ends = starts[keep], ends[keep]
+
+        if len(starts) > max_gaps:
+            longest = np.sort(np.argsort(starts - ends, kind="stable")[:max_gaps])
+            starts, ends = starts[longest], ends[longest]
+
+        return starts * frame_seconds, ends * frame_seconds
+
+    @staticmethod
+    def _build_timestamps(
+        sentences: list[str], boundaries: np.ndarray, total_duration: float
+    ) -> list[dict[str, Any]]:
+        """Turn n+1 boundaries into n timestamp dictionaries."""
+        timestamps = []
+        for i, sentence in enumerate(sentences):
+            start_time = round(float(boundaries[i]), 3)
+            end_time = round(float(boundaries[i + 1]), 3)
 
             # Ensure last sentence ends exactly at total duration
             if i == len(sentences) - 1:
@@ -54,8 +411,6 @@ class TimestampService:
                 }
             )
 
-            current_time = end_time
-
         return timestamps
 
 
@@ -0,0 +1,68 @@
+"""Cache for STT transcripts, keyed by a hash of the audio content."""
+
+import asyncio
+import hashlib
+import json
+from collections.abc import Awaitable, Callable
+from typing import Any, BinaryIO
+
+from app.config import settings
+from app.services.text_cache import TextCache
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class TranscriptCacheService(TextCache):
+    """
+    Two-tier transcript cache with request coalescing.
+
+    Identical requests arriving while the first one is still being
+    transcribed wait for its result instead of making their own upstream
+    call (see ``TextCache``).
+    """
+
+    async def make_key(self, audio_file: BinaryIO, params: dict[str, Any]) -> str:
+        """
+        Hash an audio file and the transcription parameters.
+
+        The file is read in chunks (off the event loop) and rewound
+        afterwards, so it can still be streamed to the STT API.
+
+        Args:
+            audio_file: Audio file positioned at the start
+            params: Parameters that change the transcript (model, format...)
+
+        Returns:
+            Hex SHA-256 digest
+        """
+        return await asyncio.to_thread(self._hash_file, audio_file, params)
+
+    async def get_or_transcribe(self, key: str, transcribe: Callable[[], Awaitable[str]]) -> str:
+        """
+        Get a cached transcript, or run ``transcribe`` once for all concurrent callers.
+
+        Failures are not cached; every waiting caller sees the exception.
+
+        Args:
+            key: Cache key from ``make_key``
+            transcribe: Coroutine factory making the upstream call
+
+        Returns:
+            Transcript
+        """
+        return await self.get_or_create(key, transcribe)
+
+    @staticmethod
+    def _hash_file(audio_file: BinaryIO, params: dict[str, Any]) -> str:
+        digest = hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8"))
+        audio_file.seek(0)
+        while chunk := audio_file.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+        audio_file.seek(0)
+        return digest.hexdigest()
+
+
+# Global transcript cache instance
+transcript_cache_service = TranscriptCacheService(
+    settings.stt_cache_max_entries, settings.stt_cache_ttl_seconds, settings.stt_cache_dir
+)
@@ -1,14 +1,51 @@
 """Text-to-Speech service with ElevenLabs API and mock fallback."""
 
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+from collections import deque
+from typing import Any, BinaryIO
+
+from app.clients import clients
 from app.config import settings
+from app.services.audio_cache_service import audio_cache_service
+from app.services.audio_utils import (
+    BYTES_PER_SAMPLE,
+    SAMPLE_RATE,
+    WAV_HEADER_SIZE,
+    pcm_duration,
+    wav_header,
+)
+from app.services.timestamp_service import CharacterAlignment
+
+logger = logging.getLogger(__name__)
 
 
 class TTSService:
     """Text-to-Speech service that switches between real and mock implementations."""
 
+    # Mock speaking rate (avg 150 words per minute)
+    WORDS_PER_SECOND = 150 / 60
+    MIN_MOCK_CLIP_SECONDS = 0.5
+    MOCK_SILENCE_SECONDS = 30  # Initial size of the shared mock silence buffer
+
+    VOICE_ID = "21m00Tcm4TlvDq8ikWAM"  # Default voice (Rachel)
+    MODEL_ID = "eleven_monolingual_v1"
+    VOICE_SETTINGS = {"stability": 0.5, "similarity_boost": 0.5}
+    OUTPUT_FORMAT = f"pcm_{SAMPLE_RATE}"
+
     def __init__(self):
         """Initialize TTS service."""
         self.use_mock = settings.use_mock_tts
+        # Mock clips are zero-copy slices of this shared buffer
+        self._silence = memoryview(
+            bytes(
+                self.MOCK_SILENCE_SECONDS * SAMPLE_RATE * BYTES_PER_SAMPLE if self.use_mock else 0
+            )
+        )
 
     async def text_to_speech(self, text: str) -> tuple[bytes, int]:
         """
@@ -20,99 +57,297 @@ class TTSService:
         Returns:
             Tuple of (audio_bytes, duration_seconds)
         """
-        if self.use_mock:
-            return await self._generate_mock_audio(text)
-        return await self._elevenlabs_tts(text)
+        pcm, _ = await self._synthesize_cached(text)
+        duration = max(round(pcm_duration(len(pcm))), 1)
+        return wav_header(len(pcm)) + pcm, duration
 
-    async def _generate_mock_audio(self, text: str) -> tuple[bytes, int]:
+    async def synthesize_sentences(
+        self, sentences: list[str], out: BinaryIO
+    ) -> tuple[float, list[dict[str, Any]]]:
         """
-        Generate mock audio file for development.
+        Synthesize each sentence separately and write them as one WAV track.
 
-        Creates a deterministic audio file based on text hash.
-        In production with real API keys, this won't be used.
+        Sentences are synthesized concurrently and each one is retried
+        independently, so a single failure doesn't throw away the rest of
+        the material. Clips are written to ``out`` in order as soon as they
+        are ready, and at most ``tts_max_concurrency`` clips are in flight,
+        so memory stays bounded no matter how long the material is.
 
         Args:
-            text: Input text
+            sentences: List of sentence texts, in order
+            out: Seekable binary file to write the WAV track to
 
         Returns:
-            Tuple of (audio_bytes, duration_seconds)
+            Tuple of (duration_seconds, clips) where each clip dict has text,
+            start_sample/end_sample, start_byte/end_byte (offsets into the WAV
+            file), start_time/end_time in seconds and the clip's character
+            alignment (None if the TTS backend didn't provide it)
         """
-        # Calculate approximate duration (avg 150 words per minute)
-        word_count = len(text.split())
-        duration = max(int(word_count / 150 * 60), 1)
-
-        # Generate a simple WAV file header + silence
-        # This is a minimal valid WAV file
-        sample_rate = 22050
-        num_samples = sample_rate * duration
-        num_channels = 1
-        bits_per_sample = 16
-
-        # WAV header
-        wav_header = bytearray()
-        wav_header.extend(b"RIFF")
-        wav_header.extend(
-            (36 + num_samples * num_channels * bits_per_sample // 8).to_bytes(4, "little")
+        window = max(settings.tts_max_concurrency, 1)
+        pending: deque[asyncio.Task[tuple[bytes | memoryview, CharacterAlignment | None]]] = deque()
+        next_index = 0
+
+        def schedule(
+            index: int,
+        ) -> asyncio.Task[tuple[bytes | memoryview, CharacterAlignment | None]]:
+            return asyncio.create_task(
+                self._synthesize_cached(
+                    sentences[index],
+                    previous_text=sentences[index - 1] if index > 0 else None,
+                    next_text=sentences[index + 1] if index + 1 < len(sentences) else None,
+                )
+            )
+
+        # Placeholder header; patched once the data size is known
+        out.write(wav_header(0))
+
+        clips = []
+        offset = 0
+        try:
+            for text in sentences:
+                while next_index < len(sentences) and len(pending) < window:
+                    pending.append(schedule(next_index))
+                    next_index += 1
+
+                pcm, alignment = await pending.popleft()
+                out.write(pcm)
+
+                start_sample = offset // BYTES_PER_SAMPLE
+                end_sample = (offset + len(pcm)) // BYTES_PER_SAMPLE
+                clips.append(
+                    {
+                        "text": text,
+                        "start_sample": start_sample,
+                        "end_sample": end_sample,
+                        "start_byte": WAV_HEADER_SIZE + offset,
+                        "end_byte": WAV_HEADER_SIZE + offset + len(pcm),
+                        "start_time": start_sample / SAMPLE_RATE,
+                        "end_time": end_sample / SAMPLE_RATE,
+                        "alignment": alignment,
+                    }
+                )
+                offset += len(pcm)
+        finally:
+            for task in pending:
+                task.cancel()
+
+        out.seek(0)
+        out.write(wav_header(offset))
+        out.seek(0, io.SEEK_END)
+        out.flush()
+
+        return pcm_duration(offset), clips
+
+    def cache_key(
+        self, text: str, previous_text: str | None = None, next_text: str | None = None
+    ) -> str:
+        """
+        Get the content address of a clip synthesized from text.
+
+        Args:
+            text: Text to convert
+            previous_text: Preceding sentence (prosody context)
+            next_text: Following sentence (prosody context)
+
+        Returns:
+            Cache key
+        """
+        model_id = "mock" if self.use_mock else self.MODEL_ID
+        return audio_cache_service.make_key(
+            text,
+            self.VOICE_ID,
+            model_id,
+            self.VOICE_SETTINGS,
+            self.OUTPUT_FORMAT,
+            previous_text,
+            next_text,
         )
-        wav_header.extend(b"WAVE")
-        wav_header.extend(b"fmt ")
-        wav_header.extend((16).to_bytes(4, "little"))  # Format chunk size
-        wav_header.extend((1).to_bytes(2, "little"))  # Audio format (PCM)
-        wav_header.extend(num_channels.to_bytes(2, "little"))
-        wav_header.extend(sample_rate.to_bytes(4, "little"))
-        wav_header.extend((sample_rate * num_channels * bits_per_sample // 8).to_bytes(4, "little"))
-        wav_header.extend((num_channels * bits_per_sample // 8).to_bytes(2, "little"))
-        wav_header.extend(bits_per_sample.to_bytes(2, "little"))
-        wav_header.extend(b"data")
-        wav_header.extend((num_samples * num_channels * bits_per_sample // 8).to_bytes(4, "little"))
 
-        # Generate silence (zeros)
-        audio_data = bytes(num_samples * num_channels * bits_per_sample // 8)
+    def track_key(self, sentences: list[str]) -> str:
+        """
+        Get the content address of a full track built from sentences.
 
-        audio_bytes = bytes(wav_header) + audio_data
+        Args:
+            sentences: List of sentence texts, in order
 
-        return audio_bytes, duration
+        Returns:
+            Cache key (also used as the storage object name)
+        """
+        clip_keys = "\n".join(
+            self.cache_key(
+                sentence,
+                previous_text=sentences[index - 1] if index > 0 else None,
+                next_text=sentences[index + 1] if index + 1 < len(sentences) else None,
+            )
+            for index, sentence in enumerate(sentences)
+        )
+        return hashlib.sha256(clip_keys.encode("ascii")).hexdigest()
 
-    async def _elevenlabs_tts(self, text: str) -> tuple[bytes, int]:
+    async def _synthesize_cached(
+        self, text: str, previous_text: str | None = None, next_text: str | None = None
+    ) -> tuple[bytes | memoryview, CharacterAlignment | None]:
         """
-        Call ElevenLabs API for text-to-speech.
+        Synthesize one clip, serving it from the audio cache when possible.
 
         Args:
             text: Text to convert
+            previous_text: Preceding sentence (prosody context)
+            next_text: Following sentence (prosody context)
 
         Returns:
-            Tuple of (audio_bytes, duration_seconds)
+            Tuple of (raw PCM bytes, character alignment or None)
         """
-        import httpx
+        # Mock audio is free to regenerate and copying it to disk isn't
+        if self.use_mock:
+            return await self._synthesize_pcm(text)
 
-        api_key = settings.elevenlabs_api_key
-        voice_id = "21m00Tcm4TlvDq8ikWAM"  # Default voice (Rachel)
+        key = self.cache_key(text, previous_text, next_text)
+        alignment_key = f"{key}-alignment"
+        cached = await audio_cache_service.get(key)
+        if cached is not None:
+            cached_alignment = await audio_cache_service.get(alignment_key)
+            if cached_alignment is None:
+                return cached, None
+            return cached, CharacterAlignment.from_bytes(cached_alignment)
 
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{voice_id}"
+        pcm, alignment = await self._synthesize_with_retry(text, previous_text, next_text)
+        await audio_cache_service.put(key, pcm)
+        if alignment is not None:
+            await audio_cache_service.put(alignment_key, alignment.to_bytes())
+        return pcm, alignment
 
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": api_key,
-        }
+    async def _synthesize_with_retry(
+        self, text: str, previous_text: str | None = None, next_text: str | None = None
+    ) -> tuple[bytes | memoryview, CharacterAlignment | None]:
+        """
+        Synthesize one clip, retrying transient failures.
+
+        Args:
+            text: Text to convert
+            previous_text: Preceding sentence (prosody context)
+            next_text: Following sentence (prosody context)
 
-        data = {
+        Returns:
+            Tuple of (raw PCM bytes, character alignment or None)
+        """
+        for attempt in range(1, settings.tts_max_retries + 1):
+            try:
+                return await self._synthesize_pcm(text, previous_text, next_text)
+            except Exception as e:
+                logger.warning("TTS attempt %d failed, retrying: %r", attempt, e)
+                await asyncio.sleep(0.5 * attempt)
+
+        return await self._synthesize_pcm(text, previous_text, next_text)
+
+    async def _synthesize_pcm(
+        self, text: str, previous_text: str | None = None, next_text: str | None = None
+    ) -> tuple[bytes | memoryview, CharacterAlignment | None]:
+        """
+        Convert text to raw 16-bit mono PCM at ``SAMPLE_RATE``.
+
+        Args:
+            text: Text to convert
+            previous_text: Preceding sentence (prosody context)
+            next_text: Following sentence (prosody context)
+
+        Returns:
+            Tuple of (raw PCM bytes, character alignment or None)
+        """
+        if self.use_mock:
+            return await self._generate_mock_audio(text)
+        return await self._elevenlabs_tts(text, previous_text, next_text)
+
+    async def _generate_mock_audio(self, text: str) -> tuple[memoryview, CharacterAlignment]:
+        """
+        Generate mock audio for development.
+
+        Produces silence whose length follows the text's word count, with
+        characters spread evenly over it as the alignment. The silence is a
+        read-only view into a shared buffer, so no audio data is allocated
+        per call.
+        In production with real API keys, this won't be used.
+
+        Args:
+            text: Input text
+
+        Returns:
+            Tuple of (raw PCM view (silence), character alignment)
+        """
+        word_count = len(text.split())
+        duration = max(word_count / self.WORDS_PER_SECOND, self.MIN_MOCK_CLIP_SECONDS)
+        num_samples = int(duration * SAMPLE_RATE)
+        num_bytes = num_samples * BYTES_PER_SAMPLE
+
+        if len(self._silence) < num_bytes:
+            # Grow geometrically; views handed out earlier keep the old buffer alive
+            self._silence = memoryview(bytes(max(num_bytes, 2 * len(self._silence))))
+
+        alignment = CharacterAlignment.uniform(text, num_samples / SAMPLE_RATE)
+        return self._silence[:num_bytes], alignment
+
+    async def _elevenlabs_tts(
+        self, text: str, previous_text: str | None = None, next_text: str | None = None
+    ) -> tuple[bytes, CharacterAlignment | None]:
+        """
+        Call ElevenLabs API for text-to-speech with character timestamps.
+
+        Requests raw PCM so clips can be concatenated sample-exactly, and
+        reads the streamed response line by line. Each line is a JSON object
+        carrying a base64 audio chunk and the alignment for its characters.
+
+        Args:
+            text: Text to convert
+            previous_text: Preceding sentence (prosody context)
+            next_text: Following sentence (prosody context)
+
+        Returns:
+            Tuple of (raw PCM bytes, character alignment or None)
+        """
+        url = f"/v1/text-to-speech/{self.VOICE_ID}/stream/with-timestamps"
+
+        data: dict[str, Any] = {
             "text": text,
-            "model_id": "eleven_monolingual_v1",
-            "voice_settings": {"stability": 0.5, "similarity_boost": 0.5},
+            "model_id": self.MODEL_ID,
+            "voice_settings": self.VOICE_SETTINGS,
         }
+        if previous_text:
+            data["previous_text"] = previous_text
+        if next_text:
+            data["next_text"] = next_text
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(url, json=data, headers=headers)
+        pcm = bytearray()
+        alignment_parts: list[tuple[CharacterAlignment, float]] = []
+        last_end = 0.0
+        async with clients.elevenlabs.stream(
+            "POST", url, json=data, params={"output_format": self.OUTPUT_FORMAT}
+        ) as response:
             response.raise_for_status()
+            async for line in response.aiter_lines():
+                if not line.strip():
+                    continue
+                chunk = json.loads(line)
+
+                if chunk.get("alignment"):
+                    part = CharacterAlignment.from_elevenlabs(chunk["alignment"])
+                    # If chunk times restart at zero, anchor them to the audio so far
+                    offset = 0.0
+                    if len(part) and part.starts[0] < last_end - 0.01:
+                        offset = pcm_duration(len(pcm))
+                    alignment_parts.append((part, offset))
+                    if len(part):
+                        last_end = float(part.ends[-1]) + offset
 
-            audio_bytes = response.content
+                if chunk.get("audio_base64"):
+                    pcm.extend(base64.b64decode(chunk["audio_base64"]))
 
-            # Estimate duration (rough approximation)
-            word_count = len(text.split())
-            duration = max(int(word_count / 150 * 60), 1)
+        # Drop a trailing odd byte so sample offsets stay aligned
+        del pcm[len(pcm) - len(pcm) % BYTES_PER_SAMPLE :]
 
-            return audio_bytes, duration
+        alignment = CharacterAlignment.concat(alignment_parts, separator="")
+        if alignment.characters != text:
+            logger.warning("TTS alignment doesn't match the input text; ignoring it")
+            return bytes(pcm), None
+        return bytes(pcm), alignment
 
 
 # Global TTS service instance
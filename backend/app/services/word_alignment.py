@@ -0,0 +1,314 @@
+"""Word-level alignment of a transcript against the expected text."""
+
+from collections.abc import Sequence
+
+# Alignment statuses, in the vocabulary of the word analysis
+CORRECT = "correct"
+SUBSTITUTED = "substituted"
+MISSED = "missed"
+EXTRA = "extra"
+
+_STATUSES = (CORRECT, SUBSTITUTED, MISSED, EXTRA)  # Indexed by backtrace code
+
+BAND_MARGIN = 16  # Initial band half-width around the diagonal
+MAX_DIFF_EDITS = 64  # Missed + extra words up to which the O(ND) diff is used
+
+
+def intern_words(*texts: Sequence[str]) -> list[list[int]]:
+    """
+    Map words to small integer IDs shared across several texts.
+
+    Args:
+        *texts: Word sequences
+
+    Returns:
+        One list of IDs per text; equal words get equal IDs
+    """
+    ids: dict[str, int] = {}
+    return [[ids.setdefault(word, len(ids)) for word in words] for words in texts]
+
+
+def lookup_ids(vocabulary: dict[str, int], words: Sequence[str]) -> list[int]:
+    """
+    Map words to IDs from an existing vocabulary without modifying it.
+
+    Words missing from the vocabulary get fresh IDs past its end, so they
+    can't match anything interned with it.
+
+    Args:
+        vocabulary: Word -> ID mapping (e.g. of a precomputed expected text)
+        words: Word sequence
+
+    Returns:
+        IDs, one per word
+    """
+    unknown: dict[str, int] = {}
+    base = len(vocabulary)
+    ids = []
+    for word in words:
+        word_id = vocabulary.get(word)
+        if word_id is None:
+            word_id = unknown.setdefault(word, base + len(unknown))
+        ids.append(word_id)
+    return ids
+
+
+def align_words(
+    expected: Sequence[str], actual: Sequence[str]
+) -> list[tuple[str, int | None, int | None]]:
+    """
+    Align two word sequences by minimum edit distance (see ``align_ids``).
+
+    Args:
+        expected: Words of the expected text
+        actual: Words the user said
+
+    Returns:
+        Alignment steps in reading order, as (status, expected_index,
+        actual_index) tuples
+    """
+    return align_ids(*intern_words(expected, actual))
+
+
+def align_ids(a: Sequence[int], b: Sequence[int]) -> list[tuple[str, int | None, int | None]]:
+    """
+    Align two interned word sequences by minimum edit distance.
+
+    A missed or extra word costs 1 and a substitution 2, so the alignment
+    matches as many words as possible and pairs a missed word with an extra
+    one as a substitution only when they sit in the same spot.
+
+    A common prefix and suffix are matched directly. The rest is first
+    aligned with Myers' O(ND) diff, which walks runs of matching words for
+    free and so costs little more than a single pass for a transcript with
+    few mistakes; it is exact. If that needs more than ``MAX_DIFF_EDITS``
+    missed and extra words, an edit-distance DP takes over. The DP only
+    visits cells within ``k`` columns of the line from the first words to
+    the last ones, with ``k`` starting at ``BAND_MARGIN`` (or at the
+    words-per-row slope of that line, if larger, so consecutive rows of
+    the band always overlap). Mistakes in a read-aloud transcript are
+    local, so the best path drifts
+    from that line by little more than the longest skipped or added run;
+    if it touches the edge of the band, the band is doubled and the DP
+    re-run. Cost is O(n * k), i.e. linear in the text length for a
+    transcript that roughly follows the text (an unbanded DP is
+    quadratic). The band is a heuristic: a transcript unrelated to the
+    text may get a slightly worse than minimal alignment.
+
+    Args:
+        a: Word IDs of the expected text
+        b: Word IDs of what the user said
+
+    Returns:
+        Alignment steps in reading order, as (status, a_index, b_index)
+        tuples: ``correct`` and ``substituted`` carry both indices,
+        ``missed`` only the ``a`` one and ``extra`` only the ``b`` one (the
+        other is None)
+    """
+    n, m = len(a), len(b)
+
+    prefix = 0
+    while prefix < n and prefix < m and a[prefix] == b[prefix]:
+        prefix += 1
+    suffix = 0
+    while suffix < n - prefix and suffix < m - prefix and a[n - 1 - suffix] == b[m - 1 - suffix]:
+        suffix += 1
+
+    steps: list[tuple[str, int | None, int | None]] = [(CORRECT, i, i) for i in range(prefix)]
+    core_a, core_b = list(a[prefix : n - suffix]), list(b[prefix : m - suffix])
+    core_steps = _diff_alignment(core_a, core_b, MAX_DIFF_EDITS)
+    if core_steps is None:
+        core_steps = _banded_alignment(core_a, core_b)
+    for status, i, j in core_steps:
+        steps.append((status, None if i is None else i + prefix, None if j is None else j + prefix))
+    steps.extend((CORRECT, n - suffix + i, m - suffix + i) for i in range(suffix))
+    return steps
+
+
+def _diff_alignment(
+    a: list[int], b: list[int], max_edits: int
+) -> list[tuple[str, int | None, int | None]] | None:
+    """
+    Align ID sequences with Myers' diff, or return None past ``max_edits`` edits.
+
+    ``frontier[k + offset]`` holds the furthest ``a`` index reached on
+    diagonal ``k = i - j`` with ``d`` edits; a copy is kept per ``d`` for
+    the backtrace. Runs of missed and extra words between two matches are
+    then paired up as substitutions, which costs the same and reads better.
+    """
+    n, m = len(a), len(b)
+    offset = max_edits + 1
+    frontier = [0] * (2 * max_edits + 3)
+    history = []
+    for d in range(max_edits + 1):
+        history.append(frontier[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and frontier[k - 1 + offset] < frontier[k + 1 + offset]):
+                i = frontier[k + 1 + offset]  # Extra word in b
+            else:
+                i = frontier[k - 1 + offset] + 1  # Missed word of a
+            j = i - k
+            while i < n and j < m and a[i] == b[j]:
+                i, j = i + 1, j + 1
+            frontier[k + offset] = i
+            if i >= n and j >= m:
+                return _diff_backtrace(history, n, m, offset)
+    return None
+
+
+def _diff_backtrace(
+    history: list[list[int]], n: int, m: int, offset: int
+) -> list[tuple[str, int | None, int | None]]:
+    """Recover the diff path from the per-``d`` frontiers, pairing gaps as substitutions."""
+    steps: list[tuple[str, int | None, int | None]] = []  # Built back to front
+    missed: list[int] = []  # Indices in the current gap between matches, back to front
+    extra: list[int] = []
+
+    def close_gap() -> None:
+        pairs = min(len(missed), len(extra))
+        steps.extend((MISSED, i, None) for i in missed[: len(missed) - pairs])
+        steps.extend((EXTRA, None, j) for j in extra[: len(extra) - pairs])
+        for t in range(pairs):
+            steps.append(
+                (SUBSTITUTED, missed[len(missed) - pairs + t], extra[len(extra) - pairs + t])
+            )
+        missed.clear()
+        extra.clear()
+
+    i, j = n, m
+    for d in range(len(history) - 1, 0, -1):
+        frontier = history[d]
+        k = i - j
+        if k == -d or (k != d and frontier[k - 1 + offset] < frontier[k + 1 + offset]):
+            prev_i = frontier[k + 1 + offset]
+            prev_j = prev_i - k - 1
+            mid_i, mid_j = prev_i, prev_j + 1
+        else:
+            prev_i = frontier[k - 1 + offset]
+            prev_j = prev_i - k + 1
+            mid_i, mid_j = prev_i + 1, prev_j
+        if i > mid_i:
+            close_gap()
+        while i > mid_i:
+            i, j = i - 1, j - 1
+            steps.append((CORRECT, i, j))
+        if mid_j > prev_j:
+            extra.append(prev_j)
+        else:
+            missed.append(prev_i)
+        i, j = prev_i, prev_j
+    if i:
+        close_gap()
+    while i:
+        i, j = i - 1, j - 1
+        steps.append((CORRECT, i, j))
+    close_gap()
+    steps.reverse()
+    return steps
+
+
+def _banded_alignment(a: list[int], b: list[int]) -> list[tuple[str, int | None, int | None]]:
+    """Align ID sequences with a banded DP, widening the band while the path hits its edge."""
+    n, m = len(a), len(b)
+    if not n:
+        return [(EXTRA, None, j) for j in range(m)]
+    if not m:
+        return [(MISSED, i, None) for i in range(n)]
+
+    # Rows must overlap: consecutive row bases move by up to ceil(m / n) columns
+    k = max(BAND_MARGIN, -(-m // n))
+    while True:
+        bases, pointers = _banded_dp(a, b, k)
+        steps, touches_edge = _backtrace(bases, pointers, m, 2 * k + 1)
+        if not touches_edge or k >= max(n, m):
+            return steps
+        k *= 2
+
+
+def _banded_dp(a: list[int], b: list[int], k: int) -> tuple[list[int], list[bytearray]]:
+    """
+    Run the edit-distance DP over cells within ``k`` columns of the n-by-m diagonal.
+
+    Row ``i`` covers columns ``base[i] .. base[i] + 2k`` around
+    ``i * m // n``, stored at slots 1..2k+1; slots 0 and 2k+2 stay infinite
+    as sentinels. With ``shift = base[i] - base[i - 1]``, the diagonal,
+    upper and left neighbours of slot ``t`` are ``prev[t + shift - 1]``,
+    ``prev[t + shift]`` and ``cur[t - 1]``.
+
+    Returns:
+        Tuple of (per-row column bases, per-row backtrace codes by slot);
+        codes index ``_STATUSES``
+    """
+    n, m = len(a), len(b)
+    width = 2 * k + 1
+    infinity = 2 * (n + m) + 1
+
+    base = -k
+    prev = [infinity] * (width + 2)
+    row = bytearray(width + 2)
+    for j in range(min(m, k) + 1):
+        prev[j - base + 1] = j
+        row[j - base + 1] = 3
+    bases = [base]
+    pointers = [row]
+
+    for i in range(1, n + 1):
+        new_base = i * m // n - k
+        shift = new_base - base
+        base = new_base
+        prev.extend([infinity] * shift)  # Neighbours past the previous row's band
+        cur = [infinity] * (width + 2)
+        row = bytearray(width + 2)
+        word = a[i - 1]
+
+        j_lo, j_hi = max(base, 0), min(base + width - 1, m)
+        if j_lo == 0:  # Column 0: everything so far was missed
+            cur[1 - base] = i
+            row[1 - base] = 2
+            j_lo = 1
+
+        t_lo = j_lo - base + 1
+        left = cur[t_lo - 1]
+        for t, other in enumerate(b[j_lo - 1 : j_hi], t_lo):
+            if word == other:
+                best, code = prev[t + shift - 1], 0
+            else:
+                best, code = prev[t + shift - 1] + 2, 1
+            up = prev[t + shift] + 1
+            if up < best:
+                best, code = up, 2
+            if left + 1 < best:
+                best, code = left + 1, 3
+            cur[t] = left = best
+            row[t] = code
+
+        bases.append(base)
+        pointers.append(row)
+        prev = cur
+
+    return bases, pointers
+
+
+def _backtrace(
+    bases: list[int], pointers: list[bytearray], m: int, width: int
+) -> tuple[list[tuple[str, int | None, int | None]], bool]:
+    """Follow backtrace codes from the last cell; also report whether the path hit the band edge."""
+    steps: list[tuple[str, int | None, int | None]] = []
+    touches_edge = False
+    i, j = len(pointers) - 1, m
+    while i or j:
+        t = j - bases[i] + 1
+        touches_edge = touches_edge or (t == 1 and j > 0) or (t == width and j < m)
+        code = pointers[i][t]
+        status = _STATUSES[code]
+        if code <= 1:
+            i, j = i - 1, j - 1
+            steps.append((status, i, j))
+        elif code == 2:
+            i -= 1
+            steps.append((status, i, None))
+        else:
+            j -= 1
+            steps.append((status, None, j))
+    steps.reverse()
+    return steps, touches_edge
@@ -0,0 +1,153 @@
+"""
+Benchmark the AI feedback cache across score-bucket widths.
+
+Simulates ``--attempts`` practice attempts on a few materials: each attempt
+drops or swaps words, favouring each material's few hard words (as real
+learners do), and is scored with ``ScoringService``. Attempts arrive in
+waves of ``--concurrency`` and ask ``AIService.generate_feedback`` for
+feedback from a fake Gemini client. For each bucket width the run reports
+the hit ratio, the Gemini calls made and saved, how many were coalesced
+with an identical in-flight request, the number of distinct feedback texts
+(variety) and the wall time.
+
+Usage:
+    uv run python benchmarks/bench_feedback_cache.py [--attempts 2000] [--latency-ms 200]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark")
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+# Send every attempt to Gemini, so only the cache saves calls
+os.environ["AI_TEMPLATE_MIN_SCORE"] = "101"
+os.environ["AI_TEMPLATE_MAX_SPOKEN_RATIO"] = "0"
+os.environ["AI_LLM_MAX_DIFF_WORDS"] = "1000000"
+
+from app.clients import clients  # noqa: E402
+from app.services import ai_service as ai_module  # noqa: E402
+from app.services.feedback_cache_service import FeedbackCacheService  # noqa: E402
+from app.services.scoring_service import scoring_service  # noqa: E402
+
+MATERIALS = [
+    "Hello, my name is John. Nice to meet you. I like to study English every day.",
+    "The weather is beautiful today, so we decided to walk through the park.",
+    "Could you tell me how to get to the nearest train station, please?",
+    "She thought the thirty-three thieves were thrilled about the theatre.",
+]
+HARD_WORDS = 4  # Per material; most mistakes fall on these
+BUCKET_WIDTHS = [0, 5, 10, 20, 50]
+
+
+class CountingGemini:
+    """google-genai client stand-in that counts calls and numbers its answers."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    async def _generate(self, **kwargs):
+        self.calls += 1
+        number = self.calls
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text=f"Feedback #{number}")
+
+
+def _attempts(total: int, seed: int) -> list[tuple[str, str]]:
+    """Make (expected_text, transcript) pairs with skewed, repeating mistakes."""
+    rng = random.Random(seed)
+    hard = {text: rng.sample(range(len(text.split())), HARD_WORDS) for text in MATERIALS}
+    attempts = []
+    for _ in range(total):
+        text = rng.choice(MATERIALS)
+        words = text.lower().replace(",", "").replace(".", "").replace("?", "").split()
+        mistakes = min(int(rng.expovariate(0.8)), len(words))
+        for _ in range(mistakes):
+            if rng.random() < 0.8:
+                index = rng.choice(hard[text])
+            else:
+                index = rng.randrange(len(words))
+            if index < len(words):
+                words[index] = "uh" if rng.random() < 0.3 else ""
+        attempts.append((text, " ".join(word for word in words if word)))
+    return attempts
+
+
+async def _run(
+    width: float, attempts: list[tuple[str, str]], concurrency: int, latency: float
+) -> dict:
+    gemini = CountingGemini(latency)
+    clients._gemini = gemini
+    clients._gemini_loaded = True
+    cache = FeedbackCacheService(len(attempts), 3600, score_bucket=width)
+    ai_module.feedback_cache_service = cache
+    service = ai_module.AIService()
+    service.use_mock = False
+
+    requests = []
+    for text, transcript in attempts:
+        result = scoring_service.analyze(text, transcript)
+        requests.append(
+            {
+                "expected_text": text,
+                "user_text": transcript,
+                "score": result["score"],
+                "missed_words": result["missed_words"],
+                "extra_words": result["extra_words"],
+            }
+        )
+
+    feedback = []
+    start = time.perf_counter()
+    for offset in range(0, len(requests), concurrency):
+        wave = requests[offset : offset + concurrency]
+        feedback += await asyncio.gather(*(service.generate_feedback(**r) for r in wave))
+    elapsed = time.perf_counter() - start
+    return {
+        "stats": cache.stats(),
+        "calls": gemini.calls,
+        "variety": len(set(feedback)),
+        "elapsed": elapsed,
+    }
+
+
+async def main(total: int, concurrency: int, latency_ms: float, seed: int) -> None:
+    attempts = _attempts(total, seed)
+    print(
+        f"{total} attempts on {len(MATERIALS)} materials, waves of {concurrency}, "
+        f"{latency_ms:.0f} ms simulated Gemini latency"
+    )
+    print(
+        f"{'bucket':>6} {'hit ratio':>9} {'calls':>6} {'saved':>6} {'coalesced':>9} "
+        f"{'variety':>7} {'time':>8}"
+    )
+    for width in BUCKET_WIDTHS:
+        result = await _run(width, attempts, concurrency, latency_ms / 1000)
+        stats = result["stats"]
+        label = "exact" if width == 0 else str(width)
+        print(
+            f"{label:>6} {stats['hit_ratio']:>9.3f} {result['calls']:>6} "
+            f"{total - result['calls']:>6} {stats['coalesced']:>9} {result['variety']:>7} "
+            f"{result['elapsed']:>7.2f}s"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attempts", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.attempts, args.concurrency, args.latency_ms, args.seed))
@@ -0,0 +1,128 @@
+"""
+Benchmark concurrent /api/feedback with blocking vs async Gemini calls.
+
+Gemini is replaced by a fake client whose sync ``models.generate_content``
+sleeps (blocking the event loop, as the pre-async code path did) and whose
+``aio.models.generate_content`` awaits an equivalent delay. Both runs fire
+``--requests`` feedback requests at once while probing /health, and report
+the wall time of the batch and how long the health probes were held up.
+
+Usage:
+    uv run python benchmarks/bench_feedback_concurrency.py [--requests 20] [--latency-ms 1000]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark")
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["FEEDBACK_CACHE_MAX_ENTRIES"] = "0"  # Identical requests would share one call
+os.environ["AI_LLM_USER_BUDGET"] = "0"  # All requests come from one client
+
+import httpx  # noqa: E402
+
+from app.clients import clients  # noqa: E402
+from app.services.ai_service import AIService, ai_service  # noqa: E402
+from app.services.material_profile_service import material_profile_service  # noqa: E402
+from main import app  # noqa: E402
+
+MATERIAL_ID = "benchmark-material"
+PROBE_INTERVAL = 0.05
+SENTENCES = [
+    ("s1", "Hello, my name is John.", 0.0, 2.0),
+    ("s2", "Nice to meet you.", 2.0, 3.5),
+    ("s3", "I like to study English every day.", 3.5, 6.0),
+]
+
+
+class FakeGemini:
+    """google-genai client stand-in with a fixed response latency."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.models = SimpleNamespace(generate_content=self._generate)
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate_async))
+
+    def _generate(self, **kwargs):
+        time.sleep(self.latency)
+        return SimpleNamespace(text="Great job! Keep practicing.")
+
+    async def _generate_async(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        return SimpleNamespace(text="Great job! Keep practicing.")
+
+
+class BlockingAIService(AIService):
+    """The pre-async behaviour: call the synchronous SDK on the event loop."""
+
+    async def _call_gemini(self, prompt: str) -> str:
+        response = clients.gemini.models.generate_content(model="benchmark", contents=prompt)
+        return response.text
+
+
+async def _probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Probe /health every PROBE_INTERVAL; a wait includes any event-loop stall."""
+    waits = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(PROBE_INTERVAL)
+        await client.get("/health")
+        waits.append(time.perf_counter() - start - PROBE_INTERVAL)
+    return waits
+
+
+async def _fire(client: httpx.AsyncClient, total: int) -> tuple[float, float, float]:
+    stop = asyncio.Event()
+    probe = asyncio.create_task(_probe_health(client, stop))
+    body = {"material_id": MATERIAL_ID, "user_transcript": "hello my name is john nice to you"}
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.post("/api/feedback", json=body) for _ in range(total))
+    )
+    elapsed = time.perf_counter() - start
+    stop.set()
+    waits = await probe
+    assert all(r.status_code == 200 for r in responses), responses[0].text
+    return elapsed, max(waits), sum(waits) / len(waits)
+
+
+async def main(total: int, latency_ms: float) -> None:
+    clients._gemini = FakeGemini(latency_ms / 1000)
+    clients._gemini_loaded = True
+    ai_service.use_mock = False
+    material_profile_service.build(MATERIAL_ID, 6, SENTENCES)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        ai_service.__class__ = BlockingAIService
+        before = await _fire(client, total)
+        ai_service.__class__ = AIService
+        after = await _fire(client, total)
+
+    print(
+        f"{total} concurrent /api/feedback requests, {latency_ms:.0f} ms simulated Gemini latency"
+    )
+    for label, (elapsed, worst, mean) in (("blocking", before), ("async", after)):
+        print(
+            f"  {label:<9}: {elapsed:7.3f} s  ({total / elapsed:6.1f} req/s), "
+            f"/health wait max {worst * 1000:7.1f} ms, mean {mean * 1000:6.1f} ms"
+        )
+    print(f"  speedup  : {before[0] / after[0]:.1f}x")
+    print(f"  ai stats : {ai_service.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
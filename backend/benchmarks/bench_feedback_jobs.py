@@ -0,0 +1,99 @@
+"""
+Benchmark time-to-first-result of /api/feedback with inline vs queued AI feedback.
+
+Uses the fake Gemini client of ``bench_feedback_concurrency`` and fires
+``--requests`` feedback requests at once, first waiting for the AI text
+inline, then with ``async_feedback`` (score at once, text streamed from the
+job's SSE endpoint). Reports the mean and worst time until the score
+arrives and until the AI text arrives.
+
+Usage:
+    uv run python benchmarks/bench_feedback_jobs.py [--requests 20] [--latency-ms 1000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+from bench_feedback_concurrency import MATERIAL_ID, SENTENCES, FakeGemini  # noqa: E402
+
+from app.clients import clients  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.feedback_job_service import feedback_job_service  # noqa: E402
+from app.services.material_profile_service import material_profile_service  # noqa: E402
+from main import app  # noqa: E402
+
+BODY = {"material_id": MATERIAL_ID, "user_transcript": "hello my name is john nice to you"}
+
+
+async def _inline(client: httpx.AsyncClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    response = await client.post("/api/feedback", json=BODY)
+    assert response.status_code == 200 and response.json()["ai_feedback"]
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed
+
+
+async def _queued(client: httpx.AsyncClient) -> tuple[float, float]:
+    start = time.perf_counter()
+    response = await client.post("/api/feedback", json={**BODY, "async_feedback": True})
+    assert response.status_code == 200
+    first_result = time.perf_counter() - start
+
+    job_id = response.json()["feedback_job_id"]
+    async with client.stream("GET", f"/api/feedback/jobs/{job_id}/events") as events:
+        async for line in events.aiter_lines():
+            if line.startswith("data: "):
+                assert json.loads(line[6:])["ai_feedback"]
+                break
+    return first_result, time.perf_counter() - start
+
+
+async def _fire(client: httpx.AsyncClient, total: int, queued: bool) -> list[tuple[float, float]]:
+    run = _queued if queued else _inline
+    return await asyncio.gather(*(run(client) for _ in range(total)))
+
+
+async def main(total: int, latency_ms: float) -> None:
+    clients._gemini = FakeGemini(latency_ms / 1000)
+    clients._gemini_loaded = True
+    ai_service.use_mock = False
+    material_profile_service.build(MATERIAL_ID, 6, SENTENCES)
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        results = {
+            "inline": await _fire(client, total, queued=False),
+            "queued": await _fire(client, total, queued=True),
+        }
+    await feedback_job_service.close()
+
+    print(
+        f"{total} concurrent /api/feedback requests, {latency_ms:.0f} ms simulated Gemini latency"
+    )
+    print(
+        f"{'mode':>8} {'score mean':>11} {'score max':>10} {'AI text mean':>13} {'AI text max':>12}"
+    )
+    for mode, timings in results.items():
+        scores = [first for first, _ in timings]
+        texts = [last for _, last in timings]
+        print(
+            f"{mode:>8} {sum(scores) / total * 1000:>9.1f}ms {max(scores) * 1000:>8.1f}ms "
+            f"{sum(texts) / total * 1000:>11.1f}ms {max(texts) * 1000:>10.1f}ms"
+        )
+    print(f"  jobs: {feedback_job_service.stats()}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=1000.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,171 @@
+"""
+Benchmark the feedback router against sending every attempt to Gemini.
+
+Simulates ``--attempts`` attempts by ``--users`` users on a long material:
+a mix of near-perfect reads, recordings that barely started, ordinary
+attempts with a few mistakes and attempts that lose the thread. Each is
+scored with ``ScoringService`` and sent to ``AIService.generate_feedback``
+with a fake Gemini client whose latency grows with the prompt length.
+The feedback cache is disabled so only routing is measured. Reports the
+Gemini calls made, the share avoided (by reason), the mean prompt size and
+the total Gemini time, first with every attempt going to the LLM with the
+full prompt, then with the router and compact prompts.
+
+Usage:
+    uv run python benchmarks/bench_feedback_routing.py [--attempts 1000] [--users 50]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark")
+os.environ["GOOGLE_API_KEY"] = "benchmark"
+os.environ["FEEDBACK_CACHE_MAX_ENTRIES"] = "0"
+
+from app.clients import clients  # noqa: E402
+from app.config import settings  # noqa: E402
+from app.services.ai_service import ROUTE_LLM, AIService  # noqa: E402
+from app.services.scoring_service import scoring_service  # noqa: E402
+
+MATERIAL = (
+    "Every morning I take the early train into the city. The carriage is usually quiet, "
+    "so I read the news or listen to a podcast about history. When the train reaches the "
+    "river, the sun comes up over the old bridge and the whole car turns gold. I get off "
+    "two stops later, buy a coffee from the stand by the station and walk the last ten "
+    "minutes to the office. On rainy days I take the bus instead, but it is slower and "
+    "always crowded, and I miss the view of the river in the morning light."
+)
+BASE_LATENCY = 0.3  # Seconds per Gemini call
+SECONDS_PER_PROMPT_CHAR = 0.0002  # Roughly 1 ms per prompt token
+CONCURRENCY = 20
+FILLERS = ["um", "uh", "er"]
+
+
+class PromptTimedGemini:
+    """google-genai client stand-in whose latency grows with the prompt."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+        self.aio = SimpleNamespace(models=SimpleNamespace(generate_content=self._generate))
+
+    async def _generate(self, model: str, contents: str):
+        self.calls += 1
+        latency = BASE_LATENCY + len(contents) * SECONDS_PER_PROMPT_CHAR
+        self.seconds += latency
+        await asyncio.sleep(latency / 100)  # Scaled down; ``seconds`` keeps the full time
+        return SimpleNamespace(text="Nice work! Watch your word endings.")
+
+
+def _attempts(total: int, users: int, seed: int) -> list[tuple[str, str]]:
+    """Make (user_key, transcript) pairs for a realistic mix of attempts."""
+    rng = random.Random(seed)
+    words = scoring_service.tokenize(MATERIAL)
+    attempts = []
+    for _ in range(total):
+        user = f"user-{int(rng.paretovariate(1.2)) % users}"  # A few users practice a lot
+        kind = rng.random()
+        if kind < 0.1:  # Barely started
+            spoken = words[: rng.randint(0, 8)]
+        elif kind < 0.35:  # Near-perfect
+            spoken = [w for w in words if rng.random() > 0.01]
+        elif kind < 0.95:  # A few mistakes
+            spoken = []
+            for word in words:
+                roll = rng.random()
+                if roll < 0.06:
+                    continue
+                if roll < 0.09 and len(word) > 3:
+                    word = word[:-1]
+                spoken.append(word)
+                if rng.random() < 0.02:
+                    spoken.append(rng.choice(FILLERS))
+        else:  # Lost the thread
+            spoken = [w for w in words if rng.random() > 0.5] + rng.choices(FILLERS, k=10)
+        attempts.append((user, " ".join(spoken)))
+    return attempts
+
+
+async def _run(attempts: list[tuple[str, str]], routed: bool) -> dict:
+    if routed:
+        settings.ai_compact_prompt = True
+    else:
+        settings.ai_template_min_score = 101.0
+        settings.ai_template_max_spoken_ratio = 0.0
+        settings.ai_llm_max_diff_words = 10**6
+        settings.ai_llm_user_budget = 0
+        settings.ai_compact_prompt = False
+
+    gemini = PromptTimedGemini()
+    clients._gemini = gemini
+    clients._gemini_loaded = True
+    service = AIService()
+    service.use_mock = False
+
+    requests = []
+    for user, transcript in attempts:
+        result = scoring_service.analyze(MATERIAL, transcript)
+        requests.append(
+            {
+                "expected_text": MATERIAL,
+                "user_text": transcript,
+                "score": result["score"],
+                "missed_words": result["missed_words"],
+                "extra_words": result["extra_words"],
+                "user_key": user,
+            }
+        )
+
+    start = time.perf_counter()
+    for offset in range(0, len(requests), CONCURRENCY):
+        wave = requests[offset : offset + CONCURRENCY]
+        await asyncio.gather(*(service.generate_feedback(**r) for r in wave))
+    return {
+        "stats": service.stats(),
+        "calls": gemini.calls,
+        "gemini_seconds": gemini.seconds,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+async def main(total: int, users: int, seed: int) -> None:
+    attempts = _attempts(total, users, seed)
+    defaults = settings.model_copy()
+    baseline = await _run(attempts, routed=False)
+    for name in type(settings).model_fields:
+        setattr(settings, name, getattr(defaults, name))
+    routed = await _run(attempts, routed=True)
+
+    print(
+        f"{total} attempts by {users} users on a {len(scoring_service.tokenize(MATERIAL))}-word "
+        f"material ({BASE_LATENCY * 1000:.0f} ms + ~1 ms/prompt token simulated Gemini latency)"
+    )
+    print(f"{'mode':>8} {'calls':>6} {'avoided':>8} {'prompt chars':>13} {'Gemini time':>12}")
+    for mode, result in (("all LLM", baseline), ("routed", routed)):
+        stats = result["stats"]
+        print(
+            f"{mode:>8} {result['calls']:>6} {stats['llm_avoided_ratio']:>8.1%} "
+            f"{stats['avg_prompt_chars']:>13} {result['gemini_seconds']:>11.1f}s"
+        )
+    reasons = {r: n for r, n in routed["stats"]["routes"].items() if r != ROUTE_LLM}
+    print(f"  template reasons: {reasons}")
+    print(f"  Gemini time saved: {1 - routed['gemini_seconds'] / baseline['gemini_seconds']:.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--attempts", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    asyncio.run(main(args.attempts, args.users, args.seed))
@@ -0,0 +1,124 @@
+"""
+Benchmark time-to-first-token of streamed vs inline AI feedback.
+
+Extends the fake Gemini client of ``bench_feedback_concurrency`` with a
+streaming call that sends its first chunk after FIRST_CHUNK_SHARE of the
+response latency and spreads the rest evenly. Fires ``--requests`` requests
+at once against ``/api/feedback`` (text arrives with the response) and
+``/api/feedback/stream`` (SSE), and reports the mean and worst time until
+the score, the first AI text and the full AI text arrive. The app runs
+under uvicorn in a background thread, since httpx's ASGI transport
+buffers whole responses.
+
+Usage:
+    uv run python benchmarks/bench_feedback_stream.py [--requests 20] [--latency-ms 2000]
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+from bench_feedback_concurrency import MATERIAL_ID, SENTENCES, FakeGemini  # noqa: E402
+
+from app.clients import clients  # noqa: E402
+from app.services.ai_service import ai_service  # noqa: E402
+from app.services.material_profile_service import material_profile_service  # noqa: E402
+from main import app  # noqa: E402
+
+PORT = 8767
+FIRST_CHUNK_SHARE = 0.3
+CHUNKS = ["Great job! ", "Your rhythm was steady. ", "Watch the word ", '"meet". ', "Keep going!"]
+BODY = {"material_id": MATERIAL_ID, "user_transcript": "hello my name is john nice to you"}
+
+
+class FakeStreamingGemini(FakeGemini):
+    """Fake client that also streams its response in chunks."""
+
+    def __init__(self, latency: float):
+        super().__init__(latency)
+        self.aio.models.generate_content_stream = self._stream
+
+    async def _stream(self, **kwargs):
+        async def chunks():
+            await asyncio.sleep(self.latency * FIRST_CHUNK_SHARE)
+            for index, text in enumerate(CHUNKS):
+                if index:
+                    await asyncio.sleep(self.latency * (1 - FIRST_CHUNK_SHARE) / (len(CHUNKS) - 1))
+                yield SimpleNamespace(text=text)
+
+        return chunks()
+
+
+async def _inline(client: httpx.AsyncClient) -> tuple[float, float, float]:
+    start = time.perf_counter()
+    response = await client.post("/api/feedback", json=BODY)
+    assert response.status_code == 200 and response.json()["ai_feedback"]
+    elapsed = time.perf_counter() - start
+    return elapsed, elapsed, elapsed
+
+
+async def _streamed(client: httpx.AsyncClient) -> tuple[float, float, float]:
+    start = time.perf_counter()
+    score = first_token = 0.0
+    async with client.stream("POST", "/api/feedback/stream", json=BODY) as events:
+        event = ""
+        async for line in events.aiter_lines():
+            if line.startswith("event: "):
+                event = line[7:]
+            elif line.startswith("data: "):
+                now = time.perf_counter() - start
+                if event == "score":
+                    score = now
+                elif event == "token" and not first_token:
+                    first_token = now
+                elif event == "done":
+                    assert json.loads(line[6:])["ai_feedback"]
+    return score, first_token, time.perf_counter() - start
+
+
+async def main(total: int, latency_ms: float) -> None:
+    clients._gemini = FakeStreamingGemini(latency_ms / 1000)
+    clients._gemini_loaded = True
+    ai_service.use_mock = False
+    material_profile_service.build(MATERIAL_ID, 6, SENTENCES)
+    server = uvicorn.Server(uvicorn.Config(app, port=PORT, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    limits = httpx.Limits(max_connections=2 * total)
+    base_url = f"http://127.0.0.1:{PORT}"
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        results = {
+            "inline": await asyncio.gather(*(_inline(client) for _ in range(total))),
+            "streamed": await asyncio.gather(*(_streamed(client) for _ in range(total))),
+        }
+
+    print(f"{total} concurrent feedback requests, {latency_ms:.0f} ms simulated Gemini latency")
+    print(f"{'mode':>9} {'score':>17} {'first AI text':>17} {'full AI text':>17}   (mean / max)")
+    for mode, timings in results.items():
+        columns = []
+        for column in zip(*timings, strict=True):
+            columns.append(f"{sum(column) / total * 1000:>7.0f} /{max(column) * 1000:>6.0f}ms")
+        print(f"{mode:>9} {columns[0]:>17} {columns[1]:>17} {columns[2]:>17}")
+    server.should_exit = True
+    stats = ai_service.stats()
+    print(f"  exported TTFT: avg {stats['avg_ttft_seconds']}s, p95 {stats['p95_ttft_seconds']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=2000.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,59 @@
+"""
+Benchmark memory use of mock TTS track generation.
+
+Synthesizes 1/10/30-minute materials with the mock TTS backend into temp
+files, several at once, and reports the peak Python allocation per material
+(tracemalloc) and the wall time.
+
+Usage:
+    uv run python benchmarks/bench_mock_tts_memory.py
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+os.environ["ELEVENLABS_API_KEY"] = ""
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.tts_service import TTSService  # noqa: E402
+
+CONCURRENT_MATERIALS = 8
+WORDS_PER_SENTENCE = 15
+
+
+async def synthesize(service: TTSService, sentences: list[str]) -> None:
+    with tempfile.TemporaryFile() as out:
+        await service.synthesize_sentences(sentences, out)
+
+
+async def main() -> None:
+    service = TTSService()
+    sentence = " ".join(["word"] * WORDS_PER_SENTENCE)
+    sentence_seconds = WORDS_PER_SENTENCE / service.WORDS_PER_SECOND
+
+    print(f"{'length':>7} {'materials':>9} {'audio':>9} {'peak/material':>14} {'time':>9}")
+    for minutes in (1, 10, 30):
+        sentences = [sentence] * int(minutes * 60 / sentence_seconds)
+        audio_mb = len(sentences) * sentence_seconds * 22050 * 2 / 1e6
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        await asyncio.gather(*(synthesize(service, sentences) for _ in range(CONCURRENT_MATERIALS)))
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(
+            f"{minutes:>5} m {CONCURRENT_MATERIALS:>9} {audio_mb:>7.1f}MB "
+            f"{peak / CONCURRENT_MATERIALS / 1e3:>12.1f}KB {elapsed * 1000:>7.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark alignment-based scoring on 10/500/5,000-word texts.
+
+Builds an expected text from a small vocabulary and a transcript with
+about 10% of the words missed, substituted or added, then reports the
+best time of ``ScoringService.calculate_score`` and of the alignment
+alone (diff, or banded DP past ``MAX_DIFF_EDITS``), next to an unbanded (full-matrix) DP on the same words
+(skipped above FULL_DP_MAX_WORDS, where it takes tens of seconds).
+
+Usage:
+    uv run python benchmarks/bench_scoring_alignment.py
+"""
+
+import functools
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.scoring_service import ScoringService  # noqa: E402
+from app.services.word_alignment import _banded_dp, align_words, intern_words  # noqa: E402
+
+ERROR_RATE = 0.1
+FULL_DP_MAX_WORDS = 1000
+VOCABULARY = (
+    "the a to of and in is it you that he was for on are with as I his they be at one "
+    "have this from or had by word but what some we can out other were all there when "
+    "up use your how said an each she which do their time if will way about many then"
+).split()
+
+
+def build_texts(num_words: int, rng: random.Random) -> tuple[str, str]:
+    """Build an expected text and a transcript with about ERROR_RATE mistakes."""
+    expected = [rng.choice(VOCABULARY) for _ in range(num_words)]
+    spoken = []
+    for word in expected:
+        roll = rng.random()
+        if roll < ERROR_RATE / 3:
+            continue  # Missed
+        if roll < 2 * ERROR_RATE / 3:
+            spoken.append(rng.choice(VOCABULARY))  # Substituted
+            continue
+        spoken.append(word)
+        if roll < ERROR_RATE:
+            spoken.append(rng.choice(VOCABULARY))  # Extra
+    return " ".join(expected), " ".join(spoken)
+
+
+def best_of(call: Callable[[], object], runs: int) -> float:
+    """Return the best wall time of ``runs`` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    rng = random.Random(0)
+    service = ScoringService()
+
+    print(f"{'words':>6} {'score':>7} {'calculate_score':>16} {'align':>9} {'full DP':>10}")
+    for num_words in (10, 500, 5000):
+        expected_text, user_text = build_texts(num_words, rng)
+        expected, spoken = expected_text.split(), user_text.split()
+        a, b = intern_words(expected, spoken)
+        runs = 200 if num_words < 1000 else 5
+
+        score = service.calculate_score(expected_text, user_text)["score"]
+        scoring = best_of(
+            functools.partial(service.calculate_score, expected_text, user_text), runs
+        )
+        align = best_of(functools.partial(align_words, expected, spoken), runs)
+        full = "n/a"
+        if num_words <= FULL_DP_MAX_WORDS:
+            full_dp = functools.partial(_banded_dp, a, b, max(len(a), len(b)))
+            full = f"{best_of(full_dp, max(runs // 10, 1)):.2f}ms"
+        print(f"{num_words:>6} {score:>6.1f}% {scoring:>14.2f}ms {align:>7.2f}ms {full:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Benchmark phonetic-tolerant scoring against exact matching.
+
+Builds 100/500/2,000-word texts and transcripts in which about 10% of the
+words are replaced by a homophone ("there" -> "their") and 5% by another
+word, then reports the best time of ``ScoringService.analyze`` with exact
+matching and with phonetic matching, both against a precomputed
+``ScoringProfile`` and against the raw text (keys encoded per call, but
+served from the shared key cache).
+
+Usage:
+    uv run python benchmarks/bench_scoring_phonetic.py
+"""
+
+import functools
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.scoring_service import ScoringService  # noqa: E402
+
+HOMOPHONE_RATE = 0.1
+ERROR_RATE = 0.05
+HOMOPHONES = {
+    "there": "their",
+    "two": "to",
+    "right": "write",
+    "know": "no",
+    "see": "sea",
+    "hear": "here",
+    "new": "knew",
+    "for": "four",
+    "by": "buy",
+    "one": "won",
+}
+VOCABULARY = (
+    list(HOMOPHONES)
+    + (
+        "the a of and in is it you that he was on are with as I his they be at "
+        "have this from or had word but what some we can out other were all when"
+    ).split()
+)
+
+
+def build_texts(num_words: int, rng: random.Random) -> tuple[str, str]:
+    """Build an expected text and a transcript with homophones and mistakes."""
+    expected = [rng.choice(VOCABULARY) for _ in range(num_words)]
+    spoken = []
+    for word in expected:
+        roll = rng.random()
+        if roll < HOMOPHONE_RATE and word in HOMOPHONES:
+            spoken.append(HOMOPHONES[word])
+        elif roll > 1 - ERROR_RATE:
+            spoken.append(rng.choice(VOCABULARY))
+        else:
+            spoken.append(word)
+    return " ".join(expected), " ".join(spoken)
+
+
+def best_of(call: Callable[[], object], runs: int) -> float:
+    """Return the best wall time of ``runs`` calls, in milliseconds."""
+    best = float("inf")
+    for _ in range(runs):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main() -> None:
+    rng = random.Random(0)
+    service = ScoringService()
+
+    print(
+        f"{'words':>6} {'exact':>7} {'phonetic':>9} {'exact/profile':>14} {'phonetic/profile':>17}"
+    )
+    for num_words in (100, 500, 2000):
+        expected_text, user_text = build_texts(num_words, rng)
+        profile = service.build_profile([expected_text])
+        runs = 200 if num_words < 1000 else 20
+
+        exact_score = service.analyze(profile, user_text, phonetic=False)["score"]
+        phonetic_score = service.analyze(profile, user_text, phonetic=True)["score"]
+        timings = [
+            best_of(
+                functools.partial(service.analyze, expected, user_text, phonetic=phonetic), runs
+            )
+            for expected in (expected_text, profile)
+            for phonetic in (False, True)
+        ]
+        print(
+            f"{num_words:>6} {exact_score:>6.1f}% {phonetic_score:>8.1f}% "
+            f"{timings[2]:>12.2f}ms {timings[3]:>15.2f}ms"
+            f"   (raw text: {timings[0]:.2f}ms / {timings[1]:.2f}ms)"
+        )
+    print(f"phonetic key cache: {service.stats()['phonetic_keys_cached']} keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark per-request scoring CPU: two calls versus one ``analyze`` pass.
+
+The feedback endpoint used to call ``calculate_score`` and then
+``get_word_analysis``, each tokenizing both texts and aligning them again.
+This times that pair against a single ``ScoringService.analyze`` call on
+material-sized texts with about 10% of the words wrong.
+
+Usage:
+    uv run python benchmarks/bench_scoring_single_pass.py
+"""
+
+import functools
+import random
+import sys
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.scoring_service import ScoringService  # noqa: E402
+
+ERROR_RATE = 0.1
+RUNS = 200
+VOCABULARY = (
+    "The quick brown fox, jumps over the lazy dog. I like to study English every day! "
+    "Can you help me with this problem? Practice makes perfect; thank you very much."
+).split()
+
+
+def build_texts(num_words: int, rng: random.Random) -> tuple[str, str]:
+    """Build an expected text and a transcript with about ERROR_RATE wrong words."""
+    expected = [rng.choice(VOCABULARY) for _ in range(num_words)]
+    spoken = [rng.choice(VOCABULARY) if rng.random() < ERROR_RATE else w for w in expected]
+    return " ".join(expected), " ".join(spoken)
+
+
+def two_calls(service: ScoringService, expected_text: str, user_text: str) -> None:
+    service.calculate_score(expected_text, user_text)
+    service.get_word_analysis(expected_text, user_text)
+
+
+def best_of(call: Callable[[], object]) -> float:
+    """Return the best wall time of RUNS calls, in microseconds."""
+    best = float("inf")
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        call()
+        best = min(best, time.perf_counter() - start)
+    return best * 1e6
+
+
+def main() -> None:
+    rng = random.Random(0)
+    service = ScoringService()
+
+    print(f"{'words':>6} {'two calls':>11} {'analyze':>11} {'saved':>7}")
+    for num_words in (20, 100, 500, 2000):
+        expected_text, user_text = build_texts(num_words, rng)
+        before = best_of(functools.partial(two_calls, service, expected_text, user_text))
+        after = best_of(functools.partial(service.analyze, expected_text, user_text))
+        print(f"{num_words:>6} {before:>9.0f}us {after:>9.0f}us {1 - after / before:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
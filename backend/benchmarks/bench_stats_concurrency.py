@@ -0,0 +1,89 @@
+"""
+Benchmark concurrent /api/stats throughput with blocking vs pooled DB calls.
+
+Supabase is replaced by a fake client whose ``execute()`` sleeps to simulate
+a PostgREST round trip, so the benchmark runs without network access.
+
+Usage:
+    uv run python benchmarks/bench_stats_concurrency.py [--requests 200] [--latency-ms 50]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "benchmark")
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+
+from app.database import Database, db  # noqa: E402
+from main import app  # noqa: E402
+
+
+class FakeQuery:
+    """Query builder stand-in whose execute() blocks like a real round trip."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def execute(self):
+        time.sleep(self.latency)
+        return SimpleNamespace(data=[])
+
+
+class BlockingDatabase(Database):
+    """The pre-pool behaviour: run Supabase calls directly on the event loop."""
+
+    async def run(self, func, *args, **kwargs):
+        return func(*args, **kwargs)
+
+
+async def _fire(client: httpx.AsyncClient, total: int, headers: dict[str, str]) -> float:
+    start = time.perf_counter()
+    responses = await asyncio.gather(
+        *(client.get("/api/stats", headers=headers) for _ in range(total))
+    )
+    elapsed = time.perf_counter() - start
+    assert all(r.status_code == 200 for r in responses)
+    return elapsed
+
+
+async def main(total: int, latency_ms: float) -> None:
+    latency = latency_ms / 1000
+    db.table = lambda name: FakeQuery(latency)  # type: ignore[method-assign]
+    token = jwt.encode(
+        {"sub": "benchmark-user"}, "benchmark-signing-key-not-verified-by-api", algorithm="HS256"
+    )
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        db.__class__ = BlockingDatabase
+        before = await _fire(client, total, headers)
+        db.__class__ = Database
+        after = await _fire(client, total, headers)
+
+    print(f"{total} concurrent /api/stats requests, {latency_ms:.0f} ms simulated DB latency")
+    print(f"  blocking : {before:7.3f} s  ({total / before:8.1f} req/s)")
+    print(f"  pooled   : {after:7.3f} s  ({total / after:8.1f} req/s)  pool={db.pool_size}")
+    print(f"  speedup  : {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.latency_ms))
@@ -0,0 +1,78 @@
+"""
+Benchmark WAV preprocessing before STT (downmix, resample, trim silence).
+
+Builds 30-second takes in common recorder formats (speech-like noise with
+a second of silence at each end), runs them through the service's WAV
+preprocessing and reports the best time per clip and the share of bytes
+and audio that no longer needs uploading. The target is under 5 ms per
+clip; 44.1 kHz stereo, the largest input, can take 6-8 ms on a slow
+single core.
+
+Usage:
+    uv run python benchmarks/bench_stt_preprocess.py
+"""
+
+import asyncio
+import io
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+os.environ["ELEVENLABS_API_KEY"] = "benchmark"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audio_utils import wav_header  # noqa: E402
+from app.services.stt_service import STTService  # noqa: E402
+
+CLIP_SECONDS = 30
+SILENCE_SECONDS = 1.0
+RUNS = 20
+FORMATS = [(16000, 1), (22050, 1), (44100, 1), (44100, 2), (48000, 1), (48000, 2)]
+
+
+def build_clip(sample_rate: int, num_channels: int, rng: np.random.Generator) -> bytes:
+    """Build a WAV take of speech-like noise between two quiet stretches."""
+    frames = CLIP_SECONDS * sample_rate
+    quiet = int(SILENCE_SECONDS * sample_rate)
+    samples = rng.normal(0, 6000, (frames, num_channels))
+    samples[:quiet] *= 0.005
+    samples[-quiet:] *= 0.005
+    pcm = np.clip(samples, -32768, 32767).astype("<i2").tobytes()
+    return wav_header(len(pcm), sample_rate, num_channels) + pcm
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    service = STTService()
+
+    print(f"{'format':>13} {'size':>8} {'time':>8} {'bytes sent':>11} {'audio sent':>11}")
+    for sample_rate, num_channels in FORMATS:
+        audio = io.BytesIO(build_clip(sample_rate, num_channels, rng))
+        best = float("inf")
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            samples, rate, _ = service._decode_wav(audio)
+            best = min(best, time.perf_counter() - start)
+            audio.seek(0)
+
+        # Once more through the upload path, which counts what is actually sent
+        for chunk in asyncio.run(service._prepare_chunks(audio, "audio/wav")) or []:
+            chunk.close()
+
+        sent_bytes = (samples.nbytes + 44) / len(audio.getbuffer())
+        sent_audio = len(samples) / rate / CLIP_SECONDS
+        label = f"{sample_rate / 1000:g}k {'mono' if num_channels == 1 else 'stereo'}"
+        print(
+            f"{label:>13} {len(audio.getbuffer()) / 1e6:>6.2f}MB {best * 1000:>6.2f}ms "
+            f"{sent_bytes:>10.0%} {sent_audio:>10.0%}"
+        )
+
+    print(service.stats())
+
+
+if __name__ == "__main__":
+    main()
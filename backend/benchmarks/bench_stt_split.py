@@ -0,0 +1,85 @@
+"""
+Benchmark silence-split parallel STT on 1/3/5-minute recordings.
+
+Runs the local ElevenLabs stand-in in a background thread with a latency
+proportional to the upload size, then transcribes synthetic WAV takes
+(noise-burst "sentences" separated by pauses) once as a single request and
+once split at pauses, and reports the wall time of each.
+
+Usage:
+    uv run python benchmarks/bench_stt_split.py
+"""
+
+import asyncio
+import io
+import os
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+
+import numpy as np
+
+PORT = 8766
+SECONDS_PER_MB = 1.0  # Stand-in upstream latency
+
+os.environ["ELEVENLABS_API_KEY"] = "benchmark"
+os.environ["ELEVENLABS_BASE_URL"] = f"http://127.0.0.1:{PORT}"
+os.environ["STT_CACHE_MAX_ENTRIES"] = "0"
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from fake_elevenlabs_server import make_handler  # noqa: E402
+
+from app.config import settings  # noqa: E402
+from app.services.audio_utils import wav_header  # noqa: E402
+from app.services.stt_service import STTService  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def build_take(minutes: int, rng: np.random.Generator) -> bytes:
+    """Build a mono WAV take of speech-like bursts separated by pauses."""
+    segments = []
+    elapsed = 0.0
+    while elapsed < minutes * 60:
+        speech = rng.uniform(2.0, 8.0)
+        pause = rng.uniform(0.3, 0.8)
+        segments.append(rng.normal(0, 6000, int(speech * SAMPLE_RATE)))
+        segments.append(rng.normal(0, 30, int(pause * SAMPLE_RATE)))
+        elapsed += speech + pause
+    pcm = np.clip(np.concatenate(segments), -32768, 32767).astype("<i2").tobytes()
+    return wav_header(len(pcm), SAMPLE_RATE) + pcm
+
+
+async def transcribe(service: STTService, audio: bytes, split: bool) -> float:
+    settings.stt_split_min_seconds = 60.0 if split else float("inf")
+    start = time.perf_counter()
+    await service.speech_to_text(io.BytesIO(audio), "take.wav", "audio/wav")
+    return time.perf_counter() - start
+
+
+async def main() -> None:
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", PORT), make_handler({}, stt_delay_per_mb=SECONDS_PER_MB)
+    )
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    rng = np.random.default_rng(0)
+    service = STTService()
+    settings.stt_timeout_seconds = 120.0
+
+    print(f"{'length':>7} {'size':>8} {'whole':>8} {'split':>8}")
+    for minutes in (1, 3, 5):
+        audio = build_take(minutes, rng)
+        whole = await transcribe(service, audio, split=False)
+        split = await transcribe(service, audio, split=True)
+        print(f"{minutes:>5} m {len(audio) / 1e6:>6.1f}MB {whole:>7.2f}s {split:>7.2f}s")
+
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
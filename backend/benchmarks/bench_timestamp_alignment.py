@@ -0,0 +1,75 @@
+"""
+Benchmark signal-based sentence alignment on 1/5/10-minute materials.
+
+Builds synthetic "speech" (noise bursts) with pauses at known sentence
+boundaries, then times TimestampService.generate_timestamps with the audio
+and reports the boundary error against ground truth for both the word-count
+prior and the aligned result.
+
+Usage:
+    uv run python benchmarks/bench_timestamp_alignment.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audio_utils import SAMPLE_RATE, wav_header  # noqa: E402
+from app.services.timestamp_service import TimestampService  # noqa: E402
+
+SECONDS_PER_WORD = 0.4
+
+
+def build_material(minutes: int, rng: np.random.Generator) -> tuple[list[str], bytes, np.ndarray]:
+    """Build sentences, WAV bytes and true sentence boundaries (seconds)."""
+    sentences = []
+    segments = []
+    boundaries = [0.0]
+    elapsed = 0.0
+    while elapsed < minutes * 60:
+        words = int(rng.integers(4, 20))
+        # Real speaking rate varies per sentence, which is what the prior misses
+        speech = words * SECONDS_PER_WORD * rng.uniform(0.7, 1.3)
+        pause = rng.uniform(0.3, 0.8)
+        sentences.append(" ".join(["word"] * words))
+        segments.append(rng.normal(0, 6000, int(speech * SAMPLE_RATE)))
+        segments.append(rng.normal(0, 30, int(pause * SAMPLE_RATE)))
+        elapsed += speech + pause
+        boundaries.append(elapsed - pause / 2)
+
+    pcm = np.clip(np.concatenate(segments), -32768, 32767).astype("<i2").tobytes()
+    boundaries[-1] = len(pcm) / 2 / SAMPLE_RATE
+    return sentences, wav_header(len(pcm)) + pcm, np.array(boundaries)
+
+
+def main() -> None:
+    rng = np.random.default_rng(0)
+    service = TimestampService()
+
+    print(f"{'length':>7} {'sentences':>9} {'time':>9} {'prior err':>10} {'aligned err':>12}")
+    for minutes in (1, 5, 10):
+        sentences, audio, truth = build_material(minutes, rng)
+        duration = truth[-1]
+
+        prior = service.generate_timestamps(sentences, duration)
+
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            aligned = service.generate_timestamps(sentences, duration, audio=audio)
+            runs.append(time.perf_counter() - start)
+
+        prior_err = np.mean(np.abs([ts["end_time"] for ts in prior[:-1]] - truth[1:-1]))
+        aligned_err = np.mean(np.abs([ts["end_time"] for ts in aligned[:-1]] - truth[1:-1]))
+        print(
+            f"{minutes:>5} m {len(sentences):>9} {min(runs) * 1000:>7.1f}ms "
+            f"{prior_err:>9.3f}s {aligned_err:>11.3f}s"
+        )
+
+
+if __name__ == "__main__":
+    main()
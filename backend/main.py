@@ -1,13 +1,42 @@
 """Shadowing App Backend - FastAPI Application."""
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+
+from app.clients import clients
 from app.config import settings
+from app.database import db
+from app.routers import materials, practice
+from app.services.ai_service import ai_service
+from app.services.audio_cache_service import audio_cache_service
+from app.services.feedback_cache_service import feedback_cache_service
+from app.services.feedback_job_service import feedback_job_service
+from app.services.material_profile_service import material_profile_service
+from app.services.scoring_service import scoring_service
+from app.services.stt_scheduler import stt_scheduler
+from app.services.stt_service import stt_service
+from app.services.transcript_cache_service import transcript_cache_service
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create shared upstream clients on startup and release resources on shutdown."""
+    await clients.start()
+    await feedback_job_service.start()
+    yield
+    await feedback_job_service.close()
+    await clients.close()
+    db.close()
+
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Shadowing App API",
     description="API for English shadowing practice with gamification",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Configure CORS
@@ -30,8 +59,19 @@ async def health_check():
         "mock_mode": {
             "tts": settings.use_mock_tts,
             "stt": settings.use_mock_stt,
-            "ai": settings.use_mock_ai
-        }
+            "ai": settings.use_mock_ai,
+        },
+        "db_pool": db.stats(),
+        "tts_cache": audio_cache_service.stats(),
+        "stt_cache": transcript_cache_service.stats(),
+        "stt_scheduler": stt_scheduler.stats(),
+        "stt_preprocess": stt_service.stats(),
+        "material_profiles": material_profile_service.stats(),
+        "scoring": scoring_service.stats(),
+        "ai": ai_service.stats(),
+        "feedback_cache": feedback_cache_service.stats(),
+        "feedback_jobs": feedback_job_service.stats(),
+        "upstream": clients.stats(),
     }
 
 
@@ -39,19 +79,15 @@ async def health_check():
 @app.get("/")
 async def root():
     """Root endpoint."""
-    return {
-        "message": "Shadowing App API",
-        "version": "1.0.0",
-        "docs": "/docs"
-    }
+    return {"message": "Shadowing App API", "version": "1.0.0", "docs": "/docs"}
 
 
 # Include routers
-from app.routers import materials, practice
 app.include_router(materials.router, prefix="/api", tags=["materials"])
 app.include_router(practice.router, prefix="/api", tags=["practice"])
 
 
 if __name__ == "__main__":
     import uvicorn
+
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,183 @@
+"""
+Local stand-in for the ElevenLabs TTS (with timestamps) and STT endpoints.
+
+Serves ``POST /v1/text-to-speech/{voice_id}/stream/with-timestamps`` as
+newline-delimited JSON chunks (``audio_base64`` + ``alignment``). Recorded
+payloads are replayed when one matches the requested text; otherwise a
+synthetic tone is generated with characters spread evenly over it, split
+into chunks whose times restart at zero like the real stream.
+
+Recordings are ``*.jsonl`` files holding the response lines of a real call;
+the requested text is matched against the characters in their alignments.
+
+``POST /v1/speech-to-text`` drains the upload in chunks and answers with a
+fixed transcript, optionally after ``--stt-delay`` seconds plus
+``--stt-delay-per-mb`` seconds per MB uploaded. With
+``--stt-max-concurrency`` it answers 429 with a Retry-After header when more
+transcriptions than that are in flight, like the real rate limiter.
+
+Usage:
+    uv run python scripts/fake_elevenlabs_server.py [--port 8765] [--recordings DIR] \
+        [--stt-delay SECONDS] [--stt-delay-per-mb SECONDS] [--stt-max-concurrency N]
+    ELEVENLABS_API_KEY=test ELEVENLABS_BASE_URL=http://127.0.0.1:8765 uv run uvicorn main:app
+"""
+
+import argparse
+import base64
+import json
+import math
+import re
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.audio_utils import BYTES_PER_SAMPLE, SAMPLE_RATE  # noqa: E402
+
+SECONDS_PER_CHARACTER = 0.06
+CHUNK_CHARACTERS = 40
+PATH_PATTERN = re.compile(r"^/v1/text-to-speech/[^/]+/stream/with-timestamps$")
+STT_PATH = "/v1/speech-to-text"
+STT_TRANSCRIPT = "Hello, my name is John. Nice to meet you."
+READ_CHUNK_SIZE = 64 * 1024
+
+
+def load_recordings(directory: Path | None) -> dict[str, list[str]]:
+    """Index recorded response lines by the text their alignments spell out."""
+    recordings: dict[str, list[str]] = {}
+    if directory is None:
+        return recordings
+    for path in sorted(directory.glob("*.jsonl")):
+        lines = [line for line in path.read_text().splitlines() if line.strip()]
+        text = "".join(
+            "".join(json.loads(line).get("alignment", {}).get("characters", [])) for line in lines
+        )
+        recordings[text] = lines
+    return recordings
+
+
+def synthesize(text: str) -> list[str]:
+    """Generate response lines for a 220 Hz tone with a uniform alignment."""
+    lines = []
+    for start in range(0, len(text), CHUNK_CHARACTERS):
+        characters = list(text[start : start + CHUNK_CHARACTERS])
+        num_samples = int(len(characters) * SECONDS_PER_CHARACTER * SAMPLE_RATE)
+        pcm = b"".join(
+            int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)).to_bytes(
+                BYTES_PER_SAMPLE, "little", signed=True
+            )
+            for i in range(num_samples)
+        )
+        lines.append(
+            json.dumps(
+                {
+                    "audio_base64": base64.b64encode(pcm).decode("ascii"),
+                    "alignment": {
+                        "characters": characters,
+                        "character_start_times_seconds": [
+                            round(i * SECONDS_PER_CHARACTER, 3) for i in range(len(characters))
+                        ],
+                        "character_end_times_seconds": [
+                            round((i + 1) * SECONDS_PER_CHARACTER, 3)
+                            for i in range(len(characters))
+                        ],
+                    },
+                }
+            )
+        )
+    return lines
+
+
+def make_handler(
+    recordings: dict[str, list[str]],
+    stt_delay: float = 0.0,
+    stt_max_concurrency: int = 0,
+    stt_delay_per_mb: float = 0.0,
+) -> type[BaseHTTPRequestHandler]:
+    """Build a request handler bound to the loaded recordings."""
+    stt_lock = threading.Lock()
+    stt_in_flight = 0
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # Keep-alive, like the real API
+
+        def do_POST(self) -> None:  # noqa: N802
+            path = self.path.split("?")[0]
+            if path == STT_PATH:
+                self._transcribe()
+            elif PATH_PATTERN.match(path):
+                self._synthesize()
+            else:
+                self.send_error(404)
+
+        def _synthesize(self) -> None:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            text = body.get("text", "")
+            lines = recordings.get(text) or synthesize(text)
+            payload = "".join(f"{line}\n" for line in lines).encode("utf-8")
+            self._send(payload, "application/x-ndjson")
+
+        def _transcribe(self) -> None:
+            nonlocal stt_in_flight
+            remaining = size = int(self.headers.get("Content-Length", 0))
+            while remaining > 0:
+                remaining -= len(self.rfile.read(min(remaining, READ_CHUNK_SIZE)))
+
+            with stt_lock:
+                limited = 0 < stt_max_concurrency <= stt_in_flight
+                if not limited:
+                    stt_in_flight += 1
+            if limited:
+                payload = json.dumps({"detail": "too_many_concurrent_requests"})
+                self._send(payload.encode("utf-8"), "application/json", 429, {"Retry-After": "1"})
+                return
+
+            try:
+                time.sleep(stt_delay + stt_delay_per_mb * size / 1e6)
+            finally:
+                with stt_lock:
+                    stt_in_flight -= 1
+            payload = json.dumps({"text": STT_TRANSCRIPT, "language_code": "en"})
+            self._send(payload.encode("utf-8"), "application/json")
+
+        def _send(
+            self,
+            payload: bytes,
+            content_type: str,
+            status: int = 200,
+            headers: dict[str, str] | None = None,
+        ) -> None:
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+    return Handler
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--recordings", type=Path, default=None)
+    parser.add_argument("--stt-delay", type=float, default=0.0)
+    parser.add_argument("--stt-max-concurrency", type=int, default=0)
+    parser.add_argument("--stt-delay-per-mb", type=float, default=0.0)
+    args = parser.parse_args()
+
+    recordings = load_recordings(args.recordings)
+    handler = make_handler(
+        recordings, args.stt_delay, args.stt_max_concurrency, args.stt_delay_per_mb
+    )
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), handler)
+    print(f"Fake ElevenLabs on http://127.0.0.1:{args.port} ({len(recordings)} recordings)")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+"""
+Re-score historical practice logs with the current scoring algorithm.
+
+When ``ScoringService`` changes, stored ``practice_logs.score`` values no
+longer compare with new attempts and ``user_stats.average_score`` stops
+meaning anything. This tool streams the logs in keyset-paginated pages,
+loads the sentences of the materials they reference (once per material,
+paged past the server's row cap; a material whose sentences don't all
+arrive is skipped), re-scores the transcripts on a process pool and
+writes changed scores back with one bulk upsert per page. Afterwards
+every affected user's ``total_practices``, ``total_time_seconds`` and
+``average_score`` (and, with ``--recompute-xp``, ``total_xp`` and
+``level``) are recomputed from their logs and upserted in bulk.
+
+Scoring is batched per material: logs are grouped by material and each
+worker tokenizes and interns a material's text once (a ``ScoringProfile``),
+so a transcript costs one tokenization and one alignment over integer IDs
+(an O(ND) diff, nearly linear for transcripts with few mistakes). The next
+page is fetched while the current one is scored.
+
+Usage:
+    uv run python scripts/rescore_practice_logs.py --dry-run
+    uv run python scripts/rescore_practice_logs.py [--page-size 1000] [--workers 4] \
+        [--chunk-size 250] [--limit N] [--recompute-xp]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.database import Database, db  # noqa: E402
+from app.services.gamification_service import GamificationService  # noqa: E402
+from app.services.scoring_service import ScoringProfile, scoring_service  # noqa: E402
+
+LOG_COLUMNS = "id, user_id, material_id, score, duration_seconds, xp_gained, user_transcript"
+SCORE_TOLERANCE = 0.005  # Scores are stored with two decimals
+SENTENCE_MATERIALS_PER_QUERY = 100  # Keeps the in_() filter's URL short
+SENTENCE_PAGE_SIZE = 1000  # PostgREST's default max-rows; smaller server caps also work
+WORKER_PROFILE_CACHE_SIZE = 256
+
+# Worker-process state: material_id -> profile, so a material is tokenized once per worker
+_profiles: dict[str, ScoringProfile] = {}
+
+
+def score_chunk(
+    sentences_by_material: dict[str, list[str]], logs: list[tuple[str, str, str]]
+) -> list[tuple[str, float]]:
+    """
+    Score a chunk of logs (runs in a worker process).
+
+    Args:
+        sentences_by_material: Sentence texts of every material in the chunk
+        logs: (log_id, material_id, transcript) triples, grouped by material
+
+    Returns:
+        (log_id, score) pairs
+    """
+    results = []
+    for log_id, material_id, transcript in logs:
+        profile = _profiles.get(material_id)
+        if profile is None:
+            if len(_profiles) >= WORKER_PROFILE_CACHE_SIZE:
+                _profiles.clear()
+            profile = scoring_service.build_profile(sentences_by_material[material_id])
+            _profiles[material_id] = profile
+        results.append((log_id, scoring_service.analyze(profile, transcript)["score"]))
+    return results
+
+
+class Rescorer:
+    """Streams, re-scores and writes back practice logs, keeping throughput counters."""
+
+    def __init__(self, database: Database, args: argparse.Namespace):
+        """Initialize rescorer."""
+        self.db = database
+        self.args = args
+        self.gamification = GamificationService(database)
+        # material_id -> sentence texts, or None if they couldn't all be loaded
+        self.sentences: dict[str, list[str] | None] = {}
+        # user_id -> [practices, total seconds, score sum, xp sum]
+        self.users: dict[str, list[float]] = defaultdict(lambda: [0, 0, 0.0, 0])
+        self.counters = {
+            "logs": 0,
+            "skipped": 0,
+            "incomplete_materials": 0,
+            "changed": 0,
+            "written": 0,
+            "users_updated": 0,
+            "abs_delta_sum": 0.0,
+        }
+        self.timings = {"fetch": 0.0, "score": 0.0, "write": 0.0}
+
+    async def run(self) -> None:
+        """Re-score every page, then recompute user stats."""
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=self.args.workers) as pool:
+            logs = await self._fetch_page(None)
+            while logs:
+                next_page = None
+                if not self.args.limit or self.counters["logs"] + len(logs) < self.args.limit:
+                    # Fetch ahead while this page is scored
+                    next_page = asyncio.create_task(self._fetch_page(logs[-1]["id"]))
+                await self._process_page(pool, logs)
+                logs = await next_page if next_page is not None else []
+
+        await self._write_user_stats()
+        self._report(time.perf_counter() - start)
+
+    async def _fetch_page(self, after_id: str | None) -> list[dict[str, Any]]:
+        start = time.perf_counter()
+        query = self.db.table("practice_logs").select(LOG_COLUMNS).order("id")
+        if after_id is not None:
+            query = query.gt("id", after_id)
+        response = await self.db.execute(query.limit(self.args.page_size))
+        logs = response.data or []
+
+        missing = sorted({log["material_id"] for log in logs} - self.sentences.keys())
+        for offset in range(0, len(missing), SENTENCE_MATERIALS_PER_QUERY):
+            await self._fetch_sentences(missing[offset : offset + SENTENCE_MATERIALS_PER_QUERY])
+
+        self.timings["fetch"] += time.perf_counter() - start
+        return logs
+
+    async def _fetch_sentences(self, material_ids: list[str]) -> None:
+        """
+        Load the sentences of some materials, paging past the server's row cap.
+
+        Pages are requested until one comes back empty, since the server
+        may return fewer rows than asked for. If the rows received don't
+        add up to the exact count (e.g. sentences changed in between),
+        the materials are marked incomplete and their logs are skipped
+        rather than re-scored against partial text.
+        """
+        rows: list[dict[str, Any]] = []
+        total = None
+        while True:
+            response = await self.db.execute(
+                self.db.table("sentences")
+                .select("material_id, text, sequence_order", count="exact")
+                .in_("material_id", material_ids)
+                .order("material_id")
+                .order("sequence_order")
+                .range(len(rows), len(rows) + SENTENCE_PAGE_SIZE - 1)
+            )
+            page = response.data or []
+            if total is None:
+                total = response.count
+            if not page:
+                break
+            rows.extend(page)
+
+        if total is None or len(rows) != total:
+            print(
+                f"  sentences of {len(material_ids)} materials incomplete "
+                f"({len(rows)} of {total} rows); skipping their logs",
+                file=sys.stderr,
+            )
+            for material_id in material_ids:
+                self.sentences[material_id] = None
+            self.counters["incomplete_materials"] += len(material_ids)
+            return
+
+        sentences: dict[str, list[str]] = {material_id: [] for material_id in material_ids}
+        for sentence in rows:
+            sentences[sentence["material_id"]].append(sentence["text"])
+        self.sentences.update(sentences)
+
+    async def _process_page(self, pool: ProcessPoolExecutor, logs: list[dict[str, Any]]) -> None:
+        if self.args.limit:
+            logs = logs[: self.args.limit - self.counters["logs"]]
+        self.counters["logs"] += len(logs)
+
+        scorable = [
+            log for log in logs if log.get("user_transcript") and self.sentences[log["material_id"]]
+        ]
+        self.counters["skipped"] += len(logs) - len(scorable)
+        scorable.sort(key=lambda log: log["material_id"])
+
+        start = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        chunks = []
+        for offset in range(0, len(scorable), self.args.chunk_size):
+            chunk = scorable[offset : offset + self.args.chunk_size]
+            material_ids = {log["material_id"] for log in chunk}
+            chunks.append(
+                loop.run_in_executor(
+                    pool,
+                    score_chunk,
+                    {material_id: self.sentences[material_id] for material_id in material_ids},
+                    [(log["id"], log["material_id"], log["user_transcript"]) for log in chunk],
+                )
+            )
+        scores = {
+            log_id: score for chunk in await asyncio.gather(*chunks) for log_id, score in chunk
+        }
+        self.timings["score"] += time.perf_counter() - start
+
+        updates = []
+        for log in logs:
+            score = scores.get(log["id"], float(log["score"]))
+            xp_gained = log.get("xp_gained") or 0
+            if abs(score - float(log["score"])) >= SCORE_TOLERANCE:
+                self.counters["changed"] += 1
+                self.counters["abs_delta_sum"] += abs(score - float(log["score"]))
+                update = {
+                    "id": log["id"],
+                    "user_id": log["user_id"],
+                    "material_id": log["material_id"],
+                    "duration_seconds": log["duration_seconds"],
+                    "score": score,
+                }
+                if self.args.recompute_xp:
+                    xp_gained = self.gamification.calculate_xp_gain(score, log["duration_seconds"])
+                    update["xp_gained"] = xp_gained
+                updates.append(update)
+
+            totals = self.users[log["user_id"]]
+            totals[0] += 1
+            totals[1] += log["duration_seconds"]
+            totals[2] += score
+            totals[3] += xp_gained
+
+        if updates and not self.args.dry_run:
+            start = time.perf_counter()
+            await self.db.execute(self.db.table("practice_logs").upsert(updates, on_conflict="id"))
+            self.counters["written"] += len(updates)
+            self.timings["write"] += time.perf_counter() - start
+
+    async def _write_user_stats(self) -> None:
+        rows = []
+        for user_id, (practices, seconds, score_sum, xp_sum) in self.users.items():
+            row = {
+                "user_id": user_id,
+                "total_practices": practices,
+                "total_time_seconds": seconds,
+                "average_score": round(score_sum / practices, 2),
+            }
+            if self.args.recompute_xp:
+                row["total_xp"] = xp_sum
+                row["level"] = self.gamification.calculate_level(xp_sum)
+            rows.append(row)
+
+        if self.args.dry_run or self.args.limit:
+            # A partial run only saw some of each user's logs
+            return
+
+        start = time.perf_counter()
+        for offset in range(0, len(rows), self.args.page_size):
+            batch = rows[offset : offset + self.args.page_size]
+            await self.db.execute(self.db.table("user_stats").upsert(batch, on_conflict="user_id"))
+            self.counters["users_updated"] += len(batch)
+        self.timings["write"] += time.perf_counter() - start
+
+    def _report(self, elapsed: float) -> None:
+        counters, timings = self.counters, self.timings
+        scored = counters["logs"] - counters["skipped"]
+        mode = "DRY RUN: nothing written" if self.args.dry_run else "written"
+        print(f"Re-scored {scored} of {counters['logs']} logs in {elapsed:.1f}s ({mode})")
+        print(f"  skipped (no transcript or sentences): {counters['skipped']}")
+        if counters["incomplete_materials"]:
+            print(f"  materials skipped (sentences incomplete): {counters['incomplete_materials']}")
+        print(f"  scores changed: {counters['changed']}", end="")
+        if counters["changed"]:
+            print(f" (mean |delta| {counters['abs_delta_sum'] / counters['changed']:.2f})", end="")
+        print()
+        print(f"  logs written: {counters['written']}, users updated: {counters['users_updated']}")
+        if self.args.limit and not self.args.dry_run:
+            print("  user_stats not recomputed: --limit only covers part of each user's logs")
+        print(
+            f"  time: fetch {timings['fetch']:.1f}s, score {timings['score']:.1f}s, "
+            f"write {timings['write']:.1f}s"
+        )
+        if timings["score"]:
+            print(f"  scoring throughput: {scored / timings['score']:.0f} logs/s")
+        if elapsed:
+            print(f"  end-to-end throughput: {counters['logs'] / elapsed:.0f} logs/s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dry-run", action="store_true", help="Score and report, write nothing")
+    parser.add_argument("--page-size", type=int, default=1000, help="Logs fetched per query")
+    parser.add_argument("--chunk-size", type=int, default=250, help="Logs per worker task")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Scoring processes")
+    parser.add_argument("--limit", type=int, default=0, help="Stop after this many logs")
+    parser.add_argument(
+        "--recompute-xp",
+        action="store_true",
+        help="Also recompute xp_gained, total_xp and level from the new scores",
+    )
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(Rescorer(db, args).run())
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,8 @@
+"""Shared test setup."""
+
+import os
+
+# Settings require Supabase credentials; tests never reach Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "test")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test")
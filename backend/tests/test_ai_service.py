@@ -0,0 +1,102 @@
+"""Tests for AI feedback routing and the per-user Gemini budget."""
+
+import asyncio
+import time
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+
+from app.clients import clients
+from app.config import settings
+from app.services import ai_service as ai_module
+from app.services.ai_service import BUDGET_SWEEP_USERS, AIService
+from app.services.feedback_cache_service import FeedbackCacheService
+
+TEXT = "the quick brown fox jumps over the lazy dog every single morning"
+ATTEMPT = {
+    "expected_text": TEXT,
+    "user_text": "the quick brown fox jumps over the dog every single morning",
+    "score": 85.0,
+    "missed_words": ["lazy"],
+    "extra_words": [],
+}
+
+
+class FakeGemini:
+    """google-genai client stand-in answering every call with the same text."""
+
+    def __init__(self):
+        self.calls = 0
+        self.aio = SimpleNamespace(
+            models=SimpleNamespace(
+                generate_content=self._generate, generate_content_stream=self._stream
+            )
+        )
+
+    async def _generate(self, **kwargs):
+        self.calls += 1
+        return SimpleNamespace(text="Gemini feedback")
+
+    async def _stream(self, **kwargs):
+        self.calls += 1
+
+        async def chunks():
+            yield SimpleNamespace(text="Gemini feedback")
+
+        return chunks()
+
+
+@pytest.fixture
+def service(monkeypatch: pytest.MonkeyPatch) -> tuple[AIService, FakeGemini]:
+    gemini = FakeGemini()
+    monkeypatch.setattr(clients, "_gemini", gemini)
+    monkeypatch.setattr(clients, "_gemini_loaded", True)
+    monkeypatch.setattr(settings, "google_api_key", "test")
+    monkeypatch.setattr(settings, "ai_llm_user_budget", 1)
+    monkeypatch.setattr(ai_module, "feedback_cache_service", FeedbackCacheService(0, 0))
+    ai = AIService()
+    ai.use_mock = False
+    return ai, gemini
+
+
+def _expire_users(ai: AIService, count: int) -> None:
+    expired = time.time() - settings.ai_llm_budget_window_seconds - 1
+    for i in range(count):
+        ai._llm_calls[f"old-{i}"] = deque([expired])
+
+
+def test_expired_users_are_swept_when_a_new_user_arrives(service) -> None:
+    ai, gemini = service
+    _expire_users(ai, BUDGET_SWEEP_USERS + 1)
+    assert not ai._over_budget("old-0")  # Empties the window of a returning user
+
+    feedback = asyncio.run(ai.generate_feedback(**ATTEMPT, user_key="new"))
+
+    assert feedback == "Gemini feedback"
+    assert gemini.calls == 1
+    assert list(ai._llm_calls) == ["new"]
+
+
+def test_stream_charges_new_user_after_expired_windows(service) -> None:
+    ai, gemini = service
+    _expire_users(ai, BUDGET_SWEEP_USERS + 1)
+    ai._llm_calls["empty"] = deque()  # Left behind by an older build
+
+    async def collect() -> list[str]:
+        return [chunk async for chunk in ai.stream_feedback(**ATTEMPT, user_key="new")]
+
+    assert asyncio.run(collect()) == ["Gemini feedback"]
+    assert gemini.calls == 1
+    assert list(ai._llm_calls) == ["new"]
+
+
+def test_over_budget_user_gets_template_on_cache_miss(service) -> None:
+    ai, gemini = service
+    asyncio.run(ai.generate_feedback(**ATTEMPT, user_key="u"))
+
+    feedback = asyncio.run(ai.generate_feedback(**ATTEMPT, user_key="u"))
+
+    assert feedback != "Gemini feedback"
+    assert gemini.calls == 1
+    assert ai.stats()["routes"]["budget"] == 1
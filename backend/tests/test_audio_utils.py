@@ -0,0 +1,49 @@
+"""Tests for the PCM helpers used before STT."""
+
+import numpy as np
+import pytest
+
+from app.services.audio_utils import frame_energy_db, resample
+
+
+def naive_resample(samples: np.ndarray, sample_rate: int, target_rate: int) -> np.ndarray:
+    """Box-filter mean over each output sample's inputs, one sample at a time."""
+    width = -(-sample_rate // target_rate)
+    frames = samples.reshape(len(samples), -1).astype(np.int64)
+    count = (len(samples) - width) * target_rate // sample_rate
+    out = [frames[k * sample_rate // target_rate :][:width].sum() for k in range(count)]
+    return np.array(out, dtype=np.int64) // (width * frames.shape[1])
+
+
+@pytest.mark.parametrize(
+    ("sample_rate", "num_channels"),
+    [(22050, 1), (44100, 1), (44100, 2), (48000, 1), (48000, 2), (96000, 2)],
+)
+def test_resample_matches_box_filter(sample_rate: int, num_channels: int) -> None:
+    rng = np.random.default_rng(sample_rate + num_channels)
+    shape = (sample_rate // 2 + 7, num_channels) if num_channels > 1 else (sample_rate // 2 + 7,)
+    samples = rng.integers(-32768, 32767, shape, dtype=np.int16, endpoint=True)
+
+    result = resample(samples, sample_rate, 16000)
+    expected = naive_resample(samples, sample_rate, 16000)
+
+    assert result.dtype == np.int16
+    assert len(expected) - len(result) < 320  # At most a trailing partial period is dropped
+    np.testing.assert_array_equal(result[: len(expected)], expected[: len(result)])
+
+
+def test_resample_keeps_low_rates_and_downmixes() -> None:
+    samples = np.array([[100, 300], [-100, -300]], dtype=np.int16)
+
+    np.testing.assert_array_equal(resample(samples, 8000, 16000), [200, -200])
+
+
+def test_frame_energy_db() -> None:
+    full_scale = np.full(1600, 32767, dtype=np.int16)
+    silence = np.zeros(1600, dtype=np.int16)
+
+    energy = frame_energy_db(np.concatenate([full_scale, silence]), 16000)
+
+    assert len(energy) == 20
+    np.testing.assert_allclose(energy[:10], 0.0, atol=0.01)
+    assert (energy[10:] < -90).all()
@@ -0,0 +1,45 @@
+"""Tests for the material scoring profile cache."""
+
+import asyncio
+from types import SimpleNamespace
+
+from app.services.material_profile_service import MaterialProfileService
+
+
+class FakeQuery:
+    """Chainable stand-in for a Supabase query on one table."""
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+
+    def __getattr__(self, name: str):
+        return lambda *args, **kwargs: self
+
+
+class FakeDatabase:
+    """Database stand-in serving fixed rows per table and counting queries."""
+
+    def __init__(self, tables: dict[str, list[dict]]):
+        self.tables = tables
+        self.queries = 0
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.tables[name])
+
+    async def execute(self, query: FakeQuery) -> SimpleNamespace:
+        self.queries += 1
+        return SimpleNamespace(data=list(query.rows))
+
+
+def test_profile_without_sentences_is_not_cached() -> None:
+    # The material row exists, but create_material hasn't inserted its sentences yet
+    db = FakeDatabase({"materials": [{"duration_seconds": 10}], "sentences": []})
+    cache = MaterialProfileService(max_entries=8)
+
+    assert asyncio.run(cache.get(db, "m1")).sentence_ids == []
+
+    db.tables["sentences"] = [{"id": "s1", "text": "Hello there.", "start_time": 0, "end_time": 1}]
+    assert asyncio.run(cache.get(db, "m1")).sentence_ids == ["s1"]
+    assert asyncio.run(cache.get(db, "m1")).sentence_ids == ["s1"]
+    assert db.queries == 4
+    assert cache.stats()["hits"] == 1
@@ -0,0 +1,48 @@
+"""Tests for phonetic keys and sound-alike scoring."""
+
+import pytest
+
+from app.services.phonetic import metaphone, phonetic_key
+from app.services.scoring_service import ScoringService
+
+
+@pytest.mark.parametrize(
+    ("first", "second"),
+    [("there", "their"), ("write", "right"), ("knight", "night"), ("phone", "fone"), ("two", "to")],
+)
+def test_sound_alike_words_share_a_key(first: str, second: str) -> None:
+    assert phonetic_key(first) == phonetic_key(second)
+
+
+@pytest.mark.parametrize(
+    ("word", "key"), [("there", "0R"), ("ship", "XP"), ("thumb", "0M"), ("cat", "KT")]
+)
+def test_metaphone(word: str, key: str) -> None:
+    assert metaphone(word) == key
+
+
+def test_words_without_letters_only_match_themselves() -> None:
+    assert phonetic_key("42") == "=42"
+    assert phonetic_key("42") != phonetic_key("43")
+
+
+def test_phonetic_scoring_accepts_homophones() -> None:
+    scoring = ScoringService()
+    text = "Their house is right there."
+    transcript = "there house is write their"
+
+    assert scoring.analyze(text, transcript, phonetic=False)["score"] == 40.0
+    result = scoring.analyze(text, transcript, phonetic=True)
+    assert result["score"] == 100.0
+    assert result["phonetic_match_count"] == 3
+    assert {"word": "right", "status": "correct", "spoken": "write"} in result["word_analysis"]
+
+
+def test_phonetic_scoring_with_profile_matches_plain_text() -> None:
+    scoring = ScoringService()
+    profile = scoring.build_profile(["Their house is right there."])
+
+    for transcript in ["there house is write their", "a house is on fire", "zebra 42"]:
+        from_profile = scoring.analyze(profile, transcript, phonetic=True)
+        del from_profile["sentence_scores"]
+        assert from_profile == scoring.analyze(profile.expected_text, transcript, phonetic=True)
@@ -0,0 +1,68 @@
+"""Tests for single-pass scoring and word analysis."""
+
+import pytest
+
+from app.services.scoring_service import ScoringService
+
+scoring = ScoringService()
+
+TEXT = "The cat sat on the mat. The dog sat too."
+
+
+def test_perfect_transcript() -> None:
+    result = scoring.analyze(TEXT, "the cat sat on the mat the dog sat too", phonetic=False)
+
+    assert result["score"] == 100.0
+    assert result["total_words"] == result["matched_count"] == 10
+    assert result["missed_words"] == result["extra_words"] == []
+    assert all(step["status"] == "correct" for step in result["word_analysis"])
+
+
+def test_counts_and_analysis_come_from_one_alignment() -> None:
+    result = scoring.analyze(TEXT, "the cat sat on a mat um the dog too", phonetic=False)
+
+    assert result["score"] == 80.0
+    assert (
+        result["matched_count"],
+        result["substituted_count"],
+        result["missed_count"],
+        result["extra_count"],
+    ) == (8, 1, 1, 1)
+    assert result["missed_words"] == ["sat", "the"]
+    assert result["extra_words"] == ["a", "um"]
+    assert {"word": "the", "status": "substituted", "spoken": "a"} in result["word_analysis"]
+    statuses = [step["status"] for step in result["word_analysis"]]
+    assert statuses.count("correct") == result["matched_count"]
+
+
+def test_repeated_words_are_scored_per_occurrence() -> None:
+    # "the" is said once for its three occurrences
+    result = scoring.analyze(TEXT, "the cat sat on mat dog sat too", phonetic=False)
+
+    assert result["matched_count"] == 8
+    assert result["missed_count"] == 2
+    assert result["missed_words"] == ["the"]
+
+
+@pytest.mark.parametrize("user_text", ["", "completely different words", TEXT.lower()])
+def test_profile_and_text_agree(user_text: str) -> None:
+    profile = scoring.build_profile(["The cat sat on the mat.", "The dog sat too."])
+
+    from_profile = scoring.analyze(profile, user_text, phonetic=False)
+    from_text = scoring.analyze(TEXT, user_text, phonetic=False)
+
+    del from_profile["sentence_scores"]
+    assert from_profile == from_text
+
+
+def test_legacy_helpers_match_analyze() -> None:
+    result = scoring.analyze(TEXT, "the cat sat on a mat", phonetic=False)
+
+    score = scoring.calculate_score(TEXT, "the cat sat on a mat")
+    assert "word_analysis" not in score
+    assert score["score"] == result["score"]
+    assert scoring.get_word_analysis(TEXT, "the cat sat on a mat") == result["word_analysis"]
+
+
+def test_empty_expected_text_scores_full() -> None:
+    assert scoring.analyze("", "anything", phonetic=False)["score"] == 100.0
@@ -0,0 +1,76 @@
+"""Tests for per-sentence scoring and sentence selection."""
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.practice import FeedbackRequest
+from app.routers.practice import _select_sentences
+from app.services.material_profile_service import MaterialProfile
+from app.services.scoring_service import ScoringService
+
+scoring = ScoringService()
+SENTENCES = ["Good morning everyone.", "How are you today?", "Let us begin."]
+
+
+def make_material() -> MaterialProfile:
+    return MaterialProfile(
+        "m1",
+        9,
+        ["s0", "s1", "s2"],
+        [(0.0, 3.0), (3.0, 6.0), (6.0, 9.0)],
+        scoring.build_profile(SENTENCES),
+    )
+
+
+def test_sentence_scores_break_down_the_attempt() -> None:
+    profile = scoring.build_profile(SENTENCES)
+
+    result = scoring.analyze(profile, "good morning everyone how are you let us", phonetic=False)
+
+    assert result["sentence_scores"] == [
+        {"total_words": 3, "matched_count": 3, "score": 100.0},
+        {"total_words": 4, "matched_count": 3, "score": 75.0},
+        {"total_words": 3, "matched_count": 2, "score": 66.67},
+    ]
+    assert result["matched_count"] == sum(s["matched_count"] for s in result["sentence_scores"])
+
+
+def test_sliced_profile_scores_only_the_selection() -> None:
+    profile = scoring.build_profile(SENTENCES)
+    selection = scoring.slice_profile(profile, 1, 1)
+
+    result = scoring.analyze(selection, "how are you today", phonetic=False)
+
+    assert selection.expected_text == "How are you today?"
+    assert result["score"] == 100.0
+    assert result["sentence_scores"] == [{"total_words": 4, "matched_count": 4, "score": 100.0}]
+    assert result == scoring.analyze(
+        scoring.build_profile(["How are you today?"]), "how are you today", phonetic=False
+    )
+
+
+@pytest.mark.parametrize(
+    ("selector", "expected"),
+    [
+        ({}, None),
+        ({"sentence_id": "s1"}, (1, 1)),
+        ({"sentence_range": (1, 2)}, (1, 2)),
+        ({"time_range": (2.0, 8.0)}, (1, 2)),  # Sentences whose midpoint lies inside
+    ],
+)
+def test_select_sentences(selector: dict, expected: tuple[int, int] | None) -> None:
+    request = FeedbackRequest(material_id="m1", user_transcript="", **selector)
+
+    assert _select_sentences(make_material(), request) == expected
+
+
+@pytest.mark.parametrize(
+    "selector",
+    [{"sentence_id": "missing"}, {"sentence_range": (2, 3)}, {"time_range": (0.0, 1.0)}],
+)
+def test_select_sentences_rejects_unmatched_selectors(selector: dict) -> None:
+    request = FeedbackRequest(material_id="m1", user_transcript="", **selector)
+
+    with pytest.raises(HTTPException) as error:
+        _select_sentences(make_material(), request)
+    assert error.value.status_code == 400
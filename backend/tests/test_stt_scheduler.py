@@ -0,0 +1,130 @@
+"""Tests for the upstream STT scheduler."""
+
+import asyncio
+
+import httpx
+import pytest
+
+from app.services.stt_scheduler import STTOverloadedError, STTScheduler
+
+
+def throttled(status_code: int = 429, retry_after: str = "0") -> httpx.HTTPStatusError:
+    request = httpx.Request("POST", "https://stt.test/v1/speech-to-text")
+    response = httpx.Response(status_code, headers={"Retry-After": retry_after}, request=request)
+    return httpx.HTTPStatusError("throttled", request=request, response=response)
+
+
+def test_concurrency_is_bounded() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=2, max_queue_depth=10, max_wait_seconds=5, max_retries=0
+    )
+    active = peak = 0
+
+    async def call() -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        active -= 1
+
+    async def main() -> None:
+        await asyncio.gather(*(scheduler.run("user", call) for _ in range(6)))
+
+    asyncio.run(main())
+    assert peak == 2
+    assert scheduler.stats()["admitted"] == 6
+
+
+def test_waiting_users_are_served_round_robin() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=1, max_queue_depth=10, max_wait_seconds=30, max_retries=0
+    )
+    order = []
+
+    def call(name: str):
+        async def run() -> None:
+            order.append(name)
+            await asyncio.sleep(0.01)
+
+        return run
+
+    async def main() -> None:
+        # a1 takes the only slot; a burst from a queues before b's single call
+        tasks = [asyncio.create_task(scheduler.run("a", call("a1")))]
+        await asyncio.sleep(0)
+        tasks += [asyncio.create_task(scheduler.run("a", call(f"a{i}"))) for i in (2, 3, 4)]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(scheduler.run("b", call("b1"))))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(main())
+    assert order == ["a1", "a2", "b1", "a3", "a4"]
+
+
+def test_throttled_call_is_retried_at_a_lower_limit() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=4, max_queue_depth=10, max_wait_seconds=5, max_retries=2
+    )
+    attempts = []
+
+    async def call() -> str:
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise throttled(retry_after="0")
+        return "transcript"
+
+    assert asyncio.run(scheduler.run("user", call)) == "transcript"
+    stats = scheduler.stats()
+    assert (stats["throttled"], stats["retried"], stats["limit"]) == (1, 1, 2)
+
+
+def test_gives_up_after_max_retries() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=1, max_queue_depth=10, max_wait_seconds=5, max_retries=1
+    )
+
+    async def call() -> str:
+        raise throttled(503, retry_after="0")
+
+    with pytest.raises(STTOverloadedError):
+        asyncio.run(scheduler.run("user", call))
+
+
+def test_other_upstream_errors_are_not_retried() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=1, max_queue_depth=10, max_wait_seconds=5, max_retries=3
+    )
+
+    async def call() -> str:
+        raise throttled(400)
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(scheduler.run("user", call))
+    assert scheduler.stats()["retried"] == 0
+
+
+def test_full_queue_rejects_fast() -> None:
+    scheduler = STTScheduler(
+        max_concurrency=1, max_queue_depth=1, max_wait_seconds=5, max_retries=0
+    )
+
+    async def call() -> None:
+        await asyncio.sleep(0.01)
+
+    async def main() -> list:
+        return await asyncio.gather(
+            *(scheduler.run("user", call) for _ in range(3)), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert results[:2] == [None, None]
+    assert isinstance(results[2], STTOverloadedError)
+    assert scheduler.stats()["rejected"] == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [("3", 3.0), ("-1", 0.0), ("", None), (None, None), ("soon", None)],
+)
+def test_parse_retry_after(value: str | None, expected: float | None) -> None:
+    assert STTScheduler._parse_retry_after(value) == expected
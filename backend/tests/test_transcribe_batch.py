@@ -0,0 +1,82 @@
+"""Tests for the batch transcription endpoint."""
+
+import asyncio
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.config import settings
+from app.routers import practice
+from app.services.audio_utils import wav_header
+from app.services.stt_scheduler import STTOverloadedError
+
+WAV = wav_header(4) + b"\x00\x00\x01\x00"
+
+
+class FakeSTT:
+    """STT service stand-in that tracks concurrent calls; "busy" parts are overloaded."""
+
+    def __init__(self):
+        self.active = 0
+        self.peak = 0
+
+    async def speech_to_text(self, audio_file, filename, content_type, user_key) -> str:
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        data = audio_file.read()
+        if b"busy" in data:
+            raise STTOverloadedError(2.5)
+        return f"{len(data)} bytes from {user_key.split(':')[0]}"
+
+
+@pytest.fixture
+def stt(monkeypatch: pytest.MonkeyPatch) -> FakeSTT:
+    fake = FakeSTT()
+    monkeypatch.setattr(practice.stt_service, "speech_to_text", fake.speech_to_text)
+    monkeypatch.setattr(settings, "stt_batch_max_concurrency", 2)
+    return fake
+
+
+@pytest.fixture
+def client(stt: FakeSTT) -> TestClient:
+    app = FastAPI()
+    app.include_router(practice.router, prefix="/api")
+    return TestClient(app)
+
+
+def test_batch_results_in_upload_order_with_per_part_errors(
+    client: TestClient, stt: FakeSTT
+) -> None:
+    parts = [
+        WAV,
+        b"",  # Empty
+        b"not audio at all",
+        WAV + b"busy",
+        WAV + b"\x00\x00",
+    ]
+    response = client.post(
+        "/api/transcribe/batch",
+        files=[("audio", (f"part{i}.wav", data, "audio/wav")) for i, data in enumerate(parts)],
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2, 3, 4]
+    assert [r["status_code"] for r in results] == [200, 400, 415, 503, 200]
+    assert results[0]["transcript"] == f"{len(WAV)} bytes from anonymous"
+    assert results[3]["retry_after"] == 3
+    assert stt.peak == 2
+
+
+def test_batch_rejects_too_many_parts(client: TestClient, monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(settings, "stt_batch_max_parts", 2)
+
+    response = client.post(
+        "/api/transcribe/batch",
+        files=[("audio", (f"part{i}.wav", WAV, "audio/wav")) for i in range(3)],
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,87 @@
+"""Tests for the STT transcript cache."""
+
+import asyncio
+import io
+
+import pytest
+
+from app.services.transcript_cache_service import TranscriptCacheService
+
+PARAMS = {"model_id": "scribe_v1", "content_type": "audio/wav"}
+
+
+def make_key(cache: TranscriptCacheService, data: bytes, params: dict = PARAMS) -> str:
+    return asyncio.run(cache.make_key(io.BytesIO(data), params))
+
+
+def test_key_depends_on_content_and_params_and_rewinds() -> None:
+    cache = TranscriptCacheService(8, 60)
+    audio = io.BytesIO(b"RIFF" + b"\x01" * 5000)
+
+    key = asyncio.run(cache.make_key(audio, PARAMS))
+
+    assert audio.tell() == 0
+    assert key == make_key(cache, b"RIFF" + b"\x01" * 5000)
+    assert key != make_key(cache, b"RIFF" + b"\x02" * 5000)
+    assert key != make_key(cache, b"RIFF" + b"\x01" * 5000, {**PARAMS, "model_id": "other"})
+
+
+def test_concurrent_requests_share_one_upstream_call() -> None:
+    cache = TranscriptCacheService(8, 60)
+    calls = []
+
+    async def transcribe() -> str:
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "hello world"
+
+    async def main() -> list[str]:
+        results = await asyncio.gather(
+            *(cache.get_or_transcribe("k", transcribe) for _ in range(5))
+        )
+        return [*results, await cache.get_or_transcribe("k", transcribe)]
+
+    assert asyncio.run(main()) == ["hello world"] * 6
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["memory_hits"]) == (1, 4, 1)
+
+
+def test_failures_are_not_cached() -> None:
+    cache = TranscriptCacheService(8, 60)
+
+    async def fail() -> str:
+        raise RuntimeError("upstream down")
+
+    async def succeed() -> str:
+        return "recovered"
+
+    with pytest.raises(RuntimeError):
+        asyncio.run(cache.get_or_transcribe("k", fail))
+    assert asyncio.run(cache.get_or_transcribe("k", succeed)) == "recovered"
+
+
+def test_disk_tier_survives_restart(tmp_path) -> None:
+    async def transcribe() -> str:
+        return "from upstream"
+
+    async def unexpected() -> str:
+        raise AssertionError("should have been served from disk")
+
+    asyncio.run(TranscriptCacheService(8, 60, str(tmp_path)).get_or_transcribe("ab12", transcribe))
+    restarted = TranscriptCacheService(8, 60, str(tmp_path))
+
+    assert asyncio.run(restarted.get_or_transcribe("ab12", unexpected)) == "from upstream"
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_expired_entries_are_recreated() -> None:
+    cache = TranscriptCacheService(8, 0)
+    calls = []
+
+    async def transcribe() -> str:
+        calls.append(1)
+        return f"take {len(calls)}"
+
+    assert asyncio.run(cache.get_or_transcribe("k", transcribe)) == "take 1"
+    assert asyncio.run(cache.get_or_transcribe("k", transcribe)) == "take 2"
@@ -0,0 +1,22 @@
+"""Tests for TTS clip and track content addresses."""
+
+from app.services.tts_service import tts_service
+
+
+def test_clip_key_includes_prosody_context() -> None:
+    alone = tts_service.cache_key("How are you?")
+
+    assert tts_service.cache_key("How are you?", "Hello.", None) != alone
+    assert tts_service.cache_key("How are you?", None, "Fine.") != alone
+    assert tts_service.cache_key("How are you?", "Hello.", None) != tts_service.cache_key(
+        "How are you?", "Good morning.", None
+    )
+
+
+def test_track_key_changes_with_neighbouring_sentences() -> None:
+    # Same middle sentence, different neighbours: its clip can't be shared
+    first = tts_service.track_key(["Hello.", "How are you?", "Fine."])
+    second = tts_service.track_key(["Good morning.", "How are you?", "Fine."])
+
+    assert first != second
+    assert first == tts_service.track_key(["Hello.", "How are you?", "Fine."])
@@ -0,0 +1,56 @@
+"""Tests for word-level transcript alignment."""
+
+import random
+
+import pytest
+
+from app.services.word_alignment import (
+    CORRECT,
+    MAX_DIFF_EDITS,
+    MISSED,
+    SUBSTITUTED,
+    align_words,
+)
+
+WORDS = "the a to of and in is it you that he was for on are with as his they be at one".split()
+
+
+def assert_valid(expected: list[str], actual: list[str], steps: list) -> None:
+    """Every word appears once, in order, and statuses agree with the words."""
+    assert [i for _, i, _ in steps if i is not None] == list(range(len(expected)))
+    assert [j for _, _, j in steps if j is not None] == list(range(len(actual)))
+    for status, i, j in steps:
+        if status == CORRECT:
+            assert expected[i] == actual[j]
+        elif status == SUBSTITUTED:
+            assert expected[i] != actual[j]
+
+
+@pytest.mark.parametrize("length", [MAX_DIFF_EDITS + 1, 128, 500])
+def test_short_text_long_transcript(length: int) -> None:
+    # More words than the diff handles, at many times the band width per row
+    rng = random.Random(length)
+    expected = ["you", "i"]
+    actual = [rng.choice(WORDS) for _ in range(length)]
+
+    assert_valid(expected, actual, align_words(expected, actual))
+
+
+@pytest.mark.parametrize("length", [MAX_DIFF_EDITS + 1, 128, 500])
+def test_long_text_short_transcript(length: int) -> None:
+    rng = random.Random(length)
+    expected = [rng.choice(WORDS) for _ in range(length)]
+    actual = ["you", "i"]
+
+    assert_valid(expected, actual, align_words(expected, actual))
+
+
+def test_mistakes_are_aligned_locally() -> None:
+    steps = align_words("the quick brown fox".split(), "the quack fox".split())
+
+    assert steps == [
+        (CORRECT, 0, 0),
+        (SUBSTITUTED, 1, 1),
+        (MISSED, 2, None),
+        (CORRECT, 3, 2),
+    ]
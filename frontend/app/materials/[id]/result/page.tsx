@@ -13,12 +13,60 @@ import { ComparisonView } from '@/components/result/ComparisonView'
 import { AIFeedback } from '@/components/result/AIFeedback'
 import { Confetti } from '@/components/result/Confetti'
 import { apiClient } from '@/lib/api-client'
+import { useAuthStore } from '@/store/auth-store'
 import { usePracticeStore } from '@/store/practice-store'
 import { useStatsStore } from '@/store/stats-store'
 import { useToast } from '@/hooks/use-toast'
 import type { FeedbackResponse } from '@/types/practice'
 import { ArrowLeft, Home, RotateCcw } from 'lucide-react'
 
+type FeedbackEvent =
+  | { event: 'score'; data: FeedbackResponse }
+  | { event: 'token'; data: { text: string } }
+  | { event: 'done'; data: { ai_feedback: string } }
+
+/**
+ * Score an attempt and stream the AI feedback from the backend's SSE endpoint
+ *
+ * Uses fetch rather than apiClient to read the response as a stream, so the
+ * session's bearer token is attached here; the backend keys the per-user
+ * Gemini budget on it.
+ */
+async function streamFeedback(
+  body: { material_id: string; user_transcript: string },
+  onEvent: (event: FeedbackEvent) => void
+) {
+  const token = useAuthStore.getState().session?.access_token
+  const response = await fetch(`${apiClient.defaults.baseURL ?? ''}/api/feedback/stream`, {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+      ...(token ? { Authorization: `Bearer ${token}` } : {}),
+    },
+    body: JSON.stringify(body),
+  })
+  if (!response.ok || !response.body) {
+    throw new Error(`Feedback stream failed with status ${response.status}`)
+  }
+
+  const reader = response.body.pipeThrough(new TextDecoderStream()).getReader()
+  let buffer = ''
+  for (;;) {
+    const { value, done } = await reader.read()
+    if (done) return
+    buffer += value
+    const messages = buffer.split('\n\n')
+    buffer = messages.pop() ?? ''
+    for (const message of messages) {
+      const event = message.match(/^event: (.*)$/m)?.[1]
+      const data = message.match(/^data: (.*)$/m)?.[1]
+      if (event && data) {
+        onEvent({ event, data: JSON.parse(data) } as FeedbackEvent)
+      }
+    }
+  }
+}
+
 export default function ResultPage() {
   const params = useParams()
   const router = useRouter()
@@ -38,6 +86,9 @@ export default function ResultPage() {
 
   useEffect(() => {
     const loadFeedback = async () => {
+      // Already scored; later updates only append streamed AI text
+      if (feedback) return
+
       try {
         setIsLoading(true)
 
@@ -45,17 +96,28 @@ export default function ResultPage() {
         await new Promise(resolve => setTimeout(resolve, 1500))
 
         // Get feedback from practice store or fetch
-        if (!feedback && transcript) {
-          const response = await apiClient.post('/api/feedback', {
-            material_id: materialId,
-            user_transcript: transcript,
-          })
-          setFeedback(response.data)
+        if (transcript) {
+          // The score arrives first, then the AI text token by token
+          await streamFeedback(
+            { material_id: materialId, user_transcript: transcript },
+            message => {
+              if (message.event === 'score') {
+                setFeedback(message.data)
+                setIsLoading(false)
 
-          // Trigger confetti for high scores
-          if (response.data.score >= 90) {
-            setShowConfetti(true)
-          }
+                // Trigger confetti for high scores
+                if (message.data.score >= 90) {
+                  setShowConfetti(true)
+                }
+              } else if (message.event === 'token') {
+                const { text } = message.data
+                setFeedback(current => current && { ...current, ai_feedback: current.ai_feedback + text })
+              } else {
+                const { ai_feedback } = message.data
+                setFeedback(current => current && { ...current, ai_feedback })
+              }
+            }
+          )
         }
       } catch (error) {
         console.error('Failed to load feedback:', error)
@@ -38,7 +38,9 @@ export function AIFeedback({ feedback, xpGained }: AIFeedbackProps) {
           transition={{ delay: 0.3 }}
           className="p-4 rounded-lg bg-primary/5 border border-primary/10"
         >
-          <p className="text-sm leading-relaxed">{feedback}</p>
+          <p className="text-sm leading-relaxed">
+            {feedback || 'Generating your personalized feedback...'}
+          </p>
         </motion.div>
 
         {/* XP Gained */}
@@ -67,12 +67,15 @@ export function ComparisonView({ comparison }: ComparisonViewProps) {
                       ? 'bg-green-500/10 text-green-500 border-green-500/20'
                       : word.status === 'missed'
                         ? 'bg-red-500/10 text-red-500 border-red-500/20'
-                        : 'bg-yellow-500/10 text-yellow-500 border-yellow-500/20'
+                        : word.status === 'substituted'
+                          ? 'bg-orange-500/10 text-orange-500 border-orange-500/20'
+                          : 'bg-yellow-500/10 text-yellow-500 border-yellow-500/20'
                   }
                 >
                   {word.word}
                   {word.status === 'missed' && ' (missed)'}
                   {word.status === 'extra' && ' (extra)'}
+                  {word.spoken && ` (said "${word.spoken}")`}
                 </Badge>
               ))}
             </div>
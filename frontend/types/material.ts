@@ -2,12 +2,19 @@
  * Material types for frontend
  */
 
+export interface WordTimestamp {
+  word: string
+  start_time: number
+  end_time: number
+}
+
 export interface Sentence {
   id: string
   text: string
   start_time: number
   end_time: number
   sequence_order: number
+  words?: WordTimestamp[] | null
 }
 
 export interface Material {
@@ -6,9 +6,22 @@ export interface TranscribeResponse {
   transcript: string
 }
 
+export interface BatchTranscribeItem {
+  index: number
+  status_code: number
+  transcript?: string | null
+  error?: string | null
+  retry_after?: number | null
+}
+
+export interface BatchTranscribeResponse {
+  results: BatchTranscribeItem[]
+}
+
 export interface WordAnalysis {
   word: string
-  status: 'correct' | 'missed' | 'extra'
+  status: 'correct' | 'missed' | 'extra' | 'substituted'
+  spoken?: string | null
 }
 
 export interface ComparisonResult {
@@ -20,11 +33,30 @@ export interface ComparisonResult {
   word_analysis: WordAnalysis[]
 }
 
+export interface SentenceScore {
+  sentence_id: string
+  sequence_order: number
+  start_time: number
+  end_time: number
+  score: number
+  total_words: number
+  matched_count: number
+}
+
 export interface FeedbackResponse {
   score: number
   comparison: ComparisonResult
   ai_feedback: string
+  feedback_job_id?: string | null
   xp_gained: number
+  sentence_scores?: SentenceScore[] | null
+}
+
+export interface FeedbackJobResponse {
+  job_id: string
+  status: 'pending' | 'completed' | 'failed'
+  ai_feedback: string | null
+  error: string | null
 }
 
 export interface PracticeLog {
@@ -0,0 +1,5 @@
+-- Word-level timestamps for sentences
+-- Array of {word, start_time, end_time} objects taken from the TTS alignment;
+-- NULL for sentences created without one
+
+ALTER TABLE sentences ADD COLUMN words JSONB;